@@ -0,0 +1,46 @@
+"""
+Замеры производительности.
+
+Запуск из корня проекта: ``python -m benchmarks.<имя>``. Замеры работают на
+временной тестовой базе и не трогают рабочую db.sqlite3.
+"""
+
+import contextlib
+import os
+import statistics
+
+
+def setup():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "carwash.settings")
+    import django
+
+    django.setup()
+
+
+@contextlib.contextmanager
+def test_database():
+    from django.db import connection
+
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    position = min(len(values) - 1, round(pct / 100 * (len(values) - 1)))
+    return values[position]
+
+
+def summary(values):
+    """Сводка по выборке длительностей в секундах, в миллисекундах."""
+    return {
+        "mean_ms": round(statistics.mean(values) * 1000, 3) if values else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+    }
@@ -0,0 +1,177 @@
+"""
+Страницы чтения под ASGI с синхронными и асинхронными view.
+
+    python -m benchmarks.async_views [--workers 4] [--requests 400]
+                                     [--client-delay 20]
+
+Оба режима работают под одним ASGI-приложением с ``--workers`` циклами
+событий и отличаются только ASYNC_READ_VIEWS: «sync» — исходные view,
+которые Django выполняет в потоке через sync_to_async, «async» —
+асинхронные варианты. Каждый режим — отдельный процесс, так как набор URL
+выбирается при загрузке urls. Замеряются все пять переведенных адресов:
+список и карточка услуги, мои записи, карточка записи и поиск свободных
+слотов; запросы идут с cookie вошедшего клиента, так что кэш страниц для
+анонимов не участвует. ``--client-delay`` имитирует медленного клиента:
+столько миллисекунд уходит на отдачу ответа — одинаково в обоих режимах,
+поэтому разница между ними — заслуга самих view, а не ASGI. Печатает
+запросы в секунду и задержки по каждому адресу.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time as timer
+from datetime import date, time, timedelta
+
+from . import setup, summary, test_database
+
+DAY = date.today() + timedelta(days=7)
+
+
+def seed():
+    """Адреса пяти страниц и cookie сессии клиента с записями."""
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from django.test import Client
+
+    from bookings.models import Booking, Box
+    from customers.models import Customer
+    from services.models import Service, ServiceCategory
+
+    category = ServiceCategory.objects.create(name="Мойка")
+    service = Service.objects.create(
+        name="Стандартная мойка", price=1000, duration=30, category=category
+    )
+    for number in range(1, 5):
+        Box.objects.create(number=number, box_type="standard", capacity=2)
+    user = User.objects.create_user(username="client")
+    customer = Customer.objects.create(user=user, phone="+79000000001")
+    Booking.objects.bulk_create(
+        Booking(
+            customer=customer,
+            service=service,
+            booking_date=DAY,
+            booking_time=time(8 + hour, 0),
+        )
+        for hour in range(10)
+    )
+    client = Client()
+    client.force_login(user)
+    cookie = client.cookies[settings.SESSION_COOKIE_NAME].value
+    booking = Booking.objects.filter(customer=customer).order_by("id").first()
+    urls = [
+        "/services/",
+        f"/services/{service.pk}/",
+        "/bookings/my/",
+        f"/bookings/{booking.pk}/",
+        f"/bookings/free-slots/?service={service.pk}&date={DAY.isoformat()}",
+    ]
+    return urls, f"{settings.SESSION_COOKIE_NAME}={cookie}"
+
+
+def run(url, cookie, count, workers, delay):
+    from carwash.asgi import application
+
+    path, _, query = url.partition("?")
+    latencies, statuses = [], set()
+    lock = threading.Lock()
+
+    async def request(started):
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                statuses.add(message["status"])
+            if message["type"] == "http.response.body" and not message.get("more_body"):
+                # Медленный клиент: ответ уходит ``delay`` секунд
+                await asyncio.sleep(delay)
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "headers": [(b"host", b"localhost"), (b"cookie", cookie.encode())],
+            "server": ("localhost", 80),
+        }
+        await application(scope, receive, send)
+        with lock:
+            latencies.append(timer.perf_counter() - started)
+
+    def worker(share, started):
+        async def serve():
+            await asyncio.gather(*(request(started) for _ in range(share)))
+
+        asyncio.run(serve())
+
+    started = timer.perf_counter()
+    shares = [count // workers + (n < count % workers) for n in range(workers)]
+    threads = [
+        threading.Thread(target=worker, args=(share, started)) for share in shares
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if statuses != {200}:
+        raise RuntimeError(f"{url}: ответы {sorted(statuses)}")
+    return timer.perf_counter() - started, latencies
+
+
+def bench(count, workers, delay):
+    setup()
+    results = {}
+    with test_database():
+        urls, cookie = seed()
+        for url in urls:
+            elapsed, latencies = run(url, cookie, count, workers, delay)
+            results[url] = {
+                "requests_per_s": round(count / elapsed, 1),
+                **summary(latencies),
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--client-delay", type=float, default=20, help="мс")
+    parser.add_argument("--mode", choices=("sync", "async"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    delay = args.client_delay / 1000
+
+    if args.mode:
+        print(json.dumps(bench(args.requests, args.workers, delay)))
+        return
+
+    # Режимы в отдельных процессах: набор URL зависит от ASYNC_READ_VIEWS
+    for mode in ("sync", "async"):
+        env = dict(
+            os.environ,
+            MONITORING_SAMPLE_RATE="0",
+            ASYNC_READ_VIEWS="1" if mode == "async" else "0",
+        )
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.async_views", "--mode", mode]
+            + sys.argv[1:],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        for url, row in json.loads(output.splitlines()[-1]).items():
+            print(json.dumps({"mode": mode, "url": url, **row}, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Сквозной замер страниц сайта на синтетических данных с проверкой регрессий.
+
+    python -m benchmarks.pages [--customers 2000] [--bookings 30000]
+                               [--requests 10] [--warm] [--threshold 0.25]
+                               [--baseline benchmarks/baselines/pages.json]
+                               [--update-baseline] [--output results.json]
+
+На временной базе генератор (bookings.generator) создает данные с
+фиксированным seed, после чего каждая страница запрашивается ``--requests``
+раз. Для каждой страницы печатаются число SQL-запросов, время в БД, время
+рендеринга шаблонов и полная задержка. По умолчанию кеши очищаются перед
+каждым запросом (холодный путь), ``--warm`` меряет повторные запросы.
+
+Результат сравнивается с базовым файлом: рост числа запросов или медианы
+времени больше чем на ``--threshold`` (и больше ``--min-delta-ms``)
+считается регрессией, и команда завершается с кодом 1.
+"""
+
+import argparse
+import json
+import sys
+import time as timer
+from contextlib import contextmanager
+from datetime import date, timedelta
+from pathlib import Path
+
+from . import setup, summary, test_database
+
+BASELINE = Path(__file__).with_name("baselines") / "pages.json"
+END = date(2024, 12, 31)
+# Метрики, по которым ищутся регрессии: (ключ, поле сводки)
+CHECKED = [("latency", "p50_ms"), ("db", "p50_ms"), ("render", "p50_ms")]
+
+
+class Probe:
+    """Счетчики одного запроса: SQL-запросы, время в БД и в шаблонах."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.render = 0.0
+        self.depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = timer.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += timer.perf_counter() - started
+            self.queries += 1
+
+
+@contextmanager
+def instrument(probe):
+    """Подключить ``probe`` к БД и рендерингу шаблонов на время запроса."""
+    from django.db import connection
+    from django.template.base import Template
+
+    render = Template.render
+
+    def timed_render(template, context):
+        # Вложенные шаблоны (extends, include) уже учтены во внешнем
+        probe.depth += 1
+        started = timer.perf_counter()
+        try:
+            return render(template, context)
+        finally:
+            probe.depth -= 1
+            if not probe.depth:
+                probe.render += timer.perf_counter() - started
+
+    Template.render = timed_render
+    try:
+        with connection.execute_wrapper(probe):
+            yield probe
+    finally:
+        Template.render = render
+
+
+def seed(customers, bookings, days):
+    """Данные генератора и страницы для замера: [(имя, URL, пользователь)]."""
+    from django.contrib.auth.models import User
+    from django.db.models import Count
+    from django.urls import reverse
+
+    from bookings.generator import generate
+    from bookings.models import Booking
+    from customers.models import Customer
+    from services.models import Service
+
+    generate(customers, bookings, days, boxes=12, seed=1, end=END)
+    # Клиент с самой длинной историей — худший случай для «Моих записей»
+    customer = (
+        Customer.objects.annotate(total=Count("bookings"))
+        .order_by("-total", "id")
+        .select_related("user")
+        .first()
+    )
+    booking = Booking.objects.filter(customer=customer).order_by("-id").first()
+    service = Service.objects.order_by("id").first()
+    staff = User.objects.create_user(username="bench_staff", is_staff=True)
+    user = customer.user
+    day = (END - timedelta(days=3)).isoformat()
+    free_slots = reverse("bookings:free_slots") + f"?service={service.pk}&date={day}"
+    return [
+        ("index", reverse("bookings:index"), None),
+        ("service_list", reverse("services:service_list"), None),
+        ("service_detail", reverse("services:service_detail", args=[service.pk]), None),
+        ("price_list", reverse("pages:price_list"), None),
+        ("about", reverse("pages:about"), None),
+        ("contact", reverse("pages:contact"), None),
+        ("registration", reverse("registration"), None),
+        ("login", reverse("login"), None),
+        ("free_slots", free_slots, None),
+        ("my_bookings", reverse("bookings:my_bookings"), user),
+        ("create_booking", reverse("bookings:create_booking"), user),
+        ("booking_detail", reverse("bookings:booking_detail", args=[booking.pk]), user),
+        ("edit_booking", reverse("bookings:edit_booking", args=[booking.pk]), user),
+        ("delete_booking", reverse("bookings:delete_booking", args=[booking.pk]), user),
+        ("profile", reverse("customers:profile"), user),
+        ("edit_profile", reverse("customers:edit_profile"), user),
+        ("analytics", reverse("bookings:analytics") + "?date_from=2024-01-01", staff),
+    ]
+
+
+def measure(url, user, count, warm):
+    from django.core.cache import caches
+    from django.test import Client
+
+    client = Client(HTTP_HOST="localhost")
+    if user is not None:
+        client.force_login(user)
+    # Первый запрос прогревает импорты, шаблоны и кеши
+    response = client.get(url)
+    if response.status_code != 200:
+        raise RuntimeError(f"{url}: ответ {response.status_code}")
+    probes, latencies = [], []
+    for _ in range(count):
+        if not warm:
+            for cache in caches.all():
+                cache.clear()
+        with instrument(Probe()) as probe:
+            started = timer.perf_counter()
+            client.get(url)
+            latencies.append(timer.perf_counter() - started)
+        probes.append(probe)
+    return {
+        "url": url,
+        "queries": max(probe.queries for probe in probes),
+        "latency": summary(latencies),
+        "db": summary([probe.db for probe in probes]),
+        "render": summary([probe.render for probe in probes]),
+    }
+
+
+def run(args):
+    setup()
+    results = {}
+    with test_database():
+        pages = seed(args.customers, args.bookings, args.days)
+        for name, url, user in pages:
+            results[name] = measure(url, user, args.requests, args.warm)
+            print(f"{name}: {json.dumps(results[name])}", file=sys.stderr)
+    return {
+        "dataset": {
+            "customers": args.customers,
+            "bookings": args.bookings,
+            "days": args.days,
+            "warm": args.warm,
+        },
+        "pages": results,
+    }
+
+
+def regressions(current, baseline, threshold, min_delta_ms):
+    """Список строк с регрессиями относительно базового замера."""
+    found = []
+    if current["dataset"] != baseline.get("dataset"):
+        return [f"Другой набор данных: {baseline.get('dataset')}"]
+    for name, page in current["pages"].items():
+        base = baseline["pages"].get(name)
+        if base is None:
+            continue
+        if page["queries"] > base["queries"]:
+            found.append(f"{name}: запросов {base['queries']} → {page['queries']}")
+        for metric, field in CHECKED:
+            old, new = base[metric][field], page[metric][field]
+            if new - old > min_delta_ms and new > old * (1 + threshold):
+                found.append(f"{name}: {metric} {field} {old} → {new}")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--customers", type=int, default=2000)
+    parser.add_argument("--bookings", type=int, default=30000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--warm", action="store_true")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--min-delta-ms", type=float, default=2.0)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--output", type=Path, help="Куда сохранить результат")
+    args = parser.parse_args()
+
+    results = run(args)
+    text = json.dumps(results, indent=2, ensure_ascii=False) + "\n"
+    print(text)
+    if args.output:
+        args.output.write_text(text, encoding="utf-8")
+    if args.update_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(text, encoding="utf-8")
+        return 0
+    if not args.baseline.exists():
+        print(f"Нет базового файла {args.baseline}", file=sys.stderr)
+        return 0
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    found = regressions(results, baseline, args.threshold, args.min_delta_ms)
+    for line in found:
+        print(f"Регрессия: {line}", file=sys.stderr)
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
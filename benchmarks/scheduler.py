@@ -0,0 +1,136 @@
+"""
+Задержка автоматического назначения бокса и мойщика от числа записей в день.
+
+    python -m benchmarks.scheduler [--sizes 100 200 400 800] [--seed 1]
+
+Для каждого объема дня печатает время расстановки в памяти (DayScheduler)
+и сквозное время commit_booking на временной базе.
+"""
+
+import argparse
+import json
+import random
+import time as timer
+from datetime import date, time
+
+from . import setup, summary, test_database
+
+DAY = date(2024, 6, 1)
+DURATIONS = (15, 30, 45, 60, 120)
+
+
+def make_requests(count, seed):
+    rng = random.Random(seed)
+    # Пик с 10 до 13 и с 17 до 20, как в реальном потоке записей
+    hours = [8, 9] + [10, 11, 12] * 3 + [13, 14, 15, 16] + [17, 18, 19] * 3 + [20]
+    return [
+        (time(rng.choice(hours), rng.randrange(0, 60, 5)), rng.choice(DURATIONS))
+        for _ in range(count)
+    ]
+
+
+def boxes_for(count):
+    # Парк боксов растет вместе с потоком, чтобы день не упирался в вместимость
+    return [(box_id, 2, "standard") for box_id in range(1, max(4, count // 40) + 1)]
+
+
+def bench_memory(count, seed):
+    from bookings.availability import DayIndex
+    from bookings.scheduler import DayScheduler
+
+    boxes = boxes_for(count)
+    scheduler = DayScheduler(DayIndex(DAY, boxes), range(1, len(boxes) * 2 + 1))
+    latencies, placed = [], 0
+    started = timer.perf_counter()
+    for start, duration in make_requests(count, seed):
+        began = timer.perf_counter()
+        box_id, _ = scheduler.assign(start, duration)
+        latencies.append(timer.perf_counter() - began)
+        placed += box_id is not None
+    return {
+        "total_ms": round((timer.perf_counter() - started) * 1000, 2),
+        "placed": placed,
+        **summary(latencies),
+    }
+
+
+def bench_commit(count, seed):
+    from django.contrib.auth.models import User
+    from bookings.commit import SlotUnavailable, commit_booking
+    from bookings.models import Booking, Box
+    from customers.models import Customer
+    from employees.models import Employee
+    from services.models import Service, ServiceCategory
+
+    Booking.objects.all().delete()
+    Box.objects.all().delete()
+    Employee.objects.all().delete()
+    boxes = boxes_for(count)
+    Box.objects.bulk_create(
+        Box(number=box_id, box_type=box_type, capacity=capacity)
+        for box_id, capacity, box_type in boxes
+    )
+    for number in range(len(boxes) * 2):
+        user, _ = User.objects.get_or_create(username=f"bench-washer-{number}")
+        Employee.objects.get_or_create(
+            user=user, defaults={"phone": "+70000000000", "hire_date": DAY}
+        )
+    category, _ = ServiceCategory.objects.get_or_create(name="Бенчмарк")
+    services = {
+        duration: Service.objects.get_or_create(
+            name=f"Услуга {duration} мин",
+            defaults={"price": 1000, "duration": duration, "category": category},
+        )[0]
+        for duration in DURATIONS
+    }
+    user, _ = User.objects.get_or_create(username="bench-customer")
+    customer, _ = Customer.objects.get_or_create(
+        user=user, defaults={"phone": "+70000000001"}
+    )
+
+    latencies, placed = [], 0
+    started = timer.perf_counter()
+    for start, duration in make_requests(count, seed):
+        booking = Booking(
+            customer=customer,
+            service=services[duration],
+            booking_date=DAY,
+            booking_time=start,
+        )
+        began = timer.perf_counter()
+        try:
+            commit_booking(booking)
+            placed += 1
+        except SlotUnavailable:
+            pass
+        latencies.append(timer.perf_counter() - began)
+    return {
+        "total_ms": round((timer.perf_counter() - started) * 1000, 2),
+        "placed": placed,
+        **summary(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 200, 400, 800])
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--memory-only", action="store_true", help="Без сквозного замера через БД"
+    )
+    args = parser.parse_args()
+
+    setup()
+    results = []
+    with test_database():
+        for count in args.sizes:
+            row = {"bookings": count, "memory": bench_memory(count, args.seed)}
+            if not args.memory_only:
+                row["commit"] = bench_commit(count, args.seed)
+            results.append(row)
+            print(json.dumps(row, ensure_ascii=False))
+    return results
+
+
+if __name__ == "__main__":
+    main()
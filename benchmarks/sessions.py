@@ -0,0 +1,170 @@
+"""
+Пропускная способность страниц вошедшего клиента при разных хранилищах сессий.
+
+    python -m benchmarks.sessions [--workers 4] [--requests 400] [--users 20]
+
+Каждая конфигурация запускается в отдельном процессе с WSGI-приложением и
+пулом из ``--workers`` потоков; запросы идут по кругу от ``--users``
+вошедших клиентов. «before» — сессии в БД (как было), остальные — другие
+SESSION_STORE. Кэш пользователя (AUTH_USER_CACHE_TIMEOUT) здесь не
+участвует: с кэшем в памяти процесса он не включается. Для каждой страницы
+печатаются запросы в секунду, задержки и число SQL-запросов на прогретый
+запрос.
+"""
+
+import argparse
+import io
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time as timer
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from . import setup, summary, test_database
+
+# Конфигурация: переменные окружения процесса
+CONFIGS = {
+    "before": {"SESSION_STORE": "db"},
+    "cached_db": {"SESSION_STORE": "cached_db"},
+    "cache": {"SESSION_STORE": "cache"},
+    "signed_cookies": {"SESSION_STORE": "signed_cookies"},
+}
+END = date(2024, 12, 31)
+
+
+def seed(users):
+    """Cookie сессий вошедших клиентов с их записью и страницы для замера."""
+    from django.conf import settings
+    from django.db.models import Count
+    from django.test import Client
+    from django.urls import reverse
+
+    from bookings.generator import generate
+    from customers.models import Customer
+
+    generate(200, 5000, 90, boxes=6, seed=1, end=END)
+    customers = (
+        Customer.objects.annotate(total=Count("bookings"))
+        .filter(total__gt=0)
+        .select_related("user")
+        .order_by("-total", "id")[:users]
+    )
+    sessions = []
+    for customer in customers:
+        client = Client()
+        client.force_login(customer.user)
+        cookie = client.cookies[settings.SESSION_COOKIE_NAME].value
+        booking = customer.bookings.order_by("id").first()
+        sessions.append((f"{settings.SESSION_COOKIE_NAME}={cookie}", booking.pk))
+    # URL страницы по записи клиента
+    pages = {
+        "my_bookings": lambda booking: reverse("bookings:my_bookings"),
+        "booking_detail": lambda booking: reverse(
+            "bookings:booking_detail", args=[booking]
+        ),
+        "profile": lambda booking: reverse("customers:profile"),
+        "create_booking": lambda booking: reverse("bookings:create_booking"),
+    }
+    return sessions, pages
+
+
+def request(application, path, cookie):
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": path,
+        "QUERY_STRING": "",
+        "SERVER_NAME": "localhost",
+        "SERVER_PORT": "80",
+        "HTTP_HOST": "localhost",
+        "HTTP_COOKIE": cookie,
+        "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": sys.stderr,
+    }
+    statuses = []
+    b"".join(application(environ, lambda status, headers: statuses.append(status)))
+    return statuses[0]
+
+
+def queries(application, path, cookie):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as context:
+        request(application, path, cookie)
+    return len(context.captured_queries)
+
+
+def run(page, sessions, application, count, workers):
+    targets = [
+        (page(booking), cookie)
+        for cookie, booking in itertools.islice(itertools.cycle(sessions), count)
+    ]
+    # Прогрев: каждая сессия и профиль попадают в кэши
+    for path, cookie in targets[: len(sessions)]:
+        status = request(application, path, cookie)
+        if not status.startswith("200"):
+            raise RuntimeError(f"{path}: ответ {status}")
+
+    def timed(target):
+        started = timer.perf_counter()
+        request(application, *target)
+        return timer.perf_counter() - started
+
+    started = timer.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        latencies = list(pool.map(timed, targets))
+    elapsed = timer.perf_counter() - started
+    return {
+        "requests_per_s": round(count / elapsed, 1),
+        "queries": queries(application, *targets[0]),
+        **summary(latencies),
+    }
+
+
+def bench(count, workers, users):
+    setup()
+    from django.core.wsgi import get_wsgi_application
+
+    results = {}
+    with test_database():
+        sessions, pages = seed(users)
+        application = get_wsgi_application()
+        for name, page in pages.items():
+            results[name] = run(page, sessions, application, count, workers)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--config", choices=CONFIGS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.config:
+        print(json.dumps(bench(args.requests, args.workers, args.users)))
+        return
+
+    # Хранилище сессий выбирается при загрузке настроек — отдельный процесс
+    # на конфигурацию
+    for config, variables in CONFIGS.items():
+        env = dict(os.environ, MONITORING_SAMPLE_RATE="0", **variables)
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.sessions", "--config", config]
+            + sys.argv[1:],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        for page, row in json.loads(output.splitlines()[-1]).items():
+            print(json.dumps({"config": config, "page": page, **row}))
+
+
+if __name__ == "__main__":
+    main()
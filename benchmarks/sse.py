@@ -0,0 +1,96 @@
+"""
+Нагрузочный тест потока событий доски: сотни простаивающих подключений.
+
+    python -m benchmarks.sse [--clients 500] [--rounds 20]
+
+Открывает подключения прямо к ASGI-приложению (без сетевого сервера), затем
+рассылает события и печатает память на одно подключение и задержку доставки
+события всем клиентам. Авторизация — по токену экрана, БД не нужна.
+"""
+
+import argparse
+import asyncio
+import json
+import time as timer
+import tracemalloc
+
+from . import setup, summary
+
+DAY = "2024-06-01"
+
+
+class Client:
+    def __init__(self, application):
+        self.incoming = asyncio.Queue()
+        self.received = asyncio.Event()
+        self.task = asyncio.ensure_future(
+            application(
+                {
+                    "type": "http",
+                    "path": f"/events/board/{DAY}/",
+                    "query_string": b"token=bench",
+                    "headers": [],
+                },
+                self.incoming.get,
+                self.send,
+            )
+        )
+
+    async def send(self, message):
+        if message.get("body", b"").startswith(b"event:"):
+            self.received.set()
+
+    async def close(self):
+        await self.incoming.put({"type": "http.disconnect"})
+
+
+async def run(clients, rounds):
+    from carwash.asgi import application
+    from bookings.events import broker
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    started = timer.perf_counter()
+    connections = [Client(application) for _ in range(clients)]
+    while broker.subscribers(DAY) < clients:
+        await asyncio.sleep(0.01)
+    connect_seconds = timer.perf_counter() - started
+    per_connection = (tracemalloc.get_traced_memory()[0] - before) / clients
+    tracemalloc.stop()
+
+    fan_out = []
+    for number in range(rounds):
+        for connection in connections:
+            connection.received.clear()
+        started = timer.perf_counter()
+        broker.publish(DAY, {"event": "updated", "id": number})
+        await asyncio.gather(*(c.received.wait() for c in connections))
+        fan_out.append(timer.perf_counter() - started)
+
+    for connection in connections:
+        await connection.close()
+    await asyncio.gather(*(c.task for c in connections))
+    return {
+        "clients": clients,
+        "connect_s": round(connect_seconds, 3),
+        "memory_per_connection_kb": round(per_connection / 1024, 2),
+        "fan_out": summary(fan_out),
+        "subscribers_left": broker.subscribers(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    setup()
+    from django.conf import settings
+
+    settings.BOARD_STREAM_TOKEN = "bench"
+    print(json.dumps(asyncio.run(run(args.clients, args.rounds)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
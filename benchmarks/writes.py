@@ -0,0 +1,166 @@
+"""
+Пропускная способность параллельной записи бронирований.
+
+    python -m benchmarks.writes [--writers 8] [--bookings 2000] [--postgres]
+
+Каждая конфигурация базы запускается в отдельном процессе: SQLite с
+настройками по умолчанию (SQLITE_TUNING=0), SQLite с WAL и PRAGMA из
+SQLITE_PRAGMAS и, с ``--postgres``, PostgreSQL из переменных DATABASE_*
+(DATABASE_ENGINE выставляется сам). SQLite-база — временный файл, а не
+память, иначе журнал и fsync не участвуют в замере. ``--writers`` потоков
+со своими соединениями сохраняют записи через commit_booking на ближайшие
+две недели. Печатаются записи в секунду, задержки, отказы по занятому
+времени и по блокировкам (BookingBusy).
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time as timer
+from contextlib import contextmanager
+from datetime import date, timedelta
+from pathlib import Path
+
+from . import setup, summary, test_database
+
+CONFIGS = {
+    "sqlite_default": {"DATABASE_ENGINE": "sqlite", "SQLITE_TUNING": "0"},
+    "sqlite_tuned": {"DATABASE_ENGINE": "sqlite", "SQLITE_TUNING": "1"},
+    "postgresql": {"DATABASE_ENGINE": "postgresql"},
+}
+DAYS = 14
+
+
+@contextmanager
+def file_database():
+    """Тестовая база; у SQLite — во временном файле вместо памяти."""
+    from django.db import connection
+
+    if connection.vendor != "sqlite":
+        with test_database():
+            yield
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        connection.settings_dict["TEST"]["NAME"] = str(Path(directory) / "bench.db")
+        with test_database():
+            yield
+
+
+def seed(customers):
+    from bookings.generator import Generator, create_catalog
+    from services.models import Service
+
+    create_catalog(boxes=12)
+    generator = Generator(seed=1)
+    customer_ids = [pk for pk, _ in generator.customers(customers)]
+    generator.employees(8, date.today())
+    return customer_ids, list(Service.objects.filter(is_active=True))
+
+
+def writer(number, count, customers, services, results):
+    from django.db import connection
+
+    from bookings.commit import BookingBusy, SlotUnavailable, commit_booking
+    from bookings.generator import Generator
+    from bookings.models import Booking
+
+    generator = Generator(seed=100 + number)
+    choose = random.Random(number)
+    first = date.today() + timedelta(days=1)
+    latencies, outcome = [], {"saved": 0, "unavailable": 0, "busy": 0}
+    try:
+        for _ in range(count):
+            service = choose.choice(services)
+            booking = Booking(
+                customer_id=choose.choice(customers),
+                service=service,
+                booking_date=first + timedelta(days=choose.randrange(DAYS)),
+                booking_time=generator.start_time(service.duration),
+                status="pending",
+            )
+            started = timer.perf_counter()
+            try:
+                commit_booking(booking)
+                outcome["saved"] += 1
+            except BookingBusy:
+                outcome["busy"] += 1
+            except SlotUnavailable:
+                outcome["unavailable"] += 1
+            latencies.append(timer.perf_counter() - started)
+    finally:
+        connection.close()
+    results.append((latencies, outcome))
+
+
+def bench(writers, total, customers):
+    setup()
+    from django.db import connection
+
+    with file_database():
+        customer_ids, services = seed(customers)
+        # Потоки открывают свои соединения; основное не должно держать
+        # блокировку базы во время замера
+        connection.close()
+        results = []
+        shares = [total // writers + (n < total % writers) for n in range(writers)]
+        threads = [
+            threading.Thread(
+                target=writer, args=(n, share, customer_ids, services, results)
+            )
+            for n, share in enumerate(shares)
+        ]
+        started = timer.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = timer.perf_counter() - started
+    latencies = [latency for part, _ in results for latency in part]
+    outcome = {
+        key: sum(part[key] for _, part in results)
+        for key in ("saved", "unavailable", "busy")
+    }
+    return {
+        "vendor": connection.vendor,
+        "bookings_per_s": round(outcome["saved"] / elapsed, 1),
+        **outcome,
+        **summary(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--bookings", type=int, default=2000)
+    parser.add_argument("--customers", type=int, default=200)
+    parser.add_argument("--postgres", action="store_true")
+    parser.add_argument("--config", choices=CONFIGS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.config:
+        print(json.dumps(bench(args.writers, args.bookings, args.customers)))
+        return
+
+    configs = [name for name in CONFIGS if args.postgres or name != "postgresql"]
+    # Профиль базы выбирается при загрузке настроек — процесс на конфигурацию
+    for config in configs:
+        env = dict(os.environ, MONITORING_SAMPLE_RATE="0", **CONFIGS[config])
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.writes", "--config", config]
+            + sys.argv[1:],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        row = json.loads(output.splitlines()[-1])
+        print(json.dumps({"config": config, **row}))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from .models import Booking, Box
 
 
@@ -14,6 +14,7 @@ class BookingAdmin(admin.ModelAdmin):
         "total_price",
     )
     list_filter = ("status", "booking_date", "box")
+    list_select_related = ("customer__user", "service")
     search_fields = (
         "customer__user__username",
         "customer__user__email",
@@ -21,6 +22,40 @@ class BookingAdmin(admin.ModelAdmin):
     )
     date_hierarchy = "booking_date"
     ordering = ("-booking_date", "-booking_time")
+    actions = ("mark_confirmed", "mark_in_progress", "mark_completed", "mark_cancelled")
+
+    def _set_status(self, request, queryset, status):
+        # Как и на доске, статус меняется только допустимым переходом
+        sources = [
+            source
+            for source, targets in Booking.TRANSITIONS.items()
+            if status in targets
+        ]
+        skipped = queryset.exclude(status__in=sources).count()
+        updated = queryset.filter(status__in=sources).set_status(status)
+        self.message_user(request, f"Обновлено записей: {updated}")
+        if skipped:
+            self.message_user(
+                request,
+                f"Пропущено записей с недопустимым переходом: {skipped}",
+                messages.WARNING,
+            )
+
+    @admin.action(description="Подтвердить выбранные записи")
+    def mark_confirmed(self, request, queryset):
+        self._set_status(request, queryset, "confirmed")
+
+    @admin.action(description="Отметить начало работ")
+    def mark_in_progress(self, request, queryset):
+        self._set_status(request, queryset, "in_progress")
+
+    @admin.action(description="Отметить завершение")
+    def mark_completed(self, request, queryset):
+        self._set_status(request, queryset, "completed")
+
+    @admin.action(description="Отменить выбранные записи")
+    def mark_cancelled(self, request, queryset):
+        self._set_status(request, queryset, "cancelled")
 
 
 @admin.register(Box)
@@ -0,0 +1,178 @@
+"""
+Аналитика по выручке и загрузке: все агрегаты считаются в БД.
+
+Каждый раздел отчета — один запрос с GROUP BY; ранги и сравнение с
+предыдущим месяцем — оконные функции поверх агрегатов. Выручка, услуги и
+боксы читаются из дневных сводок (DailyRollup), а не из таблицы записей,
+поэтому отчет за годы стоит столько же, сколько за месяц. Нагрузка мойщиков
+в сводки не входит и считается по записям.
+"""
+
+from decimal import Decimal
+
+from django.db.models import Count, F, FloatField, Q, Sum, Value, Window
+from django.db.models.functions import Cast, Coalesce, Lag, Rank, TruncMonth
+
+from employees.models import Employee
+
+from .models import Booking, Box, DailyRollup
+from .occupancy import SLOT_MINUTES, SLOTS_PER_DAY
+
+ZERO = Value(Decimal("0"))
+# Рабочих минут в дне у одного машино-места
+WORKING_MINUTES = SLOTS_PER_DAY * SLOT_MINUTES
+# Записи в работе и ожидающие: их сумма — ожидаемая выручка
+PIPELINE_STATUSES = ("pending", "confirmed", "in_progress")
+
+
+def _period(queryset, date_from, date_to, field="date"):
+    return queryset.filter(
+        **{f"{field}__gte": date_from, f"{field}__lte": date_to}
+    ).order_by()
+
+
+def _rollups(date_from, date_to):
+    return _period(DailyRollup.objects.all(), date_from, date_to)
+
+
+def summary(date_from, date_to):
+    """Итоги периода: выручка, ожидаемая выручка и записи по статусам."""
+    counts = {
+        f"{status}_count": Coalesce(Sum("bookings", filter=Q(status=status)), 0)
+        for status, _ in Booking.STATUS_CHOICES
+    }
+    return _rollups(date_from, date_to).aggregate(
+        total=Coalesce(Sum("bookings"), 0),
+        revenue=Coalesce(Sum("revenue", filter=Q(status="completed")), ZERO),
+        pipeline=Coalesce(Sum("revenue", filter=Q(status__in=PIPELINE_STATUSES)), ZERO),
+        **counts,
+    )
+
+
+def revenue_by_month(date_from, date_to):
+    """Выручка по месяцам и изменение к предыдущему месяцу."""
+    rows = (
+        _rollups(date_from, date_to)
+        .filter(status="completed")
+        .annotate(month=TruncMonth("date"))
+        .values("month")
+        .annotate(bookings=Sum("bookings"), revenue=Sum("revenue"))
+        .annotate(
+            previous=Window(Lag("revenue"), order_by=F("month").asc()),
+        )
+        .order_by("month")
+    )
+    rows = list(rows)
+    for row in rows:
+        previous = row["previous"]
+        row["change"] = row["revenue"] - previous if previous is not None else None
+    return rows
+
+
+def by_service(date_from, date_to):
+    """Записи и выручка по услугам с рангом по выручке."""
+    return (
+        _rollups(date_from, date_to)
+        .exclude(status="cancelled")
+        .values("service_id", "service__name", "service__category__name")
+        .annotate(
+            bookings=Sum("bookings"),
+            revenue=Coalesce(Sum("revenue", filter=Q(status="completed")), ZERO),
+        )
+        .annotate(rank=Window(Rank(), order_by=F("revenue").desc()))
+        .order_by("rank", "service__name")
+    )
+
+
+def by_category(date_from, date_to):
+    return (
+        _rollups(date_from, date_to)
+        .exclude(status="cancelled")
+        .values("service__category__name")
+        .annotate(
+            bookings=Sum("bookings"),
+            revenue=Coalesce(Sum("revenue", filter=Q(status="completed")), ZERO),
+        )
+        .order_by("-revenue", "service__category__name")
+    )
+
+
+def box_utilization(date_from, date_to):
+    """
+    Загрузка боксов: занятые минуты против рабочего времени × вместимость.
+
+    Рабочих минут на бокс — (часы работы × дни периода × capacity).
+    """
+    days = (date_to - date_from).days + 1
+    active = Q(rollups__status__in=Booking.ACTIVE_STATUSES) & Q(
+        rollups__date__gte=date_from, rollups__date__lte=date_to
+    )
+    return (
+        Box.objects.annotate(
+            bookings=Coalesce(Sum("rollups__bookings", filter=active), 0),
+            booked_minutes=Coalesce(Sum("rollups__minutes", filter=active), 0),
+            available_minutes=F("capacity") * Value(WORKING_MINUTES * days),
+        )
+        .annotate(
+            utilization=Cast(F("booked_minutes"), FloatField())
+            / Cast(F("available_minutes"), FloatField())
+        )
+        .values(
+            "id",
+            "number",
+            "box_type",
+            "capacity",
+            "bookings",
+            "booked_minutes",
+            "available_minutes",
+            "utilization",
+        )
+        .order_by("number")
+    )
+
+
+def washer_load(date_from, date_to):
+    """Нагрузка мойщиков: записи и минуты работы с рангом по минутам."""
+    active = Q(booking__status__in=Booking.ACTIVE_STATUSES) & Q(
+        booking__booking_date__gte=date_from, booking__booking_date__lte=date_to
+    )
+    return (
+        Employee.objects.filter(is_active=True)
+        .annotate(
+            bookings=Count("booking", filter=active),
+            minutes=Coalesce(Sum("booking__service__duration", filter=active), 0),
+            revenue=Coalesce(
+                Sum(
+                    "booking__total_price",
+                    filter=active & Q(booking__status="completed"),
+                ),
+                ZERO,
+            ),
+        )
+        .annotate(rank=Window(Rank(), order_by=F("minutes").desc()))
+        .values(
+            "id",
+            "user__username",
+            "user__first_name",
+            "user__last_name",
+            "bookings",
+            "minutes",
+            "revenue",
+            "rank",
+        )
+        .order_by("rank", "user__username")
+    )
+
+
+def report(date_from, date_to):
+    """Полный отчет за период (каждый раздел — один запрос)."""
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "summary": summary(date_from, date_to),
+        "months": list(revenue_by_month(date_from, date_to)),
+        "services": list(by_service(date_from, date_to)),
+        "categories": list(by_category(date_from, date_to)),
+        "boxes": list(box_utilization(date_from, date_to)),
+        "washers": list(washer_load(date_from, date_to)),
+    }
@@ -0,0 +1,238 @@
+"""
+JSON API для записей, услуг и боксов.
+
+Страницы выдаются по курсору (keyset): вместо COUNT и OFFSET следующая
+страница начинается строго после последней строки предыдущей по ключу
+сортировки, поэтому ее стоимость не зависит от глубины. Клиент может
+запросить только нужные поля (``?fields=id,date,status``); строки идут
+прямо из ``.values()``, без создания моделей.
+"""
+
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db import DataError
+from django.db.models import Q
+from django.http import JsonResponse
+from django.utils.dateparse import parse_date
+from django.views.decorators.http import require_GET
+
+from services.models import Service
+
+from .models import Booking, Box
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+# Целые столбцы во всех поддерживаемых СУБД не шире 64 бит
+INTEGER_RANGE = (-(2**63), 2**63 - 1)
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class Resource:
+    """Описание выдачи: публичные поля -> поля ORM и ключ сортировки."""
+
+    def __init__(self, fields, ordering, default_fields=None):
+        self.fields = fields
+        self.ordering = ordering
+        self.default_fields = default_fields or list(fields)
+
+    def select(self, requested):
+        if not requested:
+            return self.default_fields
+        names = [name.strip() for name in requested.split(",") if name.strip()]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ApiError(f"Неизвестные поля: {', '.join(unknown)}")
+        return names
+
+
+BOOKINGS = Resource(
+    fields={
+        "id": "id",
+        "date": "booking_date",
+        "time": "booking_time",
+        "status": "status",
+        "service_id": "service_id",
+        "service": "service__name",
+        "duration": "service__duration",
+        "box": "box__number",
+        "total_price": "total_price",
+        "notes": "notes",
+    },
+    ordering=("-booking_date", "-booking_time", "-id"),
+    default_fields=["id", "date", "time", "status", "service", "total_price"],
+)
+SERVICES = Resource(
+    fields={
+        "id": "id",
+        "name": "name",
+        "description": "description",
+        "price": "price",
+        "duration": "duration",
+        "box_type": "box_type",
+        "category_id": "category_id",
+        "category": "category__name",
+    },
+    ordering=("id",),
+    default_fields=["id", "name", "price", "duration", "category"],
+)
+BOXES = Resource(
+    fields={
+        "id": "id",
+        "number": "number",
+        "box_type": "box_type",
+        "capacity": "capacity",
+    },
+    ordering=("number", "id"),
+)
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor, fields):
+    """Значения ключа сортировки из курсора, приведенные к типам ``fields``."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise ApiError("Некорректный курсор")
+    if not isinstance(values, list) or len(values) != len(fields):
+        raise ApiError("Некорректный курсор")
+    try:
+        values = [_cursor_value(field, value) for field, value in zip(fields, values)]
+    except (ValidationError, ValueError, TypeError, OverflowError):
+        raise ApiError("Некорректный курсор")
+    return values
+
+
+def _cursor_value(field, value):
+    """Значение курсора, которое поле примет и которое поместится в столбец."""
+    value = field.to_python(value)
+    if value is None:
+        raise ValidationError("Пустое значение")
+    # Валидаторы поля отсекают лишние цифры и NaN у DecimalField
+    field.run_validators(value)
+    if isinstance(value, int) and not INTEGER_RANGE[0] <= value <= INTEGER_RANGE[1]:
+        raise ValidationError("Значение вне диапазона")
+    return value
+
+
+def _ordering_field(model, path):
+    """Поле модели по пути ключа сортировки (``service__name``)."""
+    *relations, name = path.split("__")
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+    return model._meta.get_field(name)
+
+
+def _after(ordering, values):
+    """Условие «строго после» для составного ключа сортировки."""
+    condition = Q()
+    for position, key in enumerate(ordering):
+        lookup = "lt" if key.startswith("-") else "gt"
+        step = Q(**{f"{key.lstrip('-')}__{lookup}": values[position]})
+        for previous, value in zip(ordering[:position], values):
+            step &= Q(**{previous.lstrip("-"): value})
+        condition |= step
+    return condition
+
+
+def keyset_page(queryset, resource, fields, cursor=None, limit=DEFAULT_LIMIT):
+    """Страница строк после курсора и курсор следующей страницы."""
+    keys = [key.lstrip("-") for key in resource.ordering]
+    if cursor:
+        key_fields = [_ordering_field(queryset.model, key) for key in keys]
+        queryset = queryset.filter(
+            _after(resource.ordering, decode_cursor(cursor, key_fields))
+        )
+    lookups = {resource.fields[name]: name for name in fields}
+    try:
+        rows = list(
+            queryset.order_by(*resource.ordering).values(*set(lookups) | set(keys))[
+                : limit + 1
+            ]
+        )
+    except (OverflowError, DataError):
+        # Значение курсора прошло проверки, но не подошло СУБД
+        raise ApiError("Некорректный курсор")
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1][key] for key in keys])
+    results = [{name: row[lookup] for lookup, name in lookups.items()} for row in rows]
+    return results, next_cursor
+
+
+def _limit(request):
+    value = request.GET.get("limit", "")
+    if not value:
+        return DEFAULT_LIMIT
+    if not value.isdigit() or not 1 <= int(value) <= MAX_LIMIT:
+        raise ApiError(f"limit должен быть от 1 до {MAX_LIMIT}")
+    return int(value)
+
+
+def _page_response(request, queryset, resource):
+    try:
+        results, next_cursor = keyset_page(
+            queryset,
+            resource,
+            resource.select(request.GET.get("fields")),
+            request.GET.get("cursor"),
+            _limit(request),
+        )
+    except ApiError as error:
+        return JsonResponse({"error": str(error)}, status=error.status)
+    return JsonResponse({"results": results, "next": next_cursor})
+
+
+def _error(message, status):
+    return JsonResponse({"error": message}, status=status)
+
+
+@require_GET
+def bookings(request):
+    """Записи клиента (персоналу — все), новые сначала."""
+    user = request.user
+    if not user.is_authenticated:
+        return _error("Требуется вход", 401)
+    queryset = Booking.objects.all()
+    if not user.is_staff:
+        queryset = queryset.filter(customer__user=user)
+    if request.GET.get("status"):
+        queryset = queryset.filter(status=request.GET["status"])
+    if request.GET.get("date"):
+        try:
+            day = parse_date(request.GET["date"])
+        except ValueError:
+            day = None
+        if day is None:
+            return _error("Некорректная дата", 400)
+        queryset = queryset.filter(booking_date=day)
+    return _page_response(request, queryset, BOOKINGS)
+
+
+@require_GET
+def services(request):
+    """Активные услуги."""
+    return _page_response(request, Service.objects.filter(is_active=True), SERVICES)
+
+
+@require_GET
+def boxes(request):
+    """Активные боксы (для персонала)."""
+    if not request.user.is_authenticated:
+        return _error("Требуется вход", 401)
+    if not request.user.is_staff:
+        return _error("Доступ только для персонала", 403)
+    return _page_response(request, Box.objects.filter(is_active=True), BOXES)
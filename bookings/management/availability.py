@@ -0,0 +1,235 @@
+"""
+Движок доступности боксов.
+
+Для каждого дня держим в памяти индекс занятости: по каждому боксу массив
+счетчиков машин на 5-минутных слотах рабочего дня. Индекс собирается из
+строк сетки BoxOccupancy (одна строка на бокс) и сбрасывается сигналами при
+изменении записей и боксов, поэтому проверка формы и поиск свободного
+времени не перечитывают таблицу записей.
+"""
+
+import threading
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Booking, Box, BoxOccupancy
+from .occupancy import (
+    SLOT_MINUTES,
+    SLOTS_PER_DAY,
+    decode,
+    empty_slots,
+    slot_range,
+    slot_time,
+)
+
+CACHE_DAYS = getattr(settings, "BOOKING_AVAILABILITY_CACHE_DAYS", 60)
+
+
+def _free_runs(counts, capacity):
+    """Для каждого слота — сколько подряд идущих слотов с него свободно."""
+    runs = [0] * (len(counts) + 1)
+    for slot in range(len(counts) - 1, -1, -1):
+        if counts[slot] < capacity:
+            runs[slot] = runs[slot + 1] + 1
+    return runs
+
+
+class DayIndex:
+    """Занятость боксов за один день."""
+
+    def __init__(self, day, boxes):
+        self.day = day
+        self.version = None
+        self.capacity = {}
+        self.box_types = {}
+        for box_id, capacity, *box_type in boxes:
+            self.capacity[box_id] = capacity
+            self.box_types[box_id] = box_type[0] if box_type else ""
+        self.total_capacity = sum(self.capacity.values())
+        self.slots = {box_id: empty_slots() for box_id in self.capacity}
+        # Общая загрузка, включая записи, которым бокс еще не назначен
+        self.total = empty_slots()
+
+    def load(self, box_id, slots):
+        """Добавить в индекс готовую строку сетки занятости."""
+        counts = self.slots.get(box_id)
+        for slot, count in enumerate(slots):
+            if count:
+                self.total[slot] += count
+                if counts is not None:
+                    counts[slot] += count
+
+    def _apply(self, box_id, first, last, delta):
+        first, last = max(first, 0), min(last, SLOTS_PER_DAY)
+        counts = self.slots.get(box_id)
+        for slot in range(first, last):
+            self.total[slot] += delta
+            if counts is not None:
+                counts[slot] += delta
+
+    def add(self, box_id, start, duration):
+        self._apply(box_id, *slot_range(start, duration), 1)
+
+    def remove(self, box_id, start, duration):
+        self._apply(box_id, *slot_range(start, duration), -1)
+
+    def box_ids_for(self, box_type):
+        """Боксы, подходящие для услуги с требуемым типом бокса."""
+        if not box_type:
+            return list(self.capacity)
+        return [box_id for box_id, value in self.box_types.items() if value == box_type]
+
+    def find_box(self, start, duration, box_ids=None):
+        """Первый бокс, в который помещается услуга, или None."""
+        first, last = slot_range(start, duration)
+        if first < 0 or last > SLOTS_PER_DAY or first >= last:
+            return None
+        if any(self.total[slot] >= self.total_capacity for slot in range(first, last)):
+            return None
+        for box_id in box_ids if box_ids is not None else self.capacity:
+            counts = self.slots.get(box_id)
+            if counts is None:
+                continue
+            capacity = self.capacity[box_id]
+            if all(counts[slot] < capacity for slot in range(first, last)):
+                return box_id
+        return None
+
+    def free_starts(self, duration, box_ids=None):
+        """Все слоты, с которых можно начать услугу заданной длительности."""
+        need = -(-duration // SLOT_MINUTES)
+        total_runs = _free_runs(self.total, self.total_capacity)
+        box_runs = [
+            _free_runs(self.slots[box_id], self.capacity[box_id])
+            for box_id in (box_ids if box_ids is not None else self.capacity)
+            if box_id in self.slots
+        ]
+        return [
+            slot
+            for slot in range(SLOTS_PER_DAY - need + 1)
+            if total_runs[slot] >= need and any(runs[slot] >= need for runs in box_runs)
+        ]
+
+
+_indexes = OrderedDict()
+_lock = threading.RLock()
+
+
+def build_index(day, boxes, rows):
+    """Индекс дня по боксам (id, capacity) и строкам сетки (box_id, slots)."""
+    index = DayIndex(day, boxes)
+    for box_id, data in rows:
+        index.load(box_id, decode(data))
+    return index
+
+
+def _build_index(day):
+    boxes = Box.objects.filter(is_active=True).values_list("id", "capacity", "box_type")
+    # Одна строка сетки на бокс вместо агрегации записей за день
+    rows = BoxOccupancy.objects.filter(date=day).values_list("box_id", "slots")
+    return build_index(day, boxes, rows)
+
+
+def _version_keys(day):
+    return "availability:all", f"availability:{day}"
+
+
+def _current_version(day):
+    # Версии лежат в общем кэше, чтобы изменения, сделанные другими
+    # процессами, тоже сбрасывали локальный индекс
+    versions = cache.get_many(_version_keys(day))
+    return tuple(versions.get(key) for key in _version_keys(day))
+
+
+def get_day_index(day):
+    version = _current_version(day)
+    with _lock:
+        index = _indexes.get(day)
+        if index is not None and index.version == version:
+            _indexes.move_to_end(day)
+            return index
+    index = _build_index(day)
+    index.version = version
+    with _lock:
+        _indexes[day] = index
+        while len(_indexes) > CACHE_DAYS:
+            _indexes.popitem(last=False)
+    return index
+
+
+def invalidate(*days):
+    """Сбросить индекс указанных дней (без аргументов — всех)."""
+    keys = [_version_keys(day)[1] for day in days] or [_version_keys(None)[0]]
+    cache.set_many({key: uuid.uuid4().hex for key in keys}, None)
+    with _lock:
+        if not days:
+            _indexes.clear()
+        for day in days:
+            _indexes.pop(day, None)
+
+
+def find_box(service, day, start, exclude=None):
+    """
+    Бокс, в который помещается услуга, или None.
+
+    ``exclude`` — редактируемая запись: ее собственное место не считается
+    занятым.
+    """
+    index = get_day_index(day)
+    released = saved_footprint(exclude, day)
+    with _lock:
+        if released:
+            index.remove(*released)
+        try:
+            return index.find_box(
+                start, service.duration, index.box_ids_for(service.box_type)
+            )
+        finally:
+            if released:
+                index.add(*released)
+
+
+def can_fit(service, day, start, exclude=None):
+    if not get_day_index(day).capacity:
+        # Боксы не заведены — ограничение по вместимости не применяется
+        return True
+    return find_box(service, day, start, exclude=exclude) is not None
+
+
+def free_slots(service, day):
+    """Время начала, на которое можно записаться на услугу в этот день."""
+    index = get_day_index(day)
+    if not index.capacity:
+        return []
+    with _lock:
+        starts = index.free_starts(
+            service.duration, index.box_ids_for(service.box_type)
+        )
+        return [slot_time(slot) for slot in starts]
+
+
+def is_within_opening_hours(start, duration):
+    first, last = slot_range(start, duration)
+    return 0 <= first and last <= SLOTS_PER_DAY
+
+
+def saved_footprint(booking, day):
+    """Место, которое сохраненная запись занимает в индексе дня ``day``."""
+    if booking is None or booking.pk is None:
+        return None
+    loaded = getattr(booking, "_loaded_values", None)
+    if not loaded or loaded.get("booking_date") != day:
+        return None
+    if loaded.get("status") not in Booking.ACTIVE_STATUSES:
+        return None
+    duration = (
+        Booking.objects.filter(pk=booking.pk)
+        .values_list("service__duration", flat=True)
+        .first()
+    )
+    if duration is None:
+        return None
+    return loaded.get("box_id"), loaded["booking_time"], duration
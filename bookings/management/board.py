@@ -0,0 +1,120 @@
+"""
+Доска персонала: записи дня по боксам и массовая смена статусов.
+
+Доска собирается одним запросом с join-ами в словари, без моделей. Смена
+статусов проверяет допустимость переходов по Booking.TRANSITIONS и
+выполняется одним UPDATE на каждый целевой статус.
+"""
+
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from . import rollups
+from .models import Booking
+
+BOARD_FIELDS = (
+    "id",
+    "booking_time",
+    "status",
+    "total_price",
+    "notes",
+    "box_id",
+    "box__number",
+    "box__box_type",
+    "service__name",
+    "service__duration",
+    "customer__phone",
+    "customer__car_model",
+    "customer__car_number",
+    "customer__user__username",
+    "employee__user__username",
+)
+
+
+def day_board(day):
+    """Записи дня, сгруппированные по боксам (записи без бокса — в конце)."""
+    rows = (
+        Booking.objects.filter(booking_date=day)
+        .order_by("box__number", "booking_time")
+        .values_list(*BOARD_FIELDS)
+    )
+    boxes = {}
+    for row in rows:
+        row = dict(zip(BOARD_FIELDS, row))
+        box_id = row["box_id"]
+        if box_id not in boxes:
+            boxes[box_id] = {
+                "id": box_id,
+                "number": row["box__number"],
+                "box_type": row["box__box_type"],
+                "bookings": [],
+            }
+        boxes[box_id]["bookings"].append(
+            {
+                "id": row["id"],
+                "time": row["booking_time"].strftime("%H:%M"),
+                "duration": row["service__duration"],
+                "status": row["status"],
+                "service": row["service__name"],
+                "customer": row["customer__user__username"],
+                "phone": row["customer__phone"],
+                "car": " ".join(
+                    filter(
+                        None, (row["customer__car_model"], row["customer__car_number"])
+                    )
+                ),
+                "employee": row["employee__user__username"],
+                "total_price": str(row["total_price"]),
+                "notes": row["notes"],
+            }
+        )
+    # NULL разные СУБД сортируют по-разному, поэтому записи без бокса
+    # переносим в конец сами
+    ordered = sorted(
+        boxes.values(), key=lambda box: (box["id"] is None, box["number"] or 0)
+    )
+    return {"date": day.isoformat(), "boxes": ordered}
+
+
+def apply_transitions(transitions):
+    """
+    Сменить статусы записей: ``transitions`` — {id записи: новый статус}.
+
+    Либо применяются все переходы, либо ни один: при недопустимом переходе
+    или неизвестной записи выбрасывается ValidationError со списком ошибок.
+    Возвращает {статус: число обновленных записей}.
+    """
+    with transaction.atomic():
+        rows = {
+            row[0]: row
+            for row in Booking.objects.select_for_update()
+            .filter(pk__in=transitions)
+            .order_by()
+            .values_list("id", *rollups.KEY_FIELDS, "total_price")
+        }
+        current = {booking_id: row[4] for booking_id, row in rows.items()}
+        errors = []
+        by_target = defaultdict(list)
+        for booking_id, target in transitions.items():
+            status = current.get(booking_id)
+            if status is None:
+                errors.append(f"Запись {booking_id} не найдена")
+            elif target == status:
+                continue
+            elif target not in Booking.TRANSITIONS[status]:
+                errors.append(
+                    f"Запись {booking_id}: переход {status} → {target} недопустим"
+                )
+            else:
+                by_target[target].append(booking_id)
+        if errors:
+            raise ValidationError(errors)
+        updated = {}
+        for target, ids in by_target.items():
+            # Строки уже прочитаны под блокировкой — повторно их не читаем
+            updated[target] = Booking.objects.filter(pk__in=ids).apply_status(
+                target, [rows[booking_id] for booking_id in ids]
+            )
+        return updated
@@ -0,0 +1,124 @@
+"""
+Сохранение записи без гонок.
+
+Проверка свободного места и вставка записи выполняются в одной транзакции
+под блокировкой строк сетки занятости за день (BoxOccupancy). На PostgreSQL
+строки блокируются через select_for_update; SQLite его не поддерживает, но
+сериализует писателей — там блокировка записи берется первой же
+модифицирующей командой. Ошибки блокировок повторяются ограниченное число
+раз с экспоненциальной задержкой. Бокс и мойщик назначаются планировщиком
+(scheduler.py) под той же блокировкой.
+"""
+
+import random
+import time
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import OperationalError, connection, transaction
+from django.db.models import F
+
+from .availability import build_index, saved_footprint
+from .models import Box, BoxOccupancy
+from .occupancy import empty_slots, encode
+from .scheduler import DayScheduler
+
+RETRIES = getattr(settings, "BOOKING_COMMIT_RETRIES", 10)
+BACKOFF = getattr(settings, "BOOKING_COMMIT_BACKOFF", 0.01)
+MAX_BACKOFF = getattr(settings, "BOOKING_COMMIT_MAX_BACKOFF", 0.5)
+
+
+class SlotUnavailable(ValidationError):
+    """На выбранное время нет свободного места."""
+
+
+class BookingBusy(ValidationError):
+    """Не удалось дождаться блокировки дня за отведенное число попыток."""
+
+
+def lock_day(day, box_ids):
+    """Заблокировать строки сетки всех боксов дня и вернуть их."""
+    if not connection.features.has_select_for_update:
+        # SQLite: первая же запись берет блокировку базы до конца транзакции
+        BoxOccupancy.objects.filter(date=day).update(slots=F("slots"))
+    BoxOccupancy.objects.bulk_create(
+        [
+            BoxOccupancy(box_id=box_id, date=day, slots=encode(empty_slots()))
+            for box_id in [*box_ids, None]
+        ],
+        ignore_conflicts=True,
+    )
+    return list(
+        BoxOccupancy.objects.select_for_update()
+        .filter(date=day)
+        .order_by("pk")
+        .values_list("box_id", "slots")
+    )
+
+
+def _check(booking, boxes):
+    """Проверить место под блокировкой дня и назначить бокс и мойщика."""
+    day = booking.booking_date
+    rows = lock_day(day, [box_id for box_id, *_ in boxes])
+    index = build_index(day, boxes, rows)
+    if not index.capacity:
+        # Боксы не заведены — ограничение по вместимости не применяется
+        return
+    released = saved_footprint(booking, day)
+    if released:
+        index.remove(*released)
+
+    start, service = booking.booking_time, booking.service
+    scheduler = DayScheduler.from_index(index, exclude=booking.pk)
+    box_id = booking.box_id
+    if box_id is None or index.find_box(start, service.duration, [box_id]) is None:
+        box_id = scheduler.pick_box(start, service.duration, service.box_type)
+    if box_id is None:
+        raise SlotUnavailable(
+            "На выбранное время нет свободных боксов. "
+            "Пожалуйста, выберите другое время.",
+            code="slot_unavailable",
+        )
+    booking.box_id = box_id
+    if booking.employee_id is None or not scheduler.employee_is_free(
+        booking.employee_id, start, service.duration
+    ):
+        booking.employee_id = scheduler.pick_employee(start, service.duration)
+
+
+def commit_booking(booking, retries=None):
+    """
+    Проверить свободное место и сохранить запись атомарно.
+
+    Бросает SlotUnavailable, если места нет, и BookingBusy, если день
+    так и не удалось заблокировать.
+    """
+    retries = RETRIES if retries is None else retries
+    adding = booking._state.adding
+    booking.booking_date = booking._meta.get_field("booking_date").to_python(
+        booking.booking_date
+    )
+    booking.booking_time = booking._meta.get_field("booking_time").to_python(
+        booking.booking_time
+    )
+    boxes = list(
+        Box.objects.filter(is_active=True).values_list("id", "capacity", "box_type")
+    )
+    for attempt in range(retries + 1):
+        try:
+            with transaction.atomic():
+                _check(booking, boxes)
+                booking.save()
+            return booking
+        except OperationalError:
+            if adding:
+                booking.pk = None
+                booking._state.adding = True
+            if attempt == retries:
+                raise BookingBusy(
+                    "Сейчас слишком много записей на это время. "
+                    "Пожалуйста, попробуйте еще раз.",
+                    code="busy",
+                )
+            delay = min(MAX_BACKOFF, BACKOFF * 2**attempt)
+            time.sleep(random.uniform(0, delay))
@@ -0,0 +1,158 @@
+"""
+Рассылка изменений записей подписчикам внутри процесса.
+
+Изменение записи публикуется один раз (после коммита транзакции), а брокер
+раскладывает его по очередям всех подписчиков этого дня: экраны боксов
+получают события, не обращаясь к БД. Публиковать можно из любого потока —
+события передаются в цикл событий подписчика через call_soon_threadsafe.
+Брокер живет в памяти процесса: при нескольких процессах ASGI каждый
+рассылает только изменения, сделанные в нем самом.
+"""
+
+import asyncio
+import threading
+from collections import defaultdict
+
+from django.db import transaction
+
+from .models import Booking
+
+# Поля записи, об изменении которых сообщают экранам
+TRACKED_FIELDS = ("status", "box_id", "employee_id", "booking_date", "booking_time")
+
+
+class Subscription:
+    def __init__(self, day, maxsize):
+        self.day = day
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+
+    def put(self, event):
+        # Выполняется в цикле подписчика
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Клиент не успевает читать — пусть перечитает доску целиком
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"event": "resync"})
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class Broker:
+    def __init__(self, maxsize=100):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, day):
+        subscription = Subscription(day, self.maxsize)
+        with self._lock:
+            self._subscribers[day].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.day)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.day]
+
+    def subscribers(self, day=None):
+        with self._lock:
+            if day is not None:
+                return len(self._subscribers.get(day, ()))
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def publish(self, day, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(day, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, event)
+            except RuntimeError:
+                # Цикл подписчика уже закрыт
+                self.unsubscribe(subscription)
+
+
+broker = Broker()
+
+
+def _payload(booking, event, changes=()):
+    return {
+        "event": event,
+        "id": booking.pk,
+        "changes": list(changes),
+        "date": str(booking.booking_date),
+        "time": str(booking.booking_time)[:5],
+        "status": booking.status,
+        "box_id": booking.box_id,
+        "employee_id": booking.employee_id,
+    }
+
+
+def publish(days, payload):
+    """Разослать событие подписчикам дней после коммита транзакции."""
+    days = {str(day) for day in days}
+
+    def send():
+        for day in days:
+            broker.publish(day, payload)
+
+    transaction.on_commit(send)
+
+
+def changed_fields(booking):
+    loaded = getattr(booking, "_loaded_values", None) or {}
+    changes = []
+    for attname in TRACKED_FIELDS:
+        field = Booking._meta.get_field(attname)
+        value = field.to_python(getattr(booking, attname))
+        if attname in loaded and loaded[attname] != value:
+            changes.append(field.name)
+    return changes
+
+
+def booking_saved(booking, created, days):
+    if created:
+        publish(days, _payload(booking, "created"))
+        return
+    changes = changed_fields(booking)
+    if changes:
+        publish(days, _payload(booking, "updated", changes))
+
+
+def booking_deleted(booking, days):
+    publish(days, _payload(booking, "deleted"))
+
+
+def bookings_updated(bookings, fields):
+    """
+    События для массовых изменений, прошедших в обход сигналов.
+
+    Объекты могут быть неполными, поэтому в событие попадают только
+    измененные поля и дата.
+    """
+    names = [
+        booking_field.name
+        for booking_field in map(Booking._meta.get_field, fields)
+        if booking_field.attname in TRACKED_FIELDS
+    ]
+    if not names:
+        return
+    for booking in bookings:
+        payload = {
+            "event": "updated",
+            "id": booking.pk,
+            "changes": names,
+            "date": str(booking.booking_date),
+        }
+        for name in names:
+            value = getattr(booking, Booking._meta.get_field(name).attname)
+            payload[name] = (
+                value if isinstance(value, (int, type(None))) else str(value)
+            )
+        publish([booking.booking_date], payload)
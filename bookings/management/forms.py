@@ -2,6 +2,7 @@ from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
 from .models import Booking
+from . import availability
 
 
 class UserRegistrationForm(UserCreationForm):
@@ -38,3 +39,22 @@ class BookingForm(forms.ModelForm):
             "booking_date": forms.DateInput(attrs={"type": "date"}),
             "booking_time": forms.TimeInput(attrs={"type": "time"}),
         }
+
+    def clean(self):
+        cleaned_data = super().clean()
+        service = cleaned_data.get("service")
+        booking_date = cleaned_data.get("booking_date")
+        booking_time = cleaned_data.get("booking_time")
+        if service and booking_date and booking_time:
+            if not availability.is_within_opening_hours(booking_time, service.duration):
+                raise forms.ValidationError(
+                    "Услуга не укладывается в часы работы автомойки."
+                )
+            if not availability.can_fit(
+                service, booking_date, booking_time, exclude=self.instance
+            ):
+                raise forms.ValidationError(
+                    "На выбранное время нет свободных боксов. "
+                    "Пожалуйста, выберите другое время."
+                )
+        return cleaned_data
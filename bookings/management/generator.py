@@ -0,0 +1,396 @@
+"""
+Генератор синтетических данных для нагрузочных проверок.
+
+Клиенты, мойщики и записи создаются пачками через bulk_create, поэтому
+миллионы записей генерируются за минуты. Распределение похоже на
+настоящее: в выходные записей больше, внутри дня — пики утром и вечером,
+популярные услуги встречаются чаще. При одном и том же ``seed`` данные
+получаются одинаковыми.
+
+Записи расставляются по боксам жадно по времени начала с учетом
+вместимости и типа бокса; запись, которой не хватило места, остается без
+бокса. Сетка занятости и дневные сводки пересобираются один раз в конце.
+"""
+
+import heapq
+import random
+from datetime import time, timedelta
+from time import perf_counter
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+from faker import Faker
+
+from customers.models import Customer
+from employees.models import Employee, Position
+from services.models import Service, ServiceCategory
+
+from . import availability, occupancy, rollups
+from .models import Booking, Box
+
+BATCH_SIZE = 1000
+
+CATEGORIES = [
+    ("Мойка кузова", "Наружная мойка автомобиля", 1),
+    ("Чистка салона", "Внутренняя уборка", 2),
+    ("Полировка", "Полировка кузова", 3),
+    ("Дополнительные услуги", "Прочие услуги", 4),
+]
+# Название, описание, цена, длительность, категория, тип бокса, популярность
+SERVICES = [
+    ("Экспресс-мойка", "Быстрая мойка", 500, 15, "Мойка кузова", "", 30),
+    ("Стандартная мойка", "Полная мойка", 1000, 30, "Мойка кузова", "", 35),
+    ("Комплексная мойка", "Мойка + сушка", 1500, 45, "Мойка кузова", "", 15),
+    ("Чистка салона", "Вакуумная чистка", 800, 40, "Чистка салона", "", 10),
+    ("Химчистка салона", "Глубокая чистка", 2500, 120, "Чистка салона", "", 4),
+    (
+        "Полировка кузова",
+        "Восстановительная полировка",
+        6000,
+        180,
+        "Полировка",
+        "premium",
+        2,
+    ),
+    ("Нанесение воска", "Защитное покрытие", 700, 20, "Дополнительные услуги", "", 4),
+]
+POSITIONS = ["Мойщик", "Администратор", "Менеджер"]
+CAR_MODELS = [
+    "Lada Vesta",
+    "Lada Granta",
+    "Kia Rio",
+    "Hyundai Solaris",
+    "Volkswagen Polo",
+    "Skoda Octavia",
+    "Toyota Camry",
+    "Renault Logan",
+    "Haval Jolion",
+    "BMW X5",
+]
+DISCOUNTS = [0, 0, 0, 0, 0, 0, 5, 5, 10, 15, 20]
+# Доля записей по дням недели (пн — вс) и по часам работы
+WEEKDAY_WEIGHTS = [0.8, 0.75, 0.8, 0.85, 1.1, 1.6, 1.45]
+HOUR_WEIGHTS = {
+    8: 0.9,
+    9: 1.2,
+    10: 1.1,
+    11: 0.8,
+    12: 0.7,
+    13: 0.7,
+    14: 0.7,
+    15: 0.8,
+    16: 1.0,
+    17: 1.4,
+    18: 1.6,
+    19: 1.4,
+    20: 0.9,
+    21: 0.4,
+}
+
+
+def create_catalog(boxes=4):
+    """Категории, услуги, должности и ``boxes`` боксов, если их еще нет."""
+    categories = {}
+    for name, description, order in CATEGORIES:
+        categories[name], _ = ServiceCategory.objects.get_or_create(
+            name=name, defaults={"description": description, "order": order}
+        )
+    for name, description, price, duration, category, box_type, _ in SERVICES:
+        Service.objects.get_or_create(
+            name=name,
+            defaults={
+                "description": description,
+                "price": price,
+                "duration": duration,
+                "category": categories[category],
+                "box_type": box_type,
+            },
+        )
+    for number in range(1, boxes + 1):
+        Box.objects.get_or_create(
+            number=number,
+            defaults={
+                # Каждый четвертый бокс — премиум
+                "box_type": "premium" if number % 4 == 0 else "standard",
+                "capacity": 2,
+            },
+        )
+    for name in POSITIONS:
+        Position.objects.get_or_create(name=name)
+
+
+class Generator:
+    """Генерация клиентов, мойщиков и записей с воспроизводимым seed."""
+
+    def __init__(self, seed=0, batch_size=BATCH_SIZE, log=None):
+        self.random = random.Random(seed)
+        self.faker = Faker("ru_RU")
+        self.faker.seed_instance(seed)
+        self.seed = seed
+        self.batch_size = batch_size
+        self.log = log or (lambda message: None)
+        # Пароль у всех сгенерированных пользователей один и тот же:
+        # хешировать его для каждого — самая медленная часть создания
+        self.password = make_password(None)
+
+    def _users(self, prefix, count):
+        fake = self.faker
+        users = [
+            User(
+                username=f"{prefix}{self.seed}_{number}",
+                first_name=fake.first_name(),
+                last_name=fake.last_name(),
+                email=fake.free_email(),
+                password=self.password,
+            )
+            for number in range(count)
+        ]
+        User.objects.bulk_create(
+            users, batch_size=self.batch_size, ignore_conflicts=True
+        )
+        # SQLite не возвращает id из bulk_create — перечитываем по логинам
+        names = [user.username for user in users]
+        ids = {}
+        for start in range(0, len(names), self.batch_size):
+            ids.update(
+                User.objects.filter(
+                    username__in=names[start : start + self.batch_size]
+                ).values_list("username", "id")
+            )
+        return [ids[name] for name in names]
+
+    def customers(self, count):
+        """Создать клиентов; возвращает [(id, скидка)]."""
+        fake = self.faker
+        user_ids = self._users("client", count)
+        Customer.objects.bulk_create(
+            [
+                Customer(
+                    user_id=user_id,
+                    phone=fake.phone_number(),
+                    car_model=self.random.choice(CAR_MODELS),
+                    car_number=fake.license_plate(),
+                    discount=self.random.choice(DISCOUNTS),
+                )
+                for user_id in user_ids
+            ],
+            batch_size=self.batch_size,
+            ignore_conflicts=True,
+        )
+        customers = []
+        for start in range(0, len(user_ids), self.batch_size):
+            customers.extend(
+                Customer.objects.filter(
+                    user_id__in=user_ids[start : start + self.batch_size]
+                )
+                .order_by("id")
+                .values_list("id", "discount")
+            )
+        self.log(f"Клиентов: {len(customers)}")
+        return customers
+
+    def employees(self, count, hire_date):
+        """Создать мойщиков; возвращает их id."""
+        fake = self.faker
+        position, _ = Position.objects.get_or_create(name="Мойщик")
+        user_ids = self._users("washer", count)
+        Employee.objects.bulk_create(
+            [
+                Employee(
+                    user_id=user_id,
+                    position=position,
+                    phone=fake.phone_number(),
+                    hire_date=hire_date,
+                )
+                for user_id in user_ids
+            ],
+            ignore_conflicts=True,
+        )
+        ids = list(
+            Employee.objects.filter(user_id__in=user_ids)
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+        self.log(f"Мойщиков: {len(ids)}")
+        return ids
+
+    def day_counts(self, start, days, total):
+        """Число записей на каждый день периода с учетом дня недели."""
+        weights = [
+            WEEKDAY_WEIGHTS[(start + timedelta(days=offset)).weekday()]
+            for offset in range(days)
+        ]
+        scale = total / sum(weights)
+        counts = [int(weight * scale) for weight in weights]
+        # Остаток от округления раздаем случайным дням пропорционально весам
+        for offset in self.random.choices(
+            range(days), weights=weights, k=total - sum(counts)
+        ):
+            counts[offset] += 1
+        return counts
+
+    def start_time(self, duration):
+        """Время начала: час по весам пиков, минуты — по сетке слотов."""
+        hours = list(HOUR_WEIGHTS)
+        hour = self.random.choices(hours, weights=list(HOUR_WEIGHTS.values()))[0]
+        minute = self.random.randrange(0, 60, occupancy.SLOT_MINUTES)
+        start = hour * 60 + minute
+        close = occupancy.CLOSE_TIME.hour * 60 + occupancy.CLOSE_TIME.minute
+        start = min(start, close - duration)
+        start -= start % occupancy.SLOT_MINUTES
+        return time(start // 60, start % 60)
+
+    def status(self, day, today):
+        if day < today:
+            return self.random.choices(
+                ("completed", "cancelled", "pending"), weights=(86, 12, 2)
+            )[0]
+        if day == today:
+            return self.random.choices(
+                ("completed", "in_progress", "confirmed", "cancelled"),
+                weights=(40, 15, 40, 5),
+            )[0]
+        return self.random.choices(
+            ("pending", "confirmed", "cancelled"), weights=(55, 35, 10)
+        )[0]
+
+    def bookings(self, total, start, days, customers, employees, today=None):
+        """
+        Создать ``total`` записей за ``days`` дней начиная со ``start``.
+
+        ``customers`` — [(id, скидка)], ``employees`` — id мойщиков.
+        Возвращает число созданных записей.
+        """
+        today = today or timezone.localdate()
+        services = list(Service.objects.filter(is_active=True))
+        popularity = {row[0]: row[6] for row in SERVICES}
+        service_weights = [popularity.get(service.name, 5) for service in services]
+        boxes = list(
+            Box.objects.filter(is_active=True).values_list("id", "capacity", "box_type")
+        )
+        stub_customers = [
+            Customer(pk=customer_id, discount=discount)
+            for customer_id, discount in customers
+        ]
+        created = 0
+        pending = []
+        for offset, count in enumerate(self.day_counts(start, days, total)):
+            day = start + timedelta(days=offset)
+            pending.extend(
+                self._day(
+                    day,
+                    count,
+                    services,
+                    service_weights,
+                    boxes,
+                    today,
+                    stub_customers,
+                    employees,
+                )
+            )
+            if len(pending) >= self.batch_size:
+                created += self._save(pending)
+                pending = []
+                self.log(f"{day}: записей {created}")
+        if pending:
+            created += self._save(pending)
+        end = start + timedelta(days=days - 1)
+        occupancy.rebuild(start, end)
+        rollups.rebuild(start, end)
+        availability.invalidate()
+        return created
+
+    def _day(self, day, count, services, weights, boxes, today, customers, employees):
+        rng = self.random
+        rows = []
+        for service in rng.choices(services, weights=weights, k=count):
+            rows.append((self.start_time(service.duration), service))
+        rows.sort(key=lambda row: row[0])
+
+        # Дорожки боксов: куча (минута освобождения, id бокса) по типам
+        lanes = {}
+        for box_id, capacity, box_type in boxes:
+            lanes.setdefault(box_type, []).extend([(0, box_id)] * capacity)
+        for heap in lanes.values():
+            heapq.heapify(heap)
+
+        bookings = []
+        for start, service in rows:
+            status = self.status(day, today)
+            minute = start.hour * 60 + start.minute
+            box_id = None
+            types = [service.box_type] if service.box_type else list(lanes)
+            types = [box_type for box_type in types if box_type in lanes]
+            for box_type in sorted(types, key=lambda name: lanes[name][0][0]):
+                heap = lanes[box_type]
+                if heap[0][0] <= minute:
+                    _, box_id = heap[0]
+                    if status != "cancelled":
+                        heapq.heapreplace(heap, (minute + service.duration, box_id))
+                    break
+            employee = None
+            if employees and status in ("in_progress", "completed"):
+                employee = rng.choice(employees)
+            bookings.append(
+                Booking(
+                    customer=rng.choice(customers),
+                    service=service,
+                    employee_id=employee,
+                    box_id=box_id,
+                    booking_date=day,
+                    booking_time=start,
+                    status=status,
+                )
+            )
+        return bookings
+
+    def _save(self, bookings):
+        with transaction.atomic():
+            # Цены считаются по уже загруженным услугам и клиентам без запросов
+            Booking.objects.bulk_create(
+                bookings, batch_size=self.batch_size, refresh_occupancy=False
+            )
+        return len(bookings)
+
+
+def generate(
+    customers,
+    bookings,
+    days,
+    employees=20,
+    boxes=4,
+    seed=0,
+    end=None,
+    batch_size=BATCH_SIZE,
+    log=None,
+):
+    """
+    Сгенерировать данные: каталог, клиентов, мойщиков и записи.
+
+    Записи распределяются по ``days`` дням, последний из которых — ``end``
+    (по умолчанию через 30 дней от сегодняшнего, чтобы были и будущие
+    записи). Возвращает словарь со статистикой.
+    """
+    started = perf_counter()
+    today = timezone.localdate()
+    end = end or today + timedelta(days=30)
+    start = end - timedelta(days=days - 1)
+    create_catalog(boxes)
+    generator = Generator(seed, batch_size, log)
+    customer_rows = generator.customers(customers)
+    employee_ids = generator.employees(employees, start)
+    created = generator.bookings(
+        bookings, start, days, customer_rows, employee_ids, today
+    )
+    seconds = perf_counter() - started
+    return {
+        "customers": len(customer_rows),
+        "employees": len(employee_ids),
+        "bookings": created,
+        "date_from": start,
+        "date_to": end,
+        "seconds": round(seconds, 1),
+        "rows_per_s": round(created / seconds) if seconds else created,
+    }
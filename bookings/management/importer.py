@@ -0,0 +1,366 @@
+"""
+Потоковый импорт услуг, клиентов и записей из CSV или JSONL.
+
+Строки читаются и обрабатываются пачками: каждая пачка разрешает ссылки
+(клиент по телефону или логину, услуга по названию, бокс по номеру) одним
+запросом на вид ссылки и вставляется через bulk_create в своей транзакции.
+Памяти нужно на одну пачку и словари поиска; словарь клиентов ограничен и
+при переполнении сбрасывается, поэтому импорт миллиона строк не растет по
+памяти. Неподходящие строки не прерывают импорт, а возвращаются с причиной.
+"""
+
+import csv
+import json
+import time as timer
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils.dateparse import parse_date, parse_time
+
+from customers.models import Customer
+from pages import cache as page_cache
+from services import catalog
+from services.models import Service, ServiceCategory
+
+from . import availability, occupancy, rollups
+from .models import Booking, Box
+
+CHUNK_SIZE = 2000
+# Сколько клиентов держать в словаре поиска между пачками
+CUSTOMER_CACHE_SIZE = 100000
+# Услуга длиннее рабочего дня — ошибка в файле
+MAX_DURATION = 24 * 60
+
+
+class RowError(Exception):
+    pass
+
+
+def read_rows(path, fmt=None):
+    """Строки файла как словари; формат — по расширению, если не указан."""
+    fmt = fmt or ("jsonl" if str(path).endswith((".jsonl", ".ndjson")) else "csv")
+    with open(path, newline="", encoding="utf-8") as source:
+        if fmt == "csv":
+            yield from csv.DictReader(source)
+            return
+        for line in source:
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    yield {"__error__": "Некорректная строка JSON"}
+
+
+def chunked(rows, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _text(row, name, required=True):
+    value = row.get(name)
+    value = "" if value is None else str(value).strip()
+    if required and not value:
+        raise RowError(f"Не заполнено поле {name}")
+    return value
+
+
+def _number(row, name, kind=int, required=True, default=None):
+    value = _text(row, name, required)
+    if not value:
+        return default
+    try:
+        return kind(value)
+    except (ValueError, InvalidOperation):
+        raise RowError(f"Некорректное значение {name}: {value}")
+
+
+def _clean(obj, exclude=()):
+    """Проверки полей модели (длина, диапазон, выбор) до записи в базу."""
+    try:
+        obj.clean_fields(exclude=exclude)
+    except ValidationError as error:
+        raise RowError(
+            "; ".join(
+                f"{name}: {' '.join(messages)}"
+                for name, messages in error.message_dict.items()
+            )
+        )
+
+
+class Importer:
+    """Разбор пачки строк в объекты и их сохранение."""
+
+    model = None
+
+    def build(self, row):
+        raise NotImplementedError
+
+    def prepare(self, chunk):
+        """Объекты и отклоненные строки (номер, строка, причина)."""
+        self.before_chunk(chunk)
+        objects, rejects = [], []
+        for number, row in chunk:
+            try:
+                if "__error__" in row:
+                    raise RowError(row["__error__"])
+                objects.append(self.build(row))
+            except RowError as error:
+                rejects.append((number, row, str(error)))
+        return objects, rejects
+
+    def before_chunk(self, chunk):
+        pass
+
+    def save(self, objects):
+        self.model.objects.bulk_create(objects, batch_size=500)
+
+    def finish(self):
+        pass
+
+
+class ServiceImporter(Importer):
+    """Колонки: name, category, price, duration[, description, box_type]."""
+
+    model = Service
+
+    def __init__(self):
+        self.categories = dict(ServiceCategory.objects.values_list("name", "id"))
+        self.added = False
+        self.existing = set(Service.objects.values_list("name", flat=True))
+
+    def before_chunk(self, chunk):
+        # Новые категории пачки создаются в ее транзакции, в save
+        self.new_categories = {}
+
+    def build(self, row):
+        name = _text(row, "name")
+        if name in self.existing:
+            raise RowError(f"Услуга уже есть: {name}")
+        category = _text(row, "category")
+        service = Service(
+            name=name,
+            price=_number(row, "price", Decimal),
+            duration=_number(row, "duration"),
+            description=_text(row, "description", required=False),
+            box_type=_text(row, "box_type", required=False),
+        )
+        if service.box_type and service.box_type not in dict(Service.BOX_TYPES):
+            raise RowError(f"Неизвестный тип бокса: {service.box_type}")
+        if not 0 < service.duration <= MAX_DURATION:
+            raise RowError(f"Некорректное значение duration: {service.duration}")
+        _clean(service, exclude=["category"])
+        # Название и категория занимаются только строкой, прошедшей все
+        # проверки: отклоненная не мешает следующей
+        if category in self.categories:
+            service.category_id = self.categories[category]
+        elif category in self.new_categories:
+            service.category = self.new_categories[category]
+        else:
+            new = ServiceCategory(name=category)
+            _clean(new)
+            service.category = self.new_categories[category] = new
+        self.existing.add(name)
+        self.added = True
+        return service
+
+    def save(self, objects):
+        for category in self.new_categories.values():
+            category.save()
+        super().save(objects)
+        # В словарь поиска — только когда пачка записана целиком
+        for name, category in self.new_categories.items():
+            self.categories[name] = category.pk
+
+    def finish(self):
+        # bulk_create идет в обход сигналов, сбрасывающих кэш каталога
+        if self.added:
+            catalog.invalidate()
+            page_cache.invalidate("catalog")
+
+
+class CustomerImporter(Importer):
+    """
+    Колонки: username, phone[, email, first_name, last_name, car_model,
+    car_number, discount]. Пользователи создаются без пароля.
+    """
+
+    model = Customer
+    DISCOUNTS = {value for value, _ in Customer.DISCOUNT_CHOICES}
+
+    def before_chunk(self, chunk):
+        names = {str(row.get("username", "")).strip() for _, row in chunk}
+        self.taken = set(
+            User.objects.filter(username__in=names).values_list("username", flat=True)
+        )
+
+    def build(self, row):
+        username = _text(row, "username")
+        if username in self.taken:
+            raise RowError(f"Пользователь уже есть: {username}")
+        discount = _number(row, "discount", required=False, default=0)
+        if discount not in self.DISCOUNTS:
+            raise RowError(f"Недопустимая скидка: {discount}")
+        user = User(
+            username=username,
+            email=_text(row, "email", required=False),
+            first_name=_text(row, "first_name", required=False),
+            last_name=_text(row, "last_name", required=False),
+        )
+        user.set_unusable_password()
+        customer = Customer(
+            phone=_text(row, "phone"),
+            car_model=_text(row, "car_model", required=False),
+            car_number=_text(row, "car_number", required=False),
+            discount=discount,
+        )
+        _clean(user)
+        _clean(customer, exclude=["user"])
+        self.taken.add(username)
+        customer.user = user
+        return customer
+
+    def save(self, objects):
+        users = [customer.user for customer in objects]
+        User.objects.bulk_create(users, batch_size=500)
+        # bulk_create на SQLite не возвращает ключи — дочитываем их по логинам
+        ids = dict(
+            User.objects.filter(
+                username__in=[user.username for user in users]
+            ).values_list("username", "id")
+        )
+        for customer in objects:
+            customer.user_id = ids[customer.user.username]
+        Customer.objects.bulk_create(objects, batch_size=500)
+
+
+class BookingImporter(Importer):
+    """
+    Колонки: customer (телефон или логин), service (название), date, time
+    [, status, box (номер), notes]. Цены считаются пакетно, сетка занятости
+    пересобирается один раз в конце импорта.
+    """
+
+    model = Booking
+    STATUSES = {value for value, _ in Booking.STATUS_CHOICES}
+
+    def __init__(self):
+        self.services = {
+            service.name: service
+            for service in Service.objects.only("id", "name", "price", "duration")
+        }
+        self.boxes = dict(Box.objects.values_list("number", "id"))
+        self.customers = {}
+        self.first_day = self.last_day = None
+
+    def before_chunk(self, chunk):
+        keys = {str(row.get("customer", "")).strip() for _, row in chunk} - set(
+            self.customers
+        )
+        if len(self.customers) + len(keys) > CUSTOMER_CACHE_SIZE:
+            self.customers.clear()
+        found = Customer.objects.filter(phone__in=keys) | Customer.objects.filter(
+            user__username__in=keys
+        )
+        for customer in found.select_related("user").only(
+            "id", "discount", "phone", "user__username"
+        ):
+            self.customers[customer.phone] = customer
+            self.customers[customer.user.username] = customer
+
+    def build(self, row):
+        key = _text(row, "customer")
+        customer = self.customers.get(key)
+        if customer is None:
+            raise RowError(f"Клиент не найден: {key}")
+        name = _text(row, "service")
+        service = self.services.get(name)
+        if service is None:
+            raise RowError(f"Услуга не найдена: {name}")
+        day = self._parse(parse_date, row, "date")
+        start = self._parse(parse_time, row, "time")
+        status = _text(row, "status", required=False) or "pending"
+        if status not in self.STATUSES:
+            raise RowError(f"Неизвестный статус: {status}")
+        box_id = None
+        box = _number(row, "box", required=False)
+        if box is not None:
+            box_id = self.boxes.get(box)
+            if box_id is None:
+                raise RowError(f"Бокс не найден: {box}")
+        booking = Booking(
+            customer=customer,
+            service=service,
+            box_id=box_id,
+            booking_date=day,
+            booking_time=start,
+            status=status,
+            notes=_text(row, "notes", required=False),
+        )
+        _clean(booking, exclude=["customer", "service", "box", "total_price"])
+        self.first_day = min(day, self.first_day or day)
+        self.last_day = max(day, self.last_day or day)
+        return booking
+
+    def _parse(self, parser, row, name):
+        value = _text(row, name)
+        try:
+            parsed = parser(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise RowError(f"Некорректное значение {name}: {value}")
+        return parsed
+
+    def save(self, objects):
+        Booking.objects.bulk_create(objects, batch_size=500, refresh_occupancy=False)
+
+    def finish(self):
+        if self.first_day:
+            occupancy.rebuild(self.first_day, self.last_day)
+            rollups.rebuild(self.first_day, self.last_day)
+            availability.invalidate()
+
+
+IMPORTERS = {
+    "services": ServiceImporter,
+    "customers": CustomerImporter,
+    "bookings": BookingImporter,
+}
+
+
+def run_import(importer, rows, chunk_size=CHUNK_SIZE, on_chunk=None):
+    """
+    Импортировать строки пачками; каждая пачка — своя транзакция.
+
+    ``on_chunk(stats, rejects)`` вызывается после каждой пачки. Возвращает
+    итоговую статистику: rows, imported, rejected, seconds, rows_per_s.
+    """
+    stats = {"rows": 0, "imported": 0, "rejected": 0}
+    started = timer.perf_counter()
+    for chunk in chunked(enumerate(rows, start=1), chunk_size):
+        objects, rejects = importer.prepare(chunk)
+        with transaction.atomic():
+            importer.save(objects)
+        stats["rows"] += len(chunk)
+        stats["imported"] += len(objects)
+        stats["rejected"] += len(rejects)
+        if on_chunk:
+            on_chunk(_with_rate(stats, started), rejects)
+    importer.finish()
+    return _with_rate(stats, started)
+
+
+def _with_rate(stats, started):
+    seconds = timer.perf_counter() - started
+    return {
+        **stats,
+        "seconds": round(seconds, 2),
+        "rows_per_s": round(stats["rows"] / seconds) if seconds else 0,
+    }
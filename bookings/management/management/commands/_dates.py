@@ -0,0 +1,18 @@
+"""Общие помощники команд; модуль с подчеркиванием Django командой не считает."""
+
+from django.core.management.base import CommandError
+from django.utils.dateparse import parse_date
+
+
+def parse_day(value):
+    """Дата из аргумента команды; None остается None."""
+    if value is None:
+        return None
+    try:
+        day = parse_date(value)
+    except ValueError:
+        # Формат верный, но такого дня нет: 2024-02-30
+        day = None
+    if day is None:
+        raise CommandError(f"Некорректная дата: {value}")
+    return day
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from bookings.generator import create_catalog
+
+
+class Command(BaseCommand):
+    help = "Создание тестовых данных для автомойки"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--boxes", type=int, default=4, help="Сколько боксов создать"
+        )
+
+    def handle(self, *args, **options):
+        # Категории, услуги, боксы и должности; существующие не дублируются
+        create_catalog(options["boxes"])
+        self.stdout.write(self.style.SUCCESS("Тестовые данные успешно созданы!"))
@@ -0,0 +1,75 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from bookings.models import Booking
+
+
+def canonical_queries():
+    """
+    Основные запросы к записям и индексы, которые им подходят.
+
+    Частичный индекс SQLite применяет только если условие запроса совпадает
+    с условием индекса буквально, а IN с параметрами этого не дает, поэтому
+    для активных записей бокса допустим и обычный индекс (box, booking_date).
+    """
+    today = timezone.localdate()
+    active = Booking.objects.filter(status__in=Booking.ACTIVE_STATUSES)
+    return [
+        (
+            "Записи клиента",
+            ("booking_customer_date_idx",),
+            Booking.objects.filter(customer_id=1).order_by(
+                "-booking_date", "-booking_time"
+            ),
+        ),
+        (
+            "Фильтр по статусу и дате",
+            ("booking_status_date_idx",),
+            Booking.objects.filter(status="pending", booking_date__gte=today),
+        ),
+        (
+            "Записи бокса за день",
+            ("booking_box_date_idx",),
+            Booking.objects.filter(box_id=1, booking_date=today),
+        ),
+        (
+            "Активные записи бокса по времени",
+            ("booking_active_slot_idx", "booking_box_date_idx"),
+            active.filter(box_id=1, booking_date=today).order_by("booking_time"),
+        ),
+    ]
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN основных запросов к записям: используются ли индексы"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--plans", action="store_true", help="Выводить планы запросов целиком"
+        )
+        parser.add_argument(
+            "--strict",
+            action="store_true",
+            help="Завершиться с ошибкой, если какой-то запрос не использует индекс",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"База данных: {connection.vendor}")
+        missed = []
+        for title, indexes, queryset in canonical_queries():
+            plan = queryset.explain()
+            index = next((name for name in indexes if name in plan), None)
+            if index:
+                self.stdout.write(self.style.SUCCESS(f"[индекс] {title}: {index}"))
+            else:
+                missed.append(title)
+                self.stdout.write(self.style.WARNING(f"[без индекса] {title}"))
+            if options["plans"]:
+                self.stdout.write(plan)
+        if missed:
+            # На маленьких таблицах PostgreSQL может честно предпочесть seq scan
+            message = f"Запросов без ожидаемого индекса: {len(missed)}"
+            if options["strict"]:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.exporter import CHUNK_SIZE, FORMATS, export_lines, filter_bookings
+from bookings.models import Booking
+
+from ._dates import parse_day
+
+
+class Command(BaseCommand):
+    help = "Потоковая выгрузка записей или выручки в CSV/JSONL"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date-from", help="Начало периода (ГГГГ-ММ-ДД)")
+        parser.add_argument("--date-to", help="Конец периода (ГГГГ-ММ-ДД)")
+        parser.add_argument(
+            "--status",
+            action="append",
+            choices=[value for value, _ in Booking.STATUS_CHOICES],
+            help="Статус (можно указать несколько раз)",
+        )
+        parser.add_argument("--box", type=int, help="Номер бокса")
+        parser.add_argument("--format", choices=sorted(FORMATS), default="csv")
+        parser.add_argument(
+            "--report", choices=("bookings", "revenue"), default="bookings"
+        )
+        parser.add_argument("--output", help="Файл (по умолчанию — stdout)")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        bookings = filter_bookings(
+            parse_day(options["date_from"]),
+            parse_day(options["date_to"]),
+            options["status"] or (),
+            options["box"],
+        )
+        lines = export_lines(
+            options["report"], options["format"], bookings, options["chunk_size"]
+        )
+        if not options["output"]:
+            for line in lines:
+                self.stdout.write(line, ending="")
+            return
+        try:
+            with open(options["output"], "w", newline="", encoding="utf-8") as target:
+                count = sum(target.write(line) and 1 for line in lines)
+        except OSError as error:
+            raise CommandError(error)
+        self.stderr.write(f"Записано строк: {count}")
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from bookings.generator import BATCH_SIZE, generate
+
+
+class Command(BaseCommand):
+    help = "Генерация больших объемов правдоподобных данных для нагрузочных проверок"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--customers", type=int, default=1000)
+        parser.add_argument("--bookings", type=int, default=20000)
+        parser.add_argument(
+            "--years", type=float, default=1, help="Период записей в годах"
+        )
+        parser.add_argument("--employees", type=int, default=20)
+        parser.add_argument(
+            "--boxes", type=int, default=4, help="Сколько боксов должно быть"
+        )
+        parser.add_argument(
+            "--end-date",
+            help="Последний день записей (по умолчанию — через 30 дней)",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        end = None
+        if options["end_date"]:
+            end = parse_date(options["end_date"])
+            if end is None:
+                raise CommandError(f"Некорректная дата: {options['end_date']}")
+        days = round(options["years"] * 365)
+        for name in ("customers", "bookings", "employees", "boxes"):
+            if options[name] < 0:
+                raise CommandError(f"--{name} не может быть отрицательным")
+        if days < 1 or options["batch_size"] < 1:
+            raise CommandError("Период и размер пачки должны быть положительными")
+        if options["bookings"] and not options["customers"]:
+            raise CommandError("Для записей нужен хотя бы один клиент")
+
+        log = self.stdout.write if options["verbosity"] > 1 else None
+        stats = generate(
+            customers=options["customers"],
+            bookings=options["bookings"],
+            days=days,
+            employees=options["employees"],
+            boxes=options["boxes"],
+            seed=options["seed"],
+            end=end,
+            batch_size=options["batch_size"],
+            log=log,
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Готово: клиентов {stats['customers']}, мойщиков "
+                f"{stats['employees']}, записей {stats['bookings']} за "
+                f"{stats['date_from']} — {stats['date_to']}; {stats['seconds']} с "
+                f"({stats['rows_per_s']} записей/с)"
+            )
+        )
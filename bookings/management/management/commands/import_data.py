@@ -0,0 +1,60 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.importer import CHUNK_SIZE, IMPORTERS, read_rows, run_import
+
+
+class Command(BaseCommand):
+    help = "Потоковый импорт услуг, клиентов или записей из CSV/JSONL"
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=sorted(IMPORTERS))
+        parser.add_argument("path", help="Файл .csv или .jsonl")
+        parser.add_argument("--format", choices=("csv", "jsonl"))
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+        parser.add_argument(
+            "--rejects", help="Куда записать отклоненные строки (CSV с причиной)"
+        )
+
+    def handle(self, *args, **options):
+        rows = read_rows(options["path"], options["format"])
+        rejects_file = None
+        if options["rejects"]:
+            try:
+                rejects_file = open(
+                    options["rejects"], "w", newline="", encoding="utf-8"
+                )
+            except OSError as error:
+                raise CommandError(error)
+        writer = csv.writer(rejects_file) if rejects_file else None
+        if writer:
+            writer.writerow(["line", "reason", "row"])
+
+        def on_chunk(stats, rejects):
+            for number, row, reason in rejects:
+                if writer:
+                    writer.writerow([number, reason, row])
+                elif options["verbosity"] > 1:
+                    self.stderr.write(f"Строка {number}: {reason}")
+            self.stdout.write(
+                f"Обработано {stats['rows']}, импортировано {stats['imported']}, "
+                f"отклонено {stats['rejected']} ({stats['rows_per_s']} строк/с)"
+            )
+
+        try:
+            stats = run_import(
+                IMPORTERS[options["kind"]](), rows, options["chunk_size"], on_chunk
+            )
+        except OSError as error:
+            raise CommandError(error)
+        finally:
+            if rejects_file:
+                rejects_file.close()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Готово: {stats['imported']} из {stats['rows']} строк за "
+                f"{stats['seconds']} с ({stats['rows_per_s']} строк/с), "
+                f"отклонено {stats['rejected']}"
+            )
+        )
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings import availability, occupancy
+
+from ._dates import parse_day
+
+
+class Command(BaseCommand):
+    help = "Пересборка и сверка сетки занятости боксов"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date-from", help="Начало периода (ГГГГ-ММ-ДД)")
+        parser.add_argument("--date-to", help="Конец периода (ГГГГ-ММ-ДД)")
+        parser.add_argument(
+            "--verify-only",
+            action="store_true",
+            help="Только сверить сетку с записями, ничего не меняя",
+        )
+
+    def handle(self, *args, **options):
+        date_from = parse_day(options["date_from"])
+        date_to = parse_day(options["date_to"])
+
+        if not options["verify_only"]:
+            rows = occupancy.rebuild(date_from, date_to)
+            availability.invalidate()
+            self.stdout.write(f"Пересобрано строк сетки: {rows}")
+
+        mismatches = occupancy.verify(date_from, date_to)
+        for box_id, day in mismatches:
+            self.stdout.write(
+                self.style.WARNING(f"Расхождение: бокс {box_id or '—'}, {day}")
+            )
+        if mismatches:
+            raise CommandError(f"Найдено расхождений: {len(mismatches)}")
+        self.stdout.write(self.style.SUCCESS("Сетка занятости совпадает с записями"))
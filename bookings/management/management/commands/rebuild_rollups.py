@@ -0,0 +1,88 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+
+from bookings import rollups
+from bookings.models import Booking
+
+from ._dates import parse_day
+
+
+class Command(BaseCommand):
+    help = "Заполнение и сверка дневных сводок для отчетов"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date-from", help="Начало периода (ГГГГ-ММ-ДД)")
+        parser.add_argument("--date-to", help="Конец периода (ГГГГ-ММ-ДД)")
+        parser.add_argument(
+            "--batch-days",
+            type=int,
+            default=31,
+            help="Сколько дней пересобирать одной транзакцией",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Пропустить начальные пачки, где сводки уже совпадают с записями",
+        )
+        parser.add_argument(
+            "--verify-only",
+            action="store_true",
+            help="Только сверить сводки с записями, ничего не меняя",
+        )
+
+    def handle(self, *args, **options):
+        date_from = parse_day(options["date_from"])
+        date_to = parse_day(options["date_to"])
+        if options["batch_days"] < 1:
+            raise CommandError("--batch-days должно быть положительным")
+
+        if not options["verify_only"]:
+            self._backfill(date_from, date_to, options)
+
+        mismatches = rollups.verify(date_from, date_to)
+        for day, service_id, box_id, status in mismatches:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Расхождение: {day}, услуга {service_id}, "
+                    f"бокс {box_id or '—'}, {status}"
+                )
+            )
+        if mismatches:
+            raise CommandError(f"Найдено расхождений: {len(mismatches)}")
+        self.stdout.write(self.style.SUCCESS("Сводки совпадают с записями"))
+
+    def _backfill(self, date_from, date_to, options):
+        bounds = Booking.objects.aggregate(
+            first=Min("booking_date"), last=Max("booking_date")
+        )
+        start = date_from or bounds["first"]
+        end = date_to or bounds["last"]
+        if start is None or end is None:
+            # Записей нет — остается только удалить устаревшие сводки
+            rollups.rebuild(date_from, date_to)
+            return
+        if date_from is None and date_to is None:
+            # Сводки за дни без записей (например, после их удаления)
+            rollups.rebuild(date_to=start - timedelta(days=1))
+            rollups.rebuild(date_from=end + timedelta(days=1))
+        step = timedelta(days=options["batch_days"])
+        batches = []
+        while start <= end:
+            last = min(start + step - timedelta(days=1), end)
+            batches.append((start, last))
+            start = last + timedelta(days=1)
+        if options["resume"]:
+            # Последняя дата в таблице сводок не годится как отметка: сигналы
+            # записей пишут туда и за дни, до которых заполнение не дошло.
+            # Продолжаем с первой пачки, где сводки расходятся с записями
+            while batches and not rollups.verify(*batches[0]):
+                first, last = batches.pop(0)
+                self.stdout.write(f"{first} — {last}: без расхождений")
+        rows = 0
+        for first, last in batches:
+            count = rollups.rebuild(first, last)
+            rows += count
+            self.stdout.write(f"{first} — {last}: строк сводки {count}")
+        self.stdout.write(f"Пересобрано строк сводки: {rows}")
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from bookings.optimizer import repack_day
+
+
+class Command(BaseCommand):
+    help = "Пересборка расписания дня по боксам для сокращения простоев"
+
+    def add_arguments(self, parser):
+        parser.add_argument("date", help="Дата (ГГГГ-ММ-ДД)")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Только рассчитать новую расстановку, не сохраняя ее",
+        )
+
+    def handle(self, *args, **options):
+        day = parse_date(options["date"])
+        if day is None:
+            raise CommandError(f"Некорректная дата: {options['date']}")
+
+        stats = repack_day(day, dry_run=options["dry_run"])
+        self.stdout.write(
+            f"Записей: {stats['bookings']}, перенесено: {stats['moved']}, "
+            f"не удалось расставить: {stats['unplaced']}"
+        )
+        self.stdout.write(
+            f"Боксов занято: {stats['boxes_before']} → {stats['boxes_after']}, "
+            f"простой: {stats['idle_before']} → {stats['idle_after']} мин."
+        )
+        if stats["saved"]:
+            self.stdout.write(self.style.SUCCESS("Новое расписание сохранено"))
+        elif stats["unplaced"]:
+            self.stdout.write(
+                self.style.WARNING("Расписание не изменено: не все записи расставлены")
+            )
+        else:
+            self.stdout.write("Расписание не изменено")
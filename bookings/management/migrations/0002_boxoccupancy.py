@@ -0,0 +1,82 @@
+# Generated by Django 3.2.16 on 2026-10-18 10:14
+
+from collections import defaultdict
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_occupancy(apps, schema_editor):
+    from bookings.occupancy import add_interval, empty_slots, encode, slot_range
+
+    Booking = apps.get_model("bookings", "Booking")
+    BoxOccupancy = apps.get_model("bookings", "BoxOccupancy")
+    grid = defaultdict(empty_slots)
+    rows = Booking.objects.filter(
+        status__in=("pending", "confirmed", "in_progress", "completed")
+    ).values_list("box_id", "booking_date", "booking_time", "service__duration")
+    for box_id, day, start, duration in rows.iterator():
+        add_interval(grid[box_id, day], *slot_range(start, duration))
+    BoxOccupancy.objects.bulk_create(
+        [
+            BoxOccupancy(box_id=box_id, date=day, slots=encode(slots))
+            for (box_id, day), slots in grid.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BoxOccupancy",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="Дата")),
+                ("slots", models.BinaryField(verbose_name="Слоты")),
+                (
+                    "box",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="occupancy",
+                        to="bookings.box",
+                        verbose_name="Бокс",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "занятость бокса",
+                "verbose_name_plural": "Занятость боксов",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="boxoccupancy",
+            constraint=models.UniqueConstraint(
+                fields=("box", "date"), name="unique_box_occupancy_per_day"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="boxoccupancy",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("box__isnull", True)),
+                fields=("date",),
+                name="unique_unassigned_occupancy_per_day",
+            ),
+        ),
+        migrations.RunPython(build_occupancy, migrations.RunPython.noop),
+    ]
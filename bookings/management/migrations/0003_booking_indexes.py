@@ -0,0 +1,42 @@
+# Generated by Django 3.2.16 on 2026-10-18 10:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0002_boxoccupancy"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["customer", "-booking_date", "-booking_time"],
+                name="booking_customer_date_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["status", "booking_date"], name="booking_status_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["box", "booking_date"], name="booking_box_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                condition=models.Q(
+                    ("status__in", ["pending", "confirmed", "in_progress", "completed"])
+                ),
+                fields=["box", "booking_date", "booking_time"],
+                name="booking_active_slot_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,121 @@
+# Generated by Django 3.2.16 on 2026-10-18 10:49
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+import django.db.models.deletion
+
+
+def build_rollups(apps, schema_editor):
+    Booking = apps.get_model("bookings", "Booking")
+    DailyRollup = apps.get_model("bookings", "DailyRollup")
+    rows = (
+        Booking.objects.order_by()
+        .values_list("booking_date", "service_id", "box_id", "status")
+        .annotate(
+            count=Count("id"),
+            revenue=Sum("total_price"),
+            minutes=Sum("service__duration"),
+        )
+    )
+    DailyRollup.objects.bulk_create(
+        [
+            DailyRollup(
+                date=day,
+                service_id=service_id,
+                box_id=box_id,
+                status=status,
+                bookings=count,
+                revenue=revenue,
+                minutes=minutes,
+            )
+            for day, service_id, box_id, status, count, revenue, minutes in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("services", "0002_service_box_type"),
+        ("bookings", "0003_booking_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="Дата")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Ожидает подтверждения"),
+                            ("confirmed", "Подтвержден"),
+                            ("in_progress", "В процессе"),
+                            ("completed", "Завершен"),
+                            ("cancelled", "Отменен"),
+                        ],
+                        max_length=20,
+                        verbose_name="Статус",
+                    ),
+                ),
+                ("bookings", models.IntegerField(default=0, verbose_name="Записей")),
+                (
+                    "revenue",
+                    models.DecimalField(
+                        decimal_places=2, default=0, max_digits=12, verbose_name="Сумма"
+                    ),
+                ),
+                ("minutes", models.IntegerField(default=0, verbose_name="Минут")),
+                (
+                    "box",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rollups",
+                        to="bookings.box",
+                        verbose_name="Бокс",
+                    ),
+                ),
+                (
+                    "service",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rollups",
+                        to="services.service",
+                        verbose_name="Услуга",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "дневная сводка",
+                "verbose_name_plural": "Дневные сводки",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="dailyrollup",
+            constraint=models.UniqueConstraint(
+                fields=("date", "service", "box", "status"), name="unique_daily_rollup"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="dailyrollup",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("box__isnull", True)),
+                fields=("date", "service", "status"),
+                name="unique_unassigned_daily_rollup",
+            ),
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
@@ -1,15 +1,15 @@
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 from django.contrib.auth.models import User
 from services.models import Service
 from customers.models import Customer
 from employees.models import Employee
 
+from . import pricing
+
 
 class Box(models.Model):
-    BOX_TYPES = [
-        ("standard", "Стандартный"),
-        ("premium", "Премиум"),
-    ]
+    BOX_TYPES = Service.BOX_TYPES
 
     number = models.PositiveIntegerField("Номер бокса", unique=True)
     box_type = models.CharField("Тип бокса", max_length=20, choices=BOX_TYPES)
@@ -24,6 +24,143 @@ class Box(models.Model):
         return f"Бокс {self.number} ({self.get_box_type_display()})"
 
 
+# Поля записи, от которых зависит сетка занятости боксов
+OCCUPANCY_FIELDS = {
+    "box",
+    "box_id",
+    "booking_date",
+    "booking_time",
+    "status",
+    "service",
+    "service_id",
+}
+# Поля, от которых зависят дневные сводки
+ROLLUP_FIELDS = OCCUPANCY_FIELDS - {"booking_time"} | {
+    "customer",
+    "customer_id",
+    "total_price",
+}
+
+
+class BookingQuerySet(models.QuerySet):
+    def with_related(self):
+        """Запись вместе со всем, что выводится в карточке и в __str__."""
+        return self.select_related("customer__user", "service", "box", "employee__user")
+
+    def for_list(self):
+        """Только поля, нужные в списке записей клиента."""
+        return self.select_related("service").only(
+            "id",
+            "booking_date",
+            "booking_time",
+            "status",
+            "service__id",
+            "service__name",
+        )
+
+    def bulk_create(self, objs, *args, refresh_occupancy=True, **kwargs):
+        """
+        Массовое создание с пакетным расчетом цен и пересборкой сетки и сводок.
+
+        ``refresh_occupancy=False`` — для импорта пачками: сетку и сводки
+        тогда пересобирают один раз в конце.
+        """
+        objs = pricing.fill_prices(objs)
+        with transaction.atomic(savepoint=False):
+            created = super().bulk_create(objs, *args, **kwargs)
+            if refresh_occupancy:
+                self._refresh_days({obj.booking_date for obj in objs})
+        return created
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        """Массовое изменение; при смене услуги или клиента цена пересчитывается."""
+        objs = list(objs)
+        fields = list(fields)
+        if {"service", "service_id", "customer", "customer_id"} & set(fields):
+            pricing.fill_prices(objs)
+            fields.append("total_price")
+        days = {obj.booking_date for obj in objs}
+        days.update(
+            obj._loaded_values["booking_date"]
+            for obj in objs
+            if "booking_date" in getattr(obj, "_loaded_values", {})
+        )
+        with transaction.atomic(savepoint=False):
+            updated = super().bulk_update(objs, fields, *args, **kwargs)
+            if OCCUPANCY_FIELDS & set(fields):
+                self._refresh_days(days)
+            elif ROLLUP_FIELDS & set(fields):
+                self._refresh_days(days, grid=False)
+        from . import events
+
+        events.bookings_updated(objs, fields)
+        return updated
+
+    def set_status(self, status):
+        """
+        Сменить статус всем записям выборки.
+
+        Переход между активными статусами (подтверждение, начало и завершение
+        работ) не меняет сетку занятости и выполняется одним UPDATE; отмененные
+        записи при этом не трогаются. Меняющиеся записи читаются одним
+        запросом: по ним подписчикам доски рассылаются события, а сводки
+        переносятся после коммита. Отмена пересобирает сетку затронутых дней.
+        """
+        from . import rollups
+
+        changing = self.filter(status__in=Booking.ACTIVE_STATUSES).exclude(
+            status=status
+        )
+        with transaction.atomic(savepoint=False):
+            rows = list(
+                changing.select_for_update()
+                .order_by()
+                .values_list("id", *rollups.KEY_FIELDS, "total_price")
+            )
+            return changing.apply_status(status, rows)
+
+    def apply_status(self, status, rows):
+        """
+        Перевести записи выборки в ``status``, когда они уже прочитаны.
+
+        ``rows`` — кортежи (id, дата, услуга, бокс, статус, цена) тех же
+        записей до изменения, заблокированные в текущей транзакции.
+        """
+        from . import events, rollups
+
+        with transaction.atomic(savepoint=False):
+            updated = self.update(status=status, updated_at=timezone.now())
+            rollups.defer(rollups.status_changes(rows, status))
+            if status not in Booking.ACTIVE_STATUSES:
+                self._refresh_days({row[1] for row in rows}, rollup=False)
+            events.bookings_updated(
+                [
+                    Booking(pk=row[0], status=status, booking_date=row[1])
+                    for row in rows
+                ],
+                ["status"],
+            )
+        return updated
+
+    def _refresh_days(self, days, grid=True, rollup=True):
+        # Массовые операции идут в обход сигналов — дни пересобираются целиком
+        from . import availability, occupancy, rollups
+
+        days = {
+            Booking._meta.get_field("booking_date").to_python(day)
+            for day in days
+            if day is not None
+        }
+        if rollup:
+            rollups.rebuild_days(days)
+        if not grid:
+            return
+        for day in sorted(days):
+            occupancy.rebuild(day, day)
+        if days:
+            transaction.on_commit(lambda: availability.invalidate(*days))
+
+
 class Booking(models.Model):
     STATUS_CHOICES = [
         ("pending", "Ожидает подтверждения"),
@@ -32,6 +169,16 @@ class Booking(models.Model):
         ("completed", "Завершен"),
         ("cancelled", "Отменен"),
     ]
+    # Статусы, при которых запись занимает место в боксе
+    ACTIVE_STATUSES = ("pending", "confirmed", "in_progress", "completed")
+    # Допустимые переходы статусов для персонала
+    TRANSITIONS = {
+        "pending": ("confirmed", "cancelled"),
+        "confirmed": ("in_progress", "cancelled"),
+        "in_progress": ("completed",),
+        "completed": (),
+        "cancelled": (),
+    }
 
     customer = models.ForeignKey(
         Customer,
@@ -64,18 +211,132 @@ class Booking(models.Model):
     created_at = models.DateTimeField("Дата создания", auto_now_add=True)
     updated_at = models.DateTimeField("Дата обновления", auto_now=True)
 
+    objects = BookingQuerySet.as_manager()
+
     class Meta:
         verbose_name = "бронирование"
         verbose_name_plural = "Бронирования"
         ordering = ["-booking_date", "-booking_time"]
+        indexes = [
+            # «Мои записи»: клиент + сортировка по дате и времени
+            models.Index(
+                fields=["customer", "-booking_date", "-booking_time"],
+                name="booking_customer_date_idx",
+            ),
+            # Фильтры персонала и админки
+            models.Index(
+                fields=["status", "booking_date"], name="booking_status_date_idx"
+            ),
+            models.Index(fields=["box", "booking_date"], name="booking_box_date_idx"),
+            # Проверка свободных слотов смотрит только на активные записи
+            models.Index(
+                fields=["box", "booking_date", "booking_time"],
+                name="booking_active_slot_idx",
+                condition=models.Q(
+                    status__in=["pending", "confirmed", "in_progress", "completed"]
+                ),
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запоминаем значения из БД, чтобы видеть, что изменилось при сохранении
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
 
     def save(self, *args, **kwargs):
-        # Расчет цены со скидкой
-        discount_amount = (self.service.price * self.customer.discount) / 100
-        self.total_price = self.service.price - discount_amount
-        super().save(*args, **kwargs)
+        # Цена со скидкой пересчитывается только у новой записи или при смене
+        # услуги или клиента: смена статуса не трогает цену, даже если прайс
+        # или скидка клиента с тех пор изменились
+        if pricing.price_is_stale(self):
+            self.total_price = pricing.discounted_price(
+                self.service.price, self.customer.discount
+            )
+        with transaction.atomic(savepoint=False):
+            # Сигналы обновляют сетку занятости в той же транзакции
+            super().save(*args, **kwargs)
+        self._loaded_values = {
+            field.attname: field.to_python(getattr(self, field.attname))
+            for field in self._meta.concrete_fields
+        }
 
     def __str__(self):
         return (
             f"{self.customer.user.username} - {self.service.name} - {self.booking_date}"
         )
+
+
+class BoxOccupancy(models.Model):
+    """Денормализованная сетка занятости бокса за день."""
+
+    box = models.ForeignKey(
+        Box,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        verbose_name="Бокс",
+        related_name="occupancy",
+    )
+    date = models.DateField("Дата")
+    # Счетчики машин по слотам рабочего дня, 2 байта на слот
+    slots = models.BinaryField("Слоты")
+
+    class Meta:
+        verbose_name = "занятость бокса"
+        verbose_name_plural = "Занятость боксов"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["box", "date"], name="unique_box_occupancy_per_day"
+            ),
+            models.UniqueConstraint(
+                fields=["date"],
+                condition=models.Q(box__isnull=True),
+                name="unique_unassigned_occupancy_per_day",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.box or 'Без бокса'} - {self.date}"
+
+
+class DailyRollup(models.Model):
+    """Сводка записей за день по услуге, боксу и статусу — для отчетов."""
+
+    date = models.DateField("Дата")
+    service = models.ForeignKey(
+        Service,
+        on_delete=models.CASCADE,
+        verbose_name="Услуга",
+        related_name="rollups",
+    )
+    box = models.ForeignKey(
+        Box,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        verbose_name="Бокс",
+        related_name="rollups",
+    )
+    status = models.CharField("Статус", max_length=20, choices=Booking.STATUS_CHOICES)
+    bookings = models.IntegerField("Записей", default=0)
+    revenue = models.DecimalField("Сумма", max_digits=12, decimal_places=2, default=0)
+    minutes = models.IntegerField("Минут", default=0)
+
+    class Meta:
+        verbose_name = "дневная сводка"
+        verbose_name_plural = "Дневные сводки"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "service", "box", "status"],
+                name="unique_daily_rollup",
+            ),
+            models.UniqueConstraint(
+                fields=["date", "service", "status"],
+                condition=models.Q(box__isnull=True),
+                name="unique_unassigned_daily_rollup",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.date} - {self.service_id} - {self.box_id or '—'} - {self.status}"
@@ -0,0 +1,250 @@
+"""
+Сетка занятости боксов по дням (таблица BoxOccupancy).
+
+Рабочий день разбит на слоты по BOOKING_SLOT_MINUTES минут; строка таблицы
+хранит по каждому слоту число машин в боксе. Сетка обновляется инкрементно
+при сохранении и удалении записей, а команда ``rebuild_occupancy``
+пересобирает и сверяет ее с таблицей записей.
+"""
+
+import sys
+from array import array
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+
+from services.models import Service
+
+from .models import Booking, BoxOccupancy
+
+SLOT_MINUTES = getattr(settings, "BOOKING_SLOT_MINUTES", 5)
+OPEN_TIME = getattr(settings, "BOOKING_OPEN_TIME", time(8, 0))
+CLOSE_TIME = getattr(settings, "BOOKING_CLOSE_TIME", time(22, 0))
+
+
+def _minutes(value):
+    return value.hour * 60 + value.minute
+
+
+OPEN_MINUTES = _minutes(OPEN_TIME)
+SLOTS_PER_DAY = (_minutes(CLOSE_TIME) - OPEN_MINUTES) // SLOT_MINUTES
+
+
+def slot_range(start, duration):
+    """Полуинтервал слотов [first, last), который занимает услуга."""
+    offset = _minutes(start) - OPEN_MINUTES
+    first = offset // SLOT_MINUTES
+    last = -(-(offset + duration) // SLOT_MINUTES)
+    return first, last
+
+
+def slot_time(slot):
+    return (
+        datetime.combine(datetime.min, OPEN_TIME)
+        + timedelta(minutes=slot * SLOT_MINUTES)
+    ).time()
+
+
+def empty_slots():
+    return array("H", [0]) * SLOTS_PER_DAY
+
+
+def decode(data):
+    slots = array("H")
+    slots.frombytes(bytes(data))
+    if sys.byteorder == "big":
+        slots.byteswap()
+    if len(slots) != SLOTS_PER_DAY:
+        # Сетка собрана при других часах работы — считаем ее пустой,
+        # пока команда rebuild_occupancy не пересоберет таблицу
+        return empty_slots()
+    return slots
+
+
+def encode(slots):
+    if sys.byteorder == "big":
+        slots = array("H", slots)
+        slots.byteswap()
+    return slots.tobytes()
+
+
+def add_interval(slots, first, last, delta=1):
+    for slot in range(max(first, 0), min(last, SLOTS_PER_DAY)):
+        slots[slot] += delta
+
+
+def footprint(box_id, booking_date, booking_time, status, duration):
+    """Ключ строки сетки и слоты, занятые записью, или None."""
+    if status not in Booking.ACTIVE_STATUSES:
+        return None
+    return (box_id, booking_date), slot_range(booking_time, duration)
+
+
+def apply_changes(changes):
+    """
+    Применить изменения сетки: ``changes`` — список пар (footprint, delta).
+
+    Строки блокируются через select_for_update, поэтому параллельные
+    записи в один бокс на один день не теряют обновления.
+    """
+    by_row = defaultdict(list)
+    for fp, delta in changes:
+        if fp is not None:
+            key, (first, last) = fp
+            by_row[key].append((first, last, delta))
+    if not by_row:
+        return
+    with transaction.atomic():
+        for (box_id, day), intervals in sorted(by_row.items(), key=_row_order):
+            row = _locked_row(box_id, day)
+            slots = decode(row.slots)
+            for first, last, delta in intervals:
+                add_interval(slots, first, last, delta)
+            row.slots = encode(slots)
+            row.save(update_fields=["slots"])
+
+
+def _row_order(item):
+    # Единый порядок блокировки строк исключает взаимные блокировки
+    (box_id, day), _ = item
+    return day, box_id or 0
+
+
+def _locked_row(box_id, day):
+    rows = BoxOccupancy.objects.select_for_update().filter(box_id=box_id, date=day)
+    row = rows.first()
+    if row is None:
+        with transaction.atomic():
+            row, _ = BoxOccupancy.objects.get_or_create(
+                box_id=box_id, date=day, defaults={"slots": encode(empty_slots())}
+            )
+        row = rows.get()
+    return row
+
+
+def _to_python(name, value):
+    # Поля могут быть присвоены строками — приводим их так же, как при записи в БД
+    return Booking._meta.get_field(name).to_python(value)
+
+
+def booking_footprint(booking):
+    return footprint(
+        booking.box_id,
+        _to_python("booking_date", booking.booking_date),
+        _to_python("booking_time", booking.booking_time),
+        booking.status,
+        booking.service.duration,
+    )
+
+
+def loaded_footprint(booking):
+    """Место, которое запись занимала в сетке до текущего сохранения."""
+    loaded = getattr(booking, "_loaded_values", None)
+    if not loaded or loaded.get("status") is None:
+        return None
+    if loaded.get("service_id") == booking.service_id:
+        duration = booking.service.duration
+    else:
+        duration = (
+            Service.objects.filter(pk=loaded.get("service_id"))
+            .values_list("duration", flat=True)
+            .first()
+        )
+        if duration is None:
+            return None
+    return footprint(
+        loaded.get("box_id"),
+        _to_python("booking_date", loaded.get("booking_date")),
+        _to_python("booking_time", loaded.get("booking_time")),
+        loaded.get("status"),
+        duration,
+    )
+
+
+def footprint_changed(booking):
+    """Могло ли сохранение сдвинуть запись в сетке (без запросов к услуге)."""
+    loaded = getattr(booking, "_loaded_values", None)
+    if not loaded:
+        return True
+    for name in ("box_id", "booking_date", "booking_time", "service_id"):
+        if name not in loaded:
+            return True
+        if loaded[name] != _to_python(name, getattr(booking, name)):
+            return True
+    active = Booking.ACTIVE_STATUSES
+    return (loaded.get("status") in active) != (booking.status in active)
+
+
+def booking_saved(booking, created):
+    if not created and not footprint_changed(booking):
+        return
+    old = None if created else loaded_footprint(booking)
+    new = booking_footprint(booking)
+    if old != new:
+        apply_changes([(old, -1), (new, 1)])
+
+
+def booking_deleted(booking):
+    if getattr(booking, "_loaded_values", None):
+        old = loaded_footprint(booking)
+    else:
+        old = booking_footprint(booking)
+    apply_changes([(old, -1)])
+
+
+def compute(date_from=None, date_to=None):
+    """Сетка, рассчитанная заново по таблице записей: {(box_id, date): slots}."""
+    bookings = Booking.objects.filter(status__in=Booking.ACTIVE_STATUSES)
+    if date_from:
+        bookings = bookings.filter(booking_date__gte=date_from)
+    if date_to:
+        bookings = bookings.filter(booking_date__lte=date_to)
+    grid = defaultdict(empty_slots)
+    rows = bookings.order_by().values_list(
+        "box_id", "booking_date", "booking_time", "service__duration"
+    )
+    for box_id, day, start, duration in rows.iterator(chunk_size=2000):
+        add_interval(grid[box_id, day], *slot_range(start, duration))
+    return grid
+
+
+def _stored(date_from=None, date_to=None):
+    rows = BoxOccupancy.objects.all()
+    if date_from:
+        rows = rows.filter(date__gte=date_from)
+    if date_to:
+        rows = rows.filter(date__lte=date_to)
+    return rows
+
+
+def rebuild(date_from=None, date_to=None):
+    """Пересобрать сетку за период (по умолчанию — целиком)."""
+    grid = compute(date_from, date_to)
+    with transaction.atomic():
+        _stored(date_from, date_to).delete()
+        BoxOccupancy.objects.bulk_create(
+            [
+                BoxOccupancy(box_id=box_id, date=day, slots=encode(slots))
+                for (box_id, day), slots in grid.items()
+            ],
+            batch_size=1000,
+        )
+    return len(grid)
+
+
+def verify(date_from=None, date_to=None):
+    """Ключи (box_id, date), где сохраненная сетка расходится с записями."""
+    expected = compute(date_from, date_to)
+    mismatches = []
+    for box_id, day, data in _stored(date_from, date_to).values_list(
+        "box_id", "date", "slots"
+    ):
+        slots = expected.pop((box_id, day), None)
+        if slots is None:
+            slots = empty_slots()
+        if decode(data) != slots:
+            mismatches.append((box_id, day))
+    mismatches.extend(key for key, slots in expected.items() if any(slots))
+    return sorted(mismatches, key=lambda key: (key[1], key[0] or 0))
@@ -0,0 +1,172 @@
+"""
+Пересборка расписания дня по боксам.
+
+Каждый бокс вместимостью N машин представлен N «дорожками»; расстановка
+записей по дорожкам — раскраска интервального графа. Записи идут по времени
+начала, и каждая встает на ту дорожку подходящего бокса, где перед ней
+остается наименьший простой (best fit). Так записи уплотняются в меньшее
+число боксов, а свободное время собирается в длинные непрерывные окна.
+Записи в работе и завершенные (PINNED_STATUSES) не переносятся.
+"""
+
+from bisect import bisect_left, insort
+
+from django.db import transaction
+
+from . import availability, occupancy
+from .commit import lock_day
+from .models import Booking, Box
+from .occupancy import slot_range
+
+PINNED_STATUSES = ("in_progress", "completed")
+
+
+class Lane:
+    """Одно машино-место бокса: отсортированные интервалы слотов."""
+
+    def __init__(self, box_id):
+        self.box_id = box_id
+        self.intervals = []
+
+    def gap_before(self, first, last):
+        """Простой перед интервалом, если он помещается на дорожку, иначе None."""
+        position = bisect_left(self.intervals, (first, last))
+        previous_end = 0
+        if position > 0:
+            previous_end = self.intervals[position - 1][1]
+            if previous_end > first:
+                return None
+        if position < len(self.intervals) and self.intervals[position][0] < last:
+            return None
+        return first - previous_end
+
+    def add(self, first, last):
+        insort(self.intervals, (first, last))
+
+
+def _place(lanes, first, last, box_types, box_type, load):
+    best = None
+    for lane in lanes:
+        if box_type and box_types.get(lane.box_id) != box_type:
+            continue
+        gap = lane.gap_before(first, last)
+        if gap is None:
+            continue
+        # При равном простое — в более загруженный бокс, чтобы освободить другие
+        key = (gap, -load[lane.box_id], lane.box_id)
+        if best is None or key < best[0]:
+            best = (key, lane)
+    return best and best[1]
+
+
+def plan(bookings, boxes):
+    """
+    Новая расстановка записей по боксам.
+
+    ``bookings`` — кортежи (id, box_id, start, duration, status, box_type),
+    ``boxes`` — кортежи (id, capacity, box_type). Возвращает
+    {id записи: box_id} для всех записей, которые удалось расставить.
+    """
+    box_types = {box_id: box_type for box_id, _, box_type in boxes}
+    lanes_by_box = {
+        box_id: [Lane(box_id) for _ in range(capacity)] for box_id, capacity, _ in boxes
+    }
+    all_lanes = [lane for lanes in lanes_by_box.values() for lane in lanes]
+    load = {box_id: 0 for box_id in lanes_by_box}
+    result = {}
+
+    movable = []
+    for booking_id, box_id, start, duration, status, box_type in bookings:
+        first, last = slot_range(start, duration)
+        if status not in PINNED_STATUSES:
+            movable.append((first, -(last - first), booking_id, box_type))
+            continue
+        if box_id in lanes_by_box:
+            lane = _place(lanes_by_box[box_id], first, last, {}, "", load)
+            if lane is not None:
+                lane.add(first, last)
+                load[box_id] += last - first
+        result[booking_id] = box_id
+
+    for first, negative_length, booking_id, box_type in sorted(movable):
+        last = first - negative_length
+        lane = _place(all_lanes, first, last, box_types, box_type, load)
+        if lane is None:
+            continue
+        lane.add(first, last)
+        load[lane.box_id] += last - first
+        result[booking_id] = lane.box_id
+    return result
+
+
+def idle_minutes(assignment, bookings, boxes):
+    """
+    Простой задействованных боксов за день (в машино-минутах).
+
+    Считается как вместимость занятых боксов на весь рабочий день минус
+    забронированное время: чем плотнее записи, тем больше боксов остаются
+    полностью свободными и тем меньше простой.
+    """
+    capacities = {box_id: capacity for box_id, capacity, _ in boxes}
+    used = {box_id for box_id in assignment.values() if box_id is not None}
+    booked = sum(
+        min(last, occupancy.SLOTS_PER_DAY) - max(first, 0)
+        for booking_id, _, start, duration, *_ in bookings
+        if assignment.get(booking_id) is not None
+        for first, last in [slot_range(start, duration)]
+    )
+    total = sum(capacities.get(box_id, 1) for box_id in used)
+    return (total * occupancy.SLOTS_PER_DAY - booked) * occupancy.SLOT_MINUTES
+
+
+def repack_day(day, dry_run=False):
+    """
+    Пересобрать расписание дня и сохранить его одной транзакцией.
+
+    Возвращает словарь со статистикой: сколько записей перенесено, сколько
+    боксов занято и сколько машино-минут простоя было до и после.
+    """
+    boxes = list(
+        Box.objects.filter(is_active=True).values_list("id", "capacity", "box_type")
+    )
+    with transaction.atomic():
+        lock_day(day, [box_id for box_id, *_ in boxes])
+        bookings = list(
+            Booking.objects.filter(
+                booking_date=day, status__in=Booking.ACTIVE_STATUSES
+            ).values_list(
+                "id",
+                "box_id",
+                "booking_time",
+                "service__duration",
+                "status",
+                "service__box_type",
+            )
+        )
+        before = {booking[0]: booking[1] for booking in bookings}
+        planned = plan(bookings, boxes)
+        unplaced = len(before) - len(planned)
+        after = {**before, **planned}
+        moved = [
+            Booking(pk=booking_id, box_id=box_id, booking_date=day)
+            for booking_id, box_id in after.items()
+            if before[booking_id] != box_id
+        ]
+        # Если часть записей не встала, новая расстановка могла бы переполнить
+        # их прежние боксы — в таком случае ничего не сохраняем
+        write = moved and not dry_run and not unplaced
+        if write:
+            # bulk_update сам пересобирает сетку дня
+            Booking.objects.bulk_update(moved, ["box"], batch_size=500)
+    if write:
+        availability.invalidate(day)
+    return {
+        "bookings": len(bookings),
+        "moved": len(moved),
+        "unplaced": unplaced,
+        "saved": bool(write),
+        "boxes_before": len({box for box in before.values() if box is not None}),
+        "boxes_after": len({box for box in after.values() if box is not None}),
+        "idle_before": idle_minutes(before, bookings, boxes),
+        "idle_after": idle_minutes(after, bookings, boxes),
+    }
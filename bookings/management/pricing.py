@@ -0,0 +1,59 @@
+"""
+Расчет итоговой цены записи.
+
+Цена пересчитывается только когда от нее что-то зависит: у новой записи
+или при смене услуги или клиента. Для массовых операций цены считаются
+пакетно — одним запросом на услуги и одним на клиентов.
+"""
+
+from customers.models import Customer
+from services.models import Service
+
+
+def discounted_price(price, discount):
+    discount_amount = (price * discount) / 100
+    return price - discount_amount
+
+
+def price_is_stale(booking):
+    """Нужно ли пересчитывать цену при сохранении записи."""
+    if booking._state.adding or booking.total_price is None:
+        return True
+    loaded = getattr(booking, "_loaded_values", None) or {}
+    return (
+        loaded.get("service_id") != booking.service_id
+        or loaded.get("customer_id") != booking.customer_id
+    )
+
+
+def _cached(booking, name):
+    field = booking._meta.get_field(name)
+    return field.get_cached_value(booking) if field.is_cached(booking) else None
+
+
+def fill_prices(bookings):
+    """Проставить total_price пачке записей, догружая недостающее пакетно."""
+    bookings = list(bookings)
+    service_ids = {
+        booking.service_id for booking in bookings if not _cached(booking, "service")
+    }
+    customer_ids = {
+        booking.customer_id for booking in bookings if not _cached(booking, "customer")
+    }
+    prices = dict(
+        Service.objects.filter(pk__in=service_ids).values_list("id", "price")
+        if service_ids
+        else ()
+    )
+    discounts = dict(
+        Customer.objects.filter(pk__in=customer_ids).values_list("id", "discount")
+        if customer_ids
+        else ()
+    )
+    for booking in bookings:
+        service = _cached(booking, "service")
+        customer = _cached(booking, "customer")
+        price = service.price if service else prices[booking.service_id]
+        discount = customer.discount if customer else discounts[booking.customer_id]
+        booking.total_price = discounted_price(price, discount)
+    return bookings
@@ -0,0 +1,236 @@
+"""
+Дневные сводки записей (таблица DailyRollup) для отчетов.
+
+Строка сводки — число записей, их сумма и занятые минуты за день по
+ключу (дата, услуга, бокс, статус). Сводки обновляются инкрементно при
+сохранении и удалении записи и при массовой смене статуса — после
+коммита транзакции, одним пакетом на операцию; массовые создание и
+изменение пересобирают затронутые дни сразу. Команда
+``rebuild_rollups`` заполняет сводки по частям и сверяет их с записями.
+"""
+
+import random
+import time
+from collections import defaultdict
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+
+from django.db import OperationalError, transaction
+from django.db.models import Count, F, Q, Subquery, Sum
+
+from services.models import Service
+
+from .commit import BACKOFF, MAX_BACKOFF, RETRIES
+from .models import Booking, DailyRollup
+
+CENTS = Decimal("0.01")
+KEY_FIELDS = ("booking_date", "service_id", "box_id", "status")
+
+
+def _to_python(name, value):
+    return Booking._meta.get_field(name).to_python(value)
+
+
+def contribution(booking, loaded=None):
+    """
+    Вклад записи в сводки: (ключ, сумма).
+
+    ``loaded`` — значения из БД до сохранения; недостающие в нем поля
+    (отложенные при загрузке) не могли измениться и берутся из записи.
+    """
+    values = {
+        name: _to_python(name, getattr(booking, name))
+        for name in KEY_FIELDS + ("total_price",)
+    }
+    if loaded is not None:
+        values.update(
+            (name, _to_python(name, loaded[name])) for name in values if name in loaded
+        )
+    return tuple(values[name] for name in KEY_FIELDS), values["total_price"]
+
+
+def _filter(key):
+    day, service_id, box_id, status = key
+    return Q(date=day, service_id=service_id, box_id=box_id, status=status)
+
+
+def _row(key, count=0, revenue=0, minutes=0):
+    day, service_id, box_id, status = key
+    return DailyRollup(
+        date=day,
+        service_id=service_id,
+        box_id=box_id,
+        status=status,
+        bookings=count,
+        revenue=revenue,
+        minutes=minutes,
+    )
+
+
+def _order(key):
+    # Единый порядок блокировки строк исключает взаимные блокировки
+    day, service_id, box_id, status = key
+    return day, service_id, box_id or 0, status
+
+
+def apply_changes(changes):
+    """
+    Применить изменения: ``changes`` — тройки (ключ, записей, сумма).
+
+    Занятые минуты считаются в том же UPDATE по длительности услуги ключа,
+    поэтому загружать услугу не нужно. Опустевшие строки удаляются.
+    """
+    totals = defaultdict(lambda: [0, Decimal(0)])
+    for key, count, revenue in changes:
+        totals[key][0] += count
+        totals[key][1] += revenue or 0
+    totals = {key: value for key, value in totals.items() if any(value)}
+    if not totals:
+        return
+    with transaction.atomic(savepoint=False):
+        for key in sorted(totals, key=_order):
+            count, revenue = totals[key]
+            rows = DailyRollup.objects.filter(_filter(key))
+            duration = Service.objects.filter(pk=key[1]).values("duration")
+            delta = {
+                "bookings": F("bookings") + count,
+                "revenue": F("revenue") + revenue,
+                "minutes": F("minutes") + count * Subquery(duration),
+            }
+            if rows.update(**delta) or count <= 0:
+                continue
+            # Пустая строка и сразу UPDATE: если ее успела вставить
+            # параллельная транзакция, вставка пропускается без ошибки
+            DailyRollup.objects.bulk_create([_row(key)], ignore_conflicts=True)
+            rows.update(**delta)
+        emptied = [key for key, (count, _) in totals.items() if count < 0]
+        if emptied:
+            DailyRollup.objects.filter(
+                reduce(or_, map(_filter, emptied)), bookings__lte=0
+            ).delete()
+
+
+def key_changed(booking):
+    """Могло ли сохранение изменить сводки (без запросов к БД)."""
+    loaded = getattr(booking, "_loaded_values", None)
+    if not loaded:
+        return True
+    return contribution(booking) != contribution(booking, loaded)
+
+
+def defer(changes):
+    """
+    Применить изменения сводок после коммита транзакции.
+
+    Сохранение записи не ждет сводок; до коммита и при падении процесса
+    сразу после него сводки могут отставать от записей — такое расхождение
+    находит и исправляет ``rebuild_rollups``.
+    """
+    changes = list(changes)
+    if changes:
+        transaction.on_commit(lambda: _apply_committed(changes))
+
+
+def _apply_committed(changes):
+    # Запись уже сохранена: ошибка блокировки здесь не должна доходить до
+    # вызывающего кода, который иначе повторил бы сохранение
+    for attempt in range(RETRIES + 1):
+        try:
+            apply_changes(changes)
+            return
+        except OperationalError:
+            time.sleep(random.uniform(0, min(MAX_BACKOFF, BACKOFF * 2**attempt)))
+
+
+def booking_saved(booking, created):
+    if not created and not key_changed(booking):
+        return
+    key, revenue = contribution(booking)
+    changes = [(key, 1, revenue)]
+    if not created:
+        old_key, old_revenue = contribution(booking, booking._loaded_values)
+        changes.append((old_key, -1, -old_revenue))
+    defer(changes)
+
+
+def booking_deleted(booking):
+    key, revenue = contribution(booking, getattr(booking, "_loaded_values", None))
+    defer([(key, -1, -revenue)])
+
+
+def status_changes(rows, status):
+    """
+    Изменения сводок при переводе записей в ``status``.
+
+    ``rows`` — кортежи (id, дата, услуга, бокс, статус, цена) до изменения.
+    """
+    changes = []
+    for _, day, service_id, box_id, old_status, revenue in rows:
+        changes.append(((day, service_id, box_id, old_status), -1, -revenue))
+        changes.append(((day, service_id, box_id, status), 1, revenue))
+    return changes
+
+
+def compute(date_from=None, date_to=None):
+    """Сводки, рассчитанные заново по записям: {ключ: (записей, сумма, минут)}."""
+    bookings = Booking.objects.all()
+    if date_from:
+        bookings = bookings.filter(booking_date__gte=date_from)
+    if date_to:
+        bookings = bookings.filter(booking_date__lte=date_to)
+    rows = (
+        bookings.order_by()
+        .values_list(*KEY_FIELDS)
+        .annotate(
+            count=Count("id"),
+            revenue=Sum("total_price"),
+            minutes=Sum("service__duration"),
+        )
+    )
+    return {
+        tuple(row[:4]): (row[4], Decimal(row[5]).quantize(CENTS), row[6])
+        for row in rows.iterator(chunk_size=2000)
+    }
+
+
+def _stored(date_from=None, date_to=None):
+    rows = DailyRollup.objects.all()
+    if date_from:
+        rows = rows.filter(date__gte=date_from)
+    if date_to:
+        rows = rows.filter(date__lte=date_to)
+    return rows
+
+
+def rebuild(date_from=None, date_to=None):
+    """Пересобрать сводки за период (по умолчанию — целиком)."""
+    expected = compute(date_from, date_to)
+    with transaction.atomic(savepoint=False):
+        _stored(date_from, date_to).delete()
+        DailyRollup.objects.bulk_create(
+            [_row(key, *values) for key, values in expected.items()],
+            batch_size=1000,
+        )
+    return len(expected)
+
+
+def rebuild_days(days):
+    for day in sorted(days):
+        rebuild(day, day)
+
+
+def verify(date_from=None, date_to=None):
+    """Ключи, по которым сохраненные сводки расходятся с записями."""
+    expected = compute(date_from, date_to)
+    mismatches = []
+    rows = _stored(date_from, date_to).values_list(
+        "date", "service_id", "box_id", "status", "bookings", "revenue", "minutes"
+    )
+    for day, service_id, box_id, status, count, revenue, minutes in rows:
+        key = (day, service_id, box_id, status)
+        stored = (count, Decimal(revenue).quantize(CENTS), minutes)
+        if expected.pop(key, (0, Decimal(0).quantize(CENTS), 0)) != stored:
+            mismatches.append(key)
+    mismatches.extend(expected)
+    return sorted(mismatches, key=_order)
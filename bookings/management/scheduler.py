@@ -0,0 +1,127 @@
+"""
+Автоматическое назначение бокса и мойщика.
+
+Жадная эвристика: из подходящих по типу активных боксов, в которые
+помещается услуга, выбирается наименее загруженный за день (по доле занятых
+слотов с учетом вместимости); из активных мойщиков, свободных на это время, —
+тот, у кого меньше всего минут работы за день. Состояние дня держится в
+памяти, поэтому расстановка сотен записей не обращается к БД на каждую.
+"""
+
+from bisect import bisect_left, insort
+
+from employees.models import Employee
+
+from .availability import build_index
+from .models import Booking, Box, BoxOccupancy
+from .occupancy import slot_range
+
+
+class DayScheduler:
+    """Загрузка боксов и мойщиков за один день."""
+
+    def __init__(self, index, employee_ids, assignments=()):
+        self.index = index
+        self.box_load = {
+            box_id: sum(slots) for box_id, slots in self.index.slots.items()
+        }
+        self.employee_load = {employee_id: 0 for employee_id in employee_ids}
+        # По каждому мойщику — отсортированные интервалы слотов [first, last)
+        self.employee_intervals = {employee_id: [] for employee_id in employee_ids}
+        for employee_id, start, duration in assignments:
+            self._book_employee(employee_id, *slot_range(start, duration))
+
+    @classmethod
+    def for_day(cls, day):
+        """Собрать состояние дня из БД (боксы, сетка занятости, мойщики)."""
+        boxes = Box.objects.filter(is_active=True).values_list(
+            "id", "capacity", "box_type"
+        )
+        rows = BoxOccupancy.objects.filter(date=day).values_list("box_id", "slots")
+        return cls.from_index(build_index(day, boxes, rows))
+
+    @classmethod
+    def from_index(cls, index, exclude=None):
+        """
+        Состояние дня поверх готового индекса занятости.
+
+        ``exclude`` — pk записи, чей мойщик не считается занятым (при
+        переносе записи).
+        """
+        employee_ids = Employee.objects.filter(is_active=True).values_list(
+            "id", flat=True
+        )
+        assignments = Booking.objects.filter(
+            booking_date=index.day,
+            status__in=Booking.ACTIVE_STATUSES,
+            employee__isnull=False,
+        )
+        if exclude is not None:
+            assignments = assignments.exclude(pk=exclude)
+        return cls(
+            index,
+            list(employee_ids),
+            assignments.values_list("employee_id", "booking_time", "service__duration"),
+        )
+
+    def _employee_free(self, employee_id, first, last):
+        intervals = self.employee_intervals[employee_id]
+        # Загруженные из БД записи мойщика могут пересекаться между собой,
+        # поэтому соседних интервалов мало: длинный ранний может накрыть
+        # проверяемый. Смотрим все, что начинаются раньше его конца
+        position = bisect_left(intervals, (last,))
+        return all(end <= first for _, end in intervals[:position])
+
+    def _book_employee(self, employee_id, first, last):
+        if employee_id in self.employee_intervals:
+            insort(self.employee_intervals[employee_id], (first, last))
+            self.employee_load[employee_id] += last - first
+
+    def pick_box(self, start, duration, box_type=""):
+        candidates = sorted(
+            self.index.box_ids_for(box_type),
+            key=lambda box_id: (
+                self.box_load[box_id] / max(self.index.capacity[box_id], 1),
+                box_id,
+            ),
+        )
+        return self.index.find_box(start, duration, candidates)
+
+    def pick_employee(self, start, duration):
+        first, last = slot_range(start, duration)
+        free = [
+            employee_id
+            for employee_id in self.employee_load
+            if self._employee_free(employee_id, first, last)
+        ]
+        if not free:
+            return None
+        return min(
+            free, key=lambda employee_id: (self.employee_load[employee_id], employee_id)
+        )
+
+    def employee_is_free(self, employee_id, start, duration):
+        if employee_id not in self.employee_intervals:
+            return False
+        return self._employee_free(employee_id, *slot_range(start, duration))
+
+    def assign(self, start, duration, box_type=""):
+        """
+        Выбрать бокс и мойщика и учесть их в состоянии дня.
+
+        Возвращает (box_id, employee_id); box_id — None, если места нет,
+        employee_id — None, если свободных мойщиков нет.
+        """
+        box_id = self.pick_box(start, duration, box_type)
+        if box_id is None:
+            return None, None
+        employee_id = self.pick_employee(start, duration)
+        self.reserve(box_id, employee_id, start, duration)
+        return box_id, employee_id
+
+    def reserve(self, box_id, employee_id, start, duration):
+        first, last = slot_range(start, duration)
+        self.index.add(box_id, start, duration)
+        self.box_load[box_id] = self.box_load.get(box_id, 0) + last - first
+        if employee_id is not None:
+            self._book_employee(employee_id, first, last)
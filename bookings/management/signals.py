@@ -0,0 +1,110 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from services.models import Service
+
+from . import availability, events, occupancy, rollups
+from .models import Booking, Box, DailyRollup
+
+
+def _booking_days(instance):
+    days = {Booking._meta.get_field("booking_date").to_python(instance.booking_date)}
+    loaded = getattr(instance, "_loaded_values", None)
+    if loaded and "booking_date" in loaded:
+        days.add(loaded["booking_date"])
+    return days
+
+
+def _invalidate(*days):
+    # Индекс сбрасывается после фиксации: иначе параллельный запрос успеет
+    # собрать его заново по старым данным, пока транзакция не завершена
+    transaction.on_commit(lambda: availability.invalidate(*days))
+
+
+def _rebuild_days(days):
+    for day in days:
+        occupancy.rebuild(day, day)
+    _invalidate(*days)
+
+
+@receiver(post_save, sender=Booking)
+def booking_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    occupancy.booking_saved(instance, created)
+    rollups.booking_saved(instance, created)
+    days = _booking_days(instance)
+    _invalidate(*days)
+    events.booking_saved(instance, created, days)
+
+
+@receiver(post_delete, sender=Booking)
+def booking_deleted(sender, instance, **kwargs):
+    occupancy.booking_deleted(instance)
+    rollups.booking_deleted(instance)
+    days = _booking_days(instance)
+    _invalidate(*days)
+    events.booking_deleted(instance, days)
+
+
+@receiver(pre_delete, sender=Box)
+def remember_box_days(sender, instance, **kwargs):
+    # Записи бокса станут «без бокса» (SET_NULL) в обход сигналов,
+    # поэтому их дни пересобираются после удаления
+    instance._occupied_days = set(
+        instance.booking_set.filter(status__in=Booking.ACTIVE_STATUSES)
+        .order_by()
+        .values_list("booking_date", flat=True)
+        .distinct()
+    )
+    # Сводки бокса удаляются каскадом — их дни тоже пересобираются
+    instance._rollup_days = set(
+        DailyRollup.objects.filter(box=instance)
+        .order_by()
+        .values_list("date", flat=True)
+        .distinct()
+    )
+
+
+@receiver(post_delete, sender=Box)
+def box_deleted(sender, instance, **kwargs):
+    _rebuild_days(getattr(instance, "_occupied_days", ()))
+    rollups.rebuild_days(getattr(instance, "_rollup_days", ()))
+    _invalidate()
+
+
+@receiver(post_save, sender=Box)
+def box_saved(sender, **kwargs):
+    _invalidate()
+
+
+@receiver(pre_save, sender=Service)
+def remember_service_duration(sender, instance, raw=False, **kwargs):
+    instance._old_duration = None
+    if instance.pk and not raw:
+        instance._old_duration = (
+            Service.objects.filter(pk=instance.pk)
+            .values_list("duration", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Service)
+def service_saved(sender, instance, created, **kwargs):
+    old_duration = getattr(instance, "_old_duration", None)
+    if old_duration is None or old_duration == instance.duration:
+        return
+    DailyRollup.objects.filter(service=instance).update(
+        minutes=F("bookings") * instance.duration
+    )
+    _rebuild_days(
+        set(
+            Booking.objects.filter(service=instance, status__in=Booking.ACTIVE_STATUSES)
+            .order_by()
+            .values_list("booking_date", flat=True)
+            .distinct()
+        )
+    )
+    _invalidate()
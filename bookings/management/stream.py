@@ -0,0 +1,118 @@
+"""
+Поток изменений доски дня (Server-Sent Events) для экранов боксов.
+
+Обработчик — голое ASGI-приложение, а не view Django: соединение держится
+часами, и на каждого клиента приходится одна корутина и одна очередь в
+брокере событий. Доступ — для персонала по сессии либо по токену экрана
+``BOARD_STREAM_TOKEN`` (``?token=...``).
+"""
+
+import asyncio
+import hmac
+import json
+from http.cookies import SimpleCookie
+from importlib import import_module
+from types import SimpleNamespace
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.db import close_old_connections
+from django.utils.dateparse import parse_date
+
+from .events import broker
+
+KEEPALIVE_SECONDS = 15
+
+
+def _staff_session(session_key):
+    close_old_connections()
+    try:
+        engine = import_module(settings.SESSION_ENGINE)
+        session = engine.SessionStore(session_key)
+        user = get_user(SimpleNamespace(session=session))
+        return user.is_active and user.is_staff
+    finally:
+        close_old_connections()
+
+
+async def _authorized(scope):
+    query = parse_qs(scope.get("query_string", b"").decode())
+    token = getattr(settings, "BOARD_STREAM_TOKEN", "")
+    if token and hmac.compare_digest(query.get("token", [""])[0], token):
+        return True
+    headers = dict(scope.get("headers", ()))
+    cookie = SimpleCookie(headers.get(b"cookie", b"").decode("latin-1"))
+    morsel = cookie.get(settings.SESSION_COOKIE_NAME)
+    if morsel is None:
+        return False
+    return await sync_to_async(_staff_session)(morsel.value)
+
+
+async def _respond(send, status, text):
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"text/plain; charset=utf-8")],
+        }
+    )
+    await send({"type": "http.response.body", "body": text.encode()})
+
+
+async def board_stream(scope, receive, send, date):
+    """Отдавать события дня, пока клиент не отключится."""
+    try:
+        day = parse_date(date)
+    except ValueError:
+        day = None
+    if day is None:
+        return await _respond(send, 400, "Некорректная дата")
+    if not await _authorized(scope):
+        return await _respond(send, 403, "Доступ только для персонала")
+
+    subscription = broker.subscribe(str(day))
+    disconnected = asyncio.ensure_future(_wait_disconnect(receive))
+    try:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/event-stream"),
+                    (b"cache-control", b"no-cache"),
+                    (b"x-accel-buffering", b"no"),
+                ],
+            }
+        )
+        await _send(send, ": connected\n\n")
+        while not disconnected.done():
+            event = asyncio.ensure_future(subscription.get())
+            done, _ = await asyncio.wait(
+                {event, disconnected},
+                timeout=KEEPALIVE_SECONDS,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if event in done:
+                payload = json.dumps(event.result(), ensure_ascii=False)
+                await _send(send, f"event: booking\ndata: {payload}\n\n")
+            else:
+                event.cancel()
+                if not done:
+                    # Комментарий SSE не дает прокси закрыть тихое соединение
+                    await _send(send, ": ping\n\n")
+    finally:
+        broker.unsubscribe(subscription)
+        disconnected.cancel()
+
+
+async def _wait_disconnect(receive):
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def _send(send, text):
+    await send({"type": "http.response.body", "body": text.encode(), "more_body": True})
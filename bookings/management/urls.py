@@ -1,14 +1,35 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import api, views
+
+# Под ASGI страницы чтения отдаются асинхронными вариантами
+ASYNC = settings.ASYNC_READ_VIEWS
 
 app_name = "bookings"
 
 urlpatterns = [
     path("", views.index, name="index"),
     path("bookings/", views.BookingCreateView.as_view(), name="create_booking"),
-    path("bookings/my/", views.MyBookingsView.as_view(), name="my_bookings"),
     path(
-        "bookings/<int:pk>/", views.BookingDetailView.as_view(), name="booking_detail"
+        "bookings/my/",
+        views.my_bookings_async if ASYNC else views.MyBookingsView.as_view(),
+        name="my_bookings",
+    ),
+    path(
+        "bookings/free-slots/",
+        views.free_slots_async if ASYNC else views.free_slots,
+        name="free_slots",
+    ),
+    path("bookings/board/", views.staff_board, name="staff_board"),
+    path(
+        "bookings/board/transitions/",
+        views.staff_transitions,
+        name="staff_transitions",
+    ),
+    path(
+        "bookings/<int:pk>/",
+        views.booking_detail_async if ASYNC else views.BookingDetailView.as_view(),
+        name="booking_detail",
     ),
     path(
         "bookings/<int:pk>/edit/",
@@ -20,4 +41,9 @@ urlpatterns = [
         views.BookingDeleteView.as_view(),
         name="delete_booking",
     ),
+    path("bookings/export/", views.export_bookings, name="export_bookings"),
+    path("bookings/analytics/", views.analytics_report, name="analytics"),
+    path("api/bookings/", api.bookings, name="api_bookings"),
+    path("api/services/", api.services, name="api_services"),
+    path("api/boxes/", api.boxes, name="api_boxes"),
 ]
@@ -1,7 +1,21 @@
+import json
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, get_object_or_404, redirect
+from django.http import (
+    JsonResponse,
+    HttpResponseBadRequest,
+    HttpResponseRedirect,
+    StreamingHttpResponse,
+)
+from django.core.exceptions import ValidationError
+from django.utils.dateparse import parse_date
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.conf import settings
 from django.contrib.auth import login
+from django.views.decorators.http import require_GET, require_POST
 from django.views.generic import (
     ListView,
     CreateView,
@@ -16,15 +30,168 @@ from django.core.paginator import Paginator
 
 from .models import Booking, Box
 from services.models import Service
-from customers.models import Customer
+from customers.profile_cache import customer_or_404
 from employees.models import Employee
 from .forms import UserRegistrationForm, BookingForm
+from carwash.async_views import async_class_view
+from . import analytics, availability, board, exporter
+from .commit import commit_booking
 
 
 def index(request):
     return render(request, "bookings/index.html")
 
 
+def _free_slots_params(request):
+    service_id = request.GET.get("service", "")
+    try:
+        day = parse_date(request.GET.get("date", ""))
+    except ValueError:
+        day = None
+    if not service_id.isdigit() or day is None:
+        return None
+    return service_id, day
+
+
+def _free_slots_lookup(service_id, day):
+    service = get_object_or_404(Service, pk=service_id, is_active=True)
+    return service, availability.free_slots(service, day)
+
+
+def _free_slots_response(service, day, slots):
+    return JsonResponse(
+        {
+            "service": service.pk,
+            "date": day.isoformat(),
+            "slots": [slot.strftime("%H:%M") for slot in slots],
+        }
+    )
+
+
+def free_slots(request):
+    params = _free_slots_params(request)
+    if params is None:
+        return HttpResponseBadRequest("Укажите услугу и дату")
+    service, slots = _free_slots_lookup(*params)
+    return _free_slots_response(service, params[1], slots)
+
+
+async def free_slots_async(request):
+    """Асинхронный вариант free_slots."""
+    params = _free_slots_params(request)
+    if params is None:
+        return HttpResponseBadRequest("Укажите услугу и дату")
+    service, slots = await sync_to_async(_free_slots_lookup)(*params)
+    return _free_slots_response(service, params[1], slots)
+
+
+staff_required = user_passes_test(lambda user: user.is_staff)
+
+
+@staff_required
+@require_GET
+def staff_board(request):
+    """Записи дня по боксам для персонала (по умолчанию — сегодня)."""
+    value = request.GET.get("date")
+    try:
+        day = parse_date(value) if value else timezone.localdate()
+    except ValueError:
+        day = None
+    if day is None:
+        return HttpResponseBadRequest("Некорректная дата")
+    return JsonResponse(board.day_board(day))
+
+
+@staff_required
+@require_POST
+def staff_transitions(request):
+    """
+    Массовая смена статусов.
+
+    Тело запроса: {"transitions": [{"id": 1, "status": "confirmed"}, ...]}.
+    """
+    try:
+        items = json.loads(request.body)["transitions"]
+        transitions = {int(item["id"]): item["status"] for item in items}
+    except (ValueError, KeyError, TypeError):
+        return HttpResponseBadRequest("Некорректный запрос")
+    try:
+        updated = board.apply_transitions(transitions)
+    except ValidationError as error:
+        return JsonResponse({"errors": error.messages}, status=400)
+    return JsonResponse({"updated": updated})
+
+
+def _optional_date(value):
+    if not value:
+        return None
+    day = parse_date(value)
+    if day is None:
+        raise ValueError(value)
+    return day
+
+
+@staff_required
+@require_GET
+def export_bookings(request):
+    """
+    Потоковая выгрузка записей или выручки для бухгалтерии.
+
+    Параметры: date_from, date_to, status (можно несколько), box (номер),
+    format (csv или jsonl), report (bookings или revenue).
+    """
+    params = request.GET
+    fmt = params.get("format", "csv")
+    report = params.get("report", "bookings")
+    if fmt not in exporter.FORMATS or report not in ("bookings", "revenue"):
+        return HttpResponseBadRequest("Некорректный формат или отчет")
+    try:
+        date_from = _optional_date(params.get("date_from"))
+        date_to = _optional_date(params.get("date_to"))
+    except ValueError:
+        return HttpResponseBadRequest("Некорректная дата")
+    box = params.get("box", "")
+    if box and not box.isdigit():
+        return HttpResponseBadRequest("Некорректный номер бокса")
+    bookings = exporter.filter_bookings(
+        date_from, date_to, params.getlist("status"), int(box) if box else None
+    )
+    response = StreamingHttpResponse(
+        exporter.export_lines(report, fmt, bookings),
+        content_type=exporter.FORMATS[fmt],
+    )
+    response["Content-Disposition"] = f'attachment; filename="{report}.{fmt}"'
+    return response
+
+
+@staff_required
+@require_GET
+def analytics_report(request):
+    """Выручка и загрузка за период (по умолчанию — последние 365 дней)."""
+    try:
+        date_to = _optional_date(request.GET.get("date_to")) or timezone.localdate()
+        date_from = _optional_date(request.GET.get("date_from")) or (
+            date_to - timedelta(days=364)
+        )
+    except ValueError:
+        return HttpResponseBadRequest("Некорректная дата")
+    if date_from > date_to:
+        return HttpResponseBadRequest("Начало периода позже конца")
+    return render(
+        request, "bookings/analytics.html", analytics.report(date_from, date_to)
+    )
+
+
+def commit_form(view, form):
+    """Сохранить запись из формы через защищенный от гонок путь."""
+    try:
+        view.object = commit_booking(form.instance)
+    except ValidationError as error:
+        form.add_error(None, error)
+        return view.form_invalid(form)
+    return HttpResponseRedirect(view.get_success_url())
+
+
 class ServiceListView(ListView):
     model = Service
     template_name = "services/service_list.html"
@@ -42,10 +209,10 @@ class BookingCreateView(LoginRequiredMixin, CreateView):
     success_url = reverse_lazy("bookings:my_bookings")
 
     def form_valid(self, form):
-        customer = get_object_or_404(Customer, user=self.request.user)
+        customer = customer_or_404(self.request)
         form.instance.customer = customer
         form.instance.status = "pending"
-        return super().form_valid(form)
+        return commit_form(self, form)
 
 
 class MyBookingsView(LoginRequiredMixin, ListView):
@@ -55,8 +222,12 @@ class MyBookingsView(LoginRequiredMixin, ListView):
     paginate_by = 10
 
     def get_queryset(self):
-        customer = get_object_or_404(Customer, user=self.request.user)
-        return Booking.objects.filter(customer=customer).order_by("-booking_date")
+        customer = customer_or_404(self.request)
+        return (
+            Booking.objects.filter(customer=customer)
+            .for_list()
+            .order_by("-booking_date", "-booking_time")
+        )
 
 
 class BookingDetailView(LoginRequiredMixin, DetailView):
@@ -65,9 +236,14 @@ class BookingDetailView(LoginRequiredMixin, DetailView):
 
     def get_queryset(self):
         if self.request.user.is_staff:
-            return Booking.objects.all()
-        customer = get_object_or_404(Customer, user=self.request.user)
-        return Booking.objects.filter(customer=customer)
+            return Booking.objects.with_related()
+        customer = customer_or_404(self.request)
+        return Booking.objects.filter(customer=customer).with_related()
+
+
+# Асинхронные варианты для запуска под ASGI (см. ASYNC_READ_VIEWS)
+my_bookings_async = async_class_view(MyBookingsView, login_required=True)
+booking_detail_async = async_class_view(BookingDetailView, login_required=True)
 
 
 class BookingUpdateView(LoginRequiredMixin, UpdateView):
@@ -76,8 +252,11 @@ class BookingUpdateView(LoginRequiredMixin, UpdateView):
     template_name = "bookings/booking_form.html"
 
     def get_queryset(self):
-        customer = get_object_or_404(Customer, user=self.request.user)
-        return Booking.objects.filter(customer=customer)
+        customer = customer_or_404(self.request)
+        return Booking.objects.filter(customer=customer).with_related()
+
+    def form_valid(self, form):
+        return commit_form(self, form)
 
     def get_success_url(self):
         return reverse_lazy("bookings:booking_detail", kwargs={"pk": self.object.pk})
@@ -89,8 +268,8 @@ class BookingDeleteView(LoginRequiredMixin, DeleteView):
     success_url = reverse_lazy("bookings:my_bookings")
 
     def get_queryset(self):
-        customer = get_object_or_404(Customer, user=self.request.user)
-        return Booking.objects.filter(customer=customer)
+        customer = customer_or_404(self.request)
+        return Booking.objects.filter(customer=customer).with_related()
 
 
 class UserRegistrationView(CreateView):
@@ -100,5 +279,6 @@ class UserRegistrationView(CreateView):
 
     def form_valid(self, form):
         response = super().form_valid(form)
-        login(self.request, self.object)
+        # Бэкендов несколько — новая сессия привязывается к первому
+        login(self.request, self.object, backend=settings.AUTHENTICATION_BACKENDS[0])
         return response
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class CarwashConfig(AppConfig):
+    name = "carwash"
+    verbose_name = "Автомойка"
+
+    def ready(self):
+        from . import database  # noqa: F401
@@ -8,9 +8,24 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 """
 
 import os
+import re
 
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "carwash.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Импорт после настройки Django
+from bookings.stream import board_stream  # noqa: E402
+
+# Поток изменений доски дня: /events/board/2024-01-15/
+BOARD_STREAM_PATH = re.compile(r"^/events/board/(?P<date>[0-9-]+)/$")
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "http":
+        match = BOARD_STREAM_PATH.match(scope["path"])
+        if match:
+            return await board_stream(scope, receive, send, match["date"])
+    return await django_application(scope, receive, send)
@@ -0,0 +1,79 @@
+"""
+Общие части асинхронных view.
+
+ORM и шаблоны в Django 3.2 синхронные, поэтому асинхронная view собирает
+данные и рендерит ответ за один переход в поток (``render_async``), а все
+остальное время — чтение запроса и отдача ответа медленному клиенту —
+не занимает рабочий поток.
+"""
+
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.shortcuts import render
+
+
+def _load_user(request):
+    user = request.user
+    # Обращение к атрибуту вычисляет ленивый объект (запрос сессии и
+    # пользователя), дальше он доступен и из цикла событий
+    user.is_authenticated
+    return user
+
+
+async def get_user(request):
+    """Пользователь запроса, загруженный вне цикла событий."""
+    return await sync_to_async(_load_user)(request)
+
+
+def async_login_required(view):
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        user = await get_user(request)
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path(), settings.LOGIN_URL)
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+def class_view_context(request, view_class, **kwargs):
+    """
+    Контекст синхронной ListView/DetailView без ее dispatch.
+
+    Асинхронные варианты так переиспользуют выборки, проверки доступа и
+    пагинацию исходных view и не расходятся с ними.
+    """
+    view = view_class(request=request, args=(), kwargs=kwargs)
+    if hasattr(view, "get_object"):
+        view.object = view.get_object()
+        return view.get_context_data(object=view.object)
+    view.object_list = view.get_queryset()
+    return view.get_context_data()
+
+
+def async_class_view(view_class, login_required=False):
+    """Асинхронный вариант class-based view для чтения."""
+
+    async def view(request, **kwargs):
+        return await render_async(
+            request, view_class.template_name, class_view_context, view_class, **kwargs
+        )
+
+    view.__name__ = view.__qualname__ = f"{view_class.__name__}Async"
+    view.view_class = view_class
+    return async_login_required(view) if login_required else view
+
+
+def _render(request, template_name, get_context, args, kwargs):
+    context = get_context(request, *args, **kwargs) if get_context else {}
+    return render(request, template_name, context)
+
+
+async def render_async(request, template_name, get_context=None, *args, **kwargs):
+    """Собрать контекст и отрендерить шаблон одним переходом в поток."""
+    return await sync_to_async(_render)(
+        request, template_name, get_context, args, kwargs
+    )
@@ -0,0 +1,41 @@
+"""
+Настройка соединений с базой данных.
+
+SQLite: при каждом новом соединении выполняются PRAGMA из SQLITE_PRAGMAS —
+журнал WAL (читатели не ждут писателя), synchronous=NORMAL (fsync только при
+контрольной точке WAL), время ожидания блокировки и отображение файла в
+память. Подходит для небольшой мойки с одним сервером.
+
+PostgreSQL: соединения живут CONN_MAX_AGE секунд между запросами. Django 3.2
+не проверяет такое соединение перед использованием, поэтому при
+DATABASE_HEALTH_CHECKS в начале запроса соединение, простоявшее между
+запросами, пингуется и при обрыве (перезапуск базы, разрыв по таймауту)
+закрывается — следующий запрос откроет новое вместо ошибки 500.
+"""
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+@receiver(connection_created)
+def tune_sqlite(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    pragmas = getattr(settings, "SQLITE_PRAGMAS", {})
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+@receiver(request_started)
+def check_connections(sender, **kwargs):
+    if not getattr(settings, "DATABASE_HEALTH_CHECKS", False):
+        return
+    for connection in connections.all():
+        persistent = connection.settings_dict["CONN_MAX_AGE"]
+        if connection.connection is not None and persistent:
+            if not connection.is_usable():
+                connection.close()
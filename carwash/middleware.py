@@ -0,0 +1,36 @@
+"""
+Основа middleware, работающих и под WSGI, и под ASGI.
+
+Под ASGI Django оставляет цепочку асинхронной, только если асинхронно
+может работать каждое middleware; иначе он переводит ее в синхронный режим
+и асинхронные view выполняются через async_to_sync в рабочем потоке —
+медленный клиент снова держит поток. Наследник реализует обработку запроса
+дважды: ``handle`` для синхронной цепочки и корутину ``ahandle`` для
+асинхронной.
+"""
+
+import asyncio
+
+
+class HybridMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # Так экземпляр считается корутиной, и Django не оборачивает его
+            # в async_to_sync (как делает MiddlewareMixin)
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.ahandle(request)
+        return self.handle(request)
+
+    def handle(self, request):
+        raise NotImplementedError
+
+    async def ahandle(self, request):
+        raise NotImplementedError
@@ -2,6 +2,7 @@
 Django settings for carwash project.
 """
 
+from datetime import time
 from pathlib import Path
 import os
 
@@ -21,28 +22,33 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "django_bootstrap5",
+    "carwash.apps.CarwashConfig",
     "bookings.apps.BookingsConfig",
     "services.apps.ServicesConfig",
     "customers.apps.CustomersConfig",
     "employees.apps.EmployeesConfig",
     "pages.apps.PagesConfig",
+    "monitoring.apps.MonitoringConfig",
 ]
 
 MIDDLEWARE = [
+    "monitoring.middleware.InstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "monitoring.middleware.ProfilingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "pages.middleware.AnonymousPageCacheMiddleware",
 ]
 
 ROOT_URLCONF = "carwash.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "BACKEND": "monitoring.templates.InstrumentedTemplates",
         "DIRS": [BASE_DIR / "templates"],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -51,19 +57,89 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "pages.context_processors.page_cache",
             ],
         },
     },
 ]
 
 WSGI_APPLICATION = "carwash.wsgi.application"
+ASGI_APPLICATION = "carwash.asgi.application"
+# Асинхронные варианты страниц чтения; включать при запуске под ASGI
+ASYNC_READ_VIEWS = os.environ.get("ASYNC_READ_VIEWS", "") == "1"
+
+# База данных (DATABASE_ENGINE):
+#   sqlite     — файл DATABASE_NAME (по умолчанию db.sqlite3) с PRAGMA из
+#                SQLITE_PRAGMAS (см. carwash/database.py), для небольших сайтов;
+#   postgresql — DATABASE_NAME/USER/PASSWORD/HOST/PORT и постоянные
+#                соединения на DATABASE_CONN_MAX_AGE секунд; драйвер
+#                ставится из requirements-postgres.txt (psycopg2-binary).
+DATABASE_ENGINE = os.environ.get("DATABASE_ENGINE", "sqlite")
+if DATABASE_ENGINE == "postgresql":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ.get("DATABASE_NAME", "carwash"),
+            "USER": os.environ.get("DATABASE_USER", "carwash"),
+            "PASSWORD": os.environ.get("DATABASE_PASSWORD", ""),
+            "HOST": os.environ.get("DATABASE_HOST", "localhost"),
+            "PORT": os.environ.get("DATABASE_PORT", "5432"),
+            "CONN_MAX_AGE": int(os.environ.get("DATABASE_CONN_MAX_AGE", "60")),
+            "OPTIONS": {"connect_timeout": 5},
+        }
+    }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.environ.get("DATABASE_NAME", BASE_DIR / "db.sqlite3"),
+        }
+    }
+# Проверка постоянного соединения в начале запроса (Django 3.2 сам не умеет)
+DATABASE_HEALTH_CHECKS = os.environ.get("DATABASE_HEALTH_CHECKS", "1") == "1"
+# PRAGMA для каждого соединения SQLite; SQLITE_TUNING=0 — настройки SQLite
+# по умолчанию (журнал DELETE, synchronous=FULL)
+SQLITE_PRAGMAS = (
+    {
+        "journal_mode": "wal",
+        "synchronous": "normal",
+        "busy_timeout": int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "memory",
+        "cache_size": -20000,
+    }
+    if os.environ.get("SQLITE_TUNING", "1") == "1"
+    else {}
+)
 
-DATABASES = {
+# Кэш. В разработке — память процесса; в продакшене на несколько воркеров
+# нужен общий бэкенд (Redis/Memcached), иначе сброс версий не дойдет до соседей
+CACHES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "carwash",
+        "TIMEOUT": 300,
+        "OPTIONS": {"MAX_ENTRIES": 5000},
     }
 }
+# Каталог услуг сбрасывается сигналами, поэтому может жить долго
+CATALOG_CACHE_TIMEOUT = 60 * 60 * 24
+# Профиль клиента сбрасывается сигналами; TTL страхует от update() в обход них.
+# Как и кэш пользователя, включается только с общим кэшем
+CUSTOMER_CACHE_TIMEOUT = 300
+# Страницы, которые анонимам отдаются из кэша целиком, и теги, сброс
+# которых их инвалидирует (см. pages/signals.py)
+PAGE_CACHE_PAGES = {
+    "bookings:index": ("site",),
+    "pages:about": ("site",),
+    "pages:contact": ("site",),
+    "pages:price_list": ("site", "catalog"),
+    "services:service_list": ("site", "catalog"),
+    "services:service_detail": ("site", "catalog"),
+}
+PAGE_CACHE_TIMEOUT = 60 * 10
+# Шапка и подвал для вошедших пользователей
+FRAGMENT_CACHE_TIMEOUT = 60 * 10
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -111,3 +187,57 @@ EMAIL_FILE_PATH = BASE_DIR / "sent_emails"
 LOGIN_REDIRECT_URL = "bookings:index"
 LOGIN_URL = "login"
 LOGOUT_REDIRECT_URL = "bookings:index"
+# Пользователь сессии кэшируется на AUTH_USER_CACHE_TIMEOUT секунд (0 — без
+# кэша), см. customers/backends.py. Включать только с общим для всех
+# воркеров кэшем (Memcached/Redis): с кэшем в памяти процесса бэкенд его не
+# использует, иначе блокировка и смена пароля не доходили бы до соседних
+# воркеров. ModelBackend остается вторым, чтобы сессии, открытые до
+# появления кэша, не разлогинивались
+AUTHENTICATION_BACKENDS = [
+    "customers.backends.CachedModelBackend",
+    "django.contrib.auth.backends.ModelBackend",
+]
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get("AUTH_USER_CACHE_TIMEOUT", "0"))
+
+# Хранилище сессий (SESSION_STORE):
+#   db             — таблица django_session, чтение на каждом запросе;
+#   cached_db      — чтение из кэша, запись сквозная в БД (по умолчанию);
+#   cache          — только кэш: быстрее всего, но сессии теряются при его
+#                    сбросе и требуют общего кэша при нескольких воркерах;
+#   signed_cookies — сессия в подписанной cookie, без хранилища вовсе.
+# Анонимы сессий не получают: CSRF-токен и сообщения живут в cookie.
+SESSION_ENGINES = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "cache": "django.contrib.sessions.backends.cache",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}
+SESSION_ENGINE = SESSION_ENGINES[os.environ.get("SESSION_STORE", "cached_db")]
+# Сессия пишется только при изменении; отметку окончания срока не обновляем
+SESSION_SAVE_EVERY_REQUEST = False
+
+# Расписание бронирований
+BOOKING_OPEN_TIME = time(8, 0)
+BOOKING_CLOSE_TIME = time(22, 0)
+BOOKING_SLOT_MINUTES = 5
+# Повторы сохранения записи при конфликте блокировок
+BOOKING_COMMIT_RETRIES = 10
+# Токен экранов боксов для потока событий доски (пусто — только персонал)
+BOARD_STREAM_TOKEN = os.environ.get("BOARD_STREAM_TOKEN", "")
+
+# Мониторинг: доля запросов с подсчетом SQL и шаблонов, порог повторов
+# одного SQL за запрос (N+1) и токен сборщика Prometheus
+MONITORING_SAMPLE_RATE = float(os.environ.get("MONITORING_SAMPLE_RATE", "0.05"))
+MONITORING_DUPLICATE_THRESHOLD = 3
+MONITORING_TOKEN = os.environ.get("MONITORING_TOKEN", "")
+# Профилирование запросов: доля случайно профилируемых запросов (0 — только
+# по заголовку X-Profile от персонала), имена URL для выборки (пусто — все),
+# лимит профилей в минуту на процесс, интервал сэмплов стека в секундах и
+# сколько последних профилей хранить на одно имя URL
+MONITORING_PROFILE_RATE = float(os.environ.get("MONITORING_PROFILE_RATE", "0"))
+MONITORING_PROFILE_VIEWS = [
+    name for name in os.environ.get("MONITORING_PROFILE_VIEWS", "").split(",") if name
+]
+MONITORING_PROFILE_MAX_PER_MINUTE = 6
+MONITORING_PROFILE_INTERVAL = 0.005
+MONITORING_PROFILE_KEEP = 50
@@ -11,6 +11,7 @@ urlpatterns = [
     path("customers/", include("customers.urls")),
     path("employees/", include("employees.urls")),
     path("pages/", include("pages.urls")),
+    path("monitoring/", include("monitoring.urls")),
     path("auth/", include("django.contrib.auth.urls")),
     path("auth/registration/", UserRegistrationView.as_view(), name="registration"),
 ]
@@ -0,0 +1,53 @@
+"""
+Бэкенд аутентификации с кэшем пользователя.
+
+AuthenticationMiddleware на каждом запросе загружает пользователя сессии из
+БД. Бэкенд держит его в кэше Django AUTH_USER_CACHE_TIMEOUT секунд (по
+умолчанию 0 — без кэша). Сохранение и удаление пользователя (в том числе
+смена пароля, блокировка и отметка last_login при входе) сбрасывают запись
+сигналом, поэтому проверка хэша сессии по паролю работает как прежде.
+Изменения через ``QuerySet.update()`` видны после истечения TTL.
+
+Сброс работает только в общем для всех воркеров кэше (Memcached, Redis,
+файловый): в кэше памяти процесса он не дошел бы до соседних воркеров, и
+заблокированный пользователь оставался бы в системе до истечения TTL.
+Поэтому с LocMemCache и DummyCache кэш пользователя не включается.
+"""
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+# Кэши, которые живут в памяти одного процесса
+LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+def _key(user_id):
+    return f"customers:user:{user_id}"
+
+
+def _timeout():
+    if isinstance(caches[DEFAULT_CACHE_ALIAS], LOCAL_CACHES):
+        return 0
+    return getattr(settings, "AUTH_USER_CACHE_TIMEOUT", 0)
+
+
+class CachedModelBackend(ModelBackend):
+    def get_user(self, user_id):
+        timeout = _timeout()
+        if not timeout:
+            return super().get_user(user_id)
+        key = _key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            # Неактивных и удаленных не кэшируем: get_user вернет None
+            if user is not None:
+                cache.set(key, user, timeout)
+        return user
+
+
+def invalidate(user_id):
+    cache.delete(_key(user_id))
@@ -0,0 +1,68 @@
+"""
+Кэш профиля клиента текущего пользователя.
+
+Почти каждая страница авторизованного клиента ищет его профиль по
+пользователю. Профиль запоминается на объекте запроса (``request.customer``),
+а между запросами лежит в кэше Django под ключом с id пользователя на
+CUSTOMER_CACHE_TIMEOUT секунд. Сигналы на сохранение и удаление клиента
+удаляют запись из кэша; изменения через ``QuerySet.update()`` сигналов не
+шлют и видны после истечения TTL.
+
+Как и кэш пользователя в ``backends``, профиль кэшируется только в общем
+для воркеров кэше: по скидке из профиля считается цена записи, и в памяти
+соседнего процесса, куда сброс не доходит, она устарела бы до конца TTL.
+"""
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.http import Http404
+
+from .backends import LOCAL_CACHES
+from .models import Customer
+
+# Отметка «у пользователя нет профиля», чтобы не спрашивать БД каждый раз
+MISSING = "missing"
+
+
+def _key(user_id):
+    return f"customers:profile:{user_id}"
+
+
+def _timeout():
+    if isinstance(caches[DEFAULT_CACHE_ALIAS], LOCAL_CACHES):
+        return 0
+    return getattr(settings, "CUSTOMER_CACHE_TIMEOUT", 300)
+
+
+def _load(user):
+    timeout = _timeout()
+    key = _key(user.pk)
+    customer = cache.get(key) if timeout else None
+    if customer is None:
+        customer = Customer.objects.filter(user_id=user.pk).first() or MISSING
+        if timeout:
+            cache.set(key, customer, timeout)
+    if customer == MISSING:
+        return None
+    # Пользователь уже загружен middleware аутентификации
+    customer.user = user
+    return customer
+
+
+def get_customer(request):
+    """Профиль клиента пользователя запроса или None (аноним, персонал)."""
+    if not hasattr(request, "customer"):
+        user = request.user
+        request.customer = _load(user) if user.is_authenticated else None
+    return request.customer
+
+
+def customer_or_404(request):
+    customer = get_customer(request)
+    if customer is None:
+        raise Http404("Профиль клиента не найден")
+    return customer
+
+
+def invalidate(user_id):
+    cache.delete(_key(user_id))
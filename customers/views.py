@@ -5,6 +5,7 @@ from django.views.generic import DetailView, UpdateView
 from django.urls import reverse_lazy
 from .models import Customer
 from .forms import CustomerUpdateForm
+from .profile_cache import customer_or_404
 
 
 class CustomerProfileView(LoginRequiredMixin, DetailView):
@@ -13,7 +14,12 @@ class CustomerProfileView(LoginRequiredMixin, DetailView):
     context_object_name = "customer_profile"
 
     def get_object(self):
-        return get_object_or_404(Customer, user=self.request.user)
+        return customer_or_404(self.request)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["recent_bookings"] = self.object.bookings.select_related("service")[:3]
+        return context
 
 
 class CustomerUpdateView(LoginRequiredMixin, UpdateView):
@@ -22,6 +28,7 @@ class CustomerUpdateView(LoginRequiredMixin, UpdateView):
     template_name = "customers/profile_edit.html"
 
     def get_object(self):
+        # Форма сохраняет все поля, поэтому берем свежую строку, а не кэш
         return get_object_or_404(Customer, user=self.request.user)
 
     def get_success_url(self):
@@ -0,0 +1,76 @@
+from django.contrib import admin
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.html import format_html_join
+
+from . import profiling
+from .models import ProfileSample
+
+
+def _attachment(content, name, content_type):
+    response = HttpResponse(content, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{name}"'
+    return response
+
+
+def _file_name(queryset, extension):
+    views = set(queryset.values_list("view_name", flat=True))
+    prefix = views.pop().replace(":", "-") if len(views) == 1 else "requests"
+    return f"{prefix}-{timezone.now():%Y%m%d-%H%M%S}.{extension}"
+
+
+@admin.register(ProfileSample)
+class ProfileSampleAdmin(admin.ModelAdmin):
+    """
+    Профили запросов. Выбранные профили (обычно отфильтрованные по имени URL)
+    скачиваются одним файлом: pstats для snakeviz/pstats или collapsed stacks
+    для flamegraph.pl и speedscope.
+    """
+
+    list_display = (
+        "created_at",
+        "view_name",
+        "method",
+        "status",
+        "duration_ms",
+        "samples",
+        "trigger",
+    )
+    list_filter = ("view_name", "trigger", "method")
+    search_fields = ("path",)
+    date_hierarchy = "created_at"
+    exclude = ("stats", "stacks")
+    readonly_fields = ("top_functions",)
+    actions = ["download_pstats", "download_stacks"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description="Самые дорогие функции (собственное время)")
+    def top_functions(self, obj):
+        return format_html_join(
+            "\n",
+            "<div><code>{}</code> — вызовов {}, {} с</div>",
+            profiling.top(bytes(obj.stats)),
+        )
+
+    @admin.action(description="Скачать pstats выбранных профилей")
+    def download_pstats(self, request, queryset):
+        dumps = (bytes(data) for data in queryset.values_list("stats", flat=True))
+        return _attachment(
+            profiling.merge_stats(dumps),
+            _file_name(queryset, "pstats"),
+            "application/octet-stream",
+        )
+
+    @admin.action(description="Скачать collapsed stacks выбранных профилей")
+    def download_stacks(self, request, queryset):
+        texts = queryset.values_list("stacks", flat=True)
+        return _attachment(
+            profiling.merge_stacks(texts),
+            _file_name(queryset, "folded"),
+            "text/plain; charset=utf-8",
+        )
@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+
+
+class MonitoringConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "monitoring"
+    verbose_name = "Мониторинг"
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from .metrics import install_probe
+
+        connection_created.connect(install_probe)
@@ -0,0 +1,221 @@
+"""
+Метрики запросов по имени URL в памяти процесса.
+
+Каждый запрос учитывается в счетчике и гистограмме задержек. Для доли
+запросов (MONITORING_SAMPLE_RATE) дополнительно считаются SQL-запросы и
+время в БД, время рендеринга шаблонов и повторы одного и того же SQL —
+признак N+1. Счетчики живут в процессе: при нескольких воркерах Prometheus
+собирает их с каждого отдельно.
+"""
+
+import re
+import threading
+import time as timer
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+
+# Верхние границы корзин гистограммы задержек, в секундах
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Сколько разных сигнатур повторяющихся запросов хранить на один view
+MAX_SIGNATURES = 20
+UNRESOLVED = "<unresolved>"
+
+# Замер текущего запроса, если он попал в выборку
+current = ContextVar("monitoring_probe", default=None)
+
+_IN_LIST = re.compile(r"\((?:%s, )+%s\)")
+_SPACES = re.compile(r"\s+")
+
+
+def signature(sql):
+    """SQL без параметров: списки IN любой длины сводятся к одному виду."""
+    return _SPACES.sub(" ", _IN_LIST.sub("(%s, ...)", sql)).strip()[:300]
+
+
+class Probe:
+    """Замер одного запроса; SQL передает ему record_query."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.render_seconds = 0.0
+        self.signatures = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = timer.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_seconds += timer.perf_counter() - started
+            self.queries += 1
+            self.signatures[sql] += 1
+
+    def duplicates(self, threshold):
+        """{сигнатура: лишних выполнений} для SQL, повторенного ``threshold`` раз."""
+        repeated = Counter()
+        for sql, count in self.signatures.items():
+            if count >= threshold:
+                repeated[signature(sql)] += count - 1
+        return repeated
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Постоянный execute_wrapper соединений: отдает запрос замеру из контекста.
+
+    Контекст копируется в sync_to_async, поэтому замер видит и запросы
+    асинхронных view, выполняемые в рабочем потоке.
+    """
+    probe = current.get()
+    if probe is None:
+        return execute(sql, params, many, context)
+    return probe(execute, sql, params, many, context)
+
+
+def install_probe(sender, connection, **kwargs):
+    """Обработчик connection_created: подключить record_query к соединению."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class ViewStats:
+    def __init__(self):
+        self.requests = Counter()
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.sampled = 0
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.render_seconds = 0.0
+        self.duplicates = 0
+        self.signatures = Counter()
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+
+    def reset(self):
+        with self.lock:
+            self.views = {}
+
+    def observe(self, view, method, status, seconds, probe=None, threshold=3):
+        duplicates = probe.duplicates(threshold) if probe is not None else None
+        with self.lock:
+            stats = self.views.get(view)
+            if stats is None:
+                stats = self.views[view] = ViewStats()
+            stats.requests[method, status] += 1
+            stats.buckets[bisect_left(BUCKETS, seconds)] += 1
+            stats.latency_sum += seconds
+            if probe is None:
+                return
+            stats.sampled += 1
+            stats.queries += probe.queries
+            stats.sql_seconds += probe.sql_seconds
+            stats.render_seconds += probe.render_seconds
+            for sql, extra in duplicates.items():
+                stats.duplicates += extra
+                # Новые сигнатуры сверх лимита не заводим, чтобы не раздувать
+                # число временных рядов
+                if sql in stats.signatures or len(stats.signatures) < MAX_SIGNATURES:
+                    stats.signatures[sql] += extra
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                view: {
+                    "requests": dict(stats.requests),
+                    "buckets": list(stats.buckets),
+                    "latency_sum": stats.latency_sum,
+                    "sampled": stats.sampled,
+                    "queries": stats.queries,
+                    "sql_seconds": stats.sql_seconds,
+                    "render_seconds": stats.render_seconds,
+                    "duplicates": stats.duplicates,
+                    "signatures": dict(stats.signatures),
+                }
+                for view, stats in self.views.items()
+            }
+
+
+registry = Registry()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels):
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+def _number(value):
+    return repr(round(value, 6)) if isinstance(value, float) else str(value)
+
+
+# Счетчики по view: имя, описание и поле сводки
+SIMPLE = [
+    ("carwash_sampled_requests_total", "Запросы в выборке", "sampled"),
+    ("carwash_sql_queries_total", "SQL-запросы в выборке", "queries"),
+    ("carwash_sql_seconds_total", "Время в БД в выборке", "sql_seconds"),
+    (
+        "carwash_sql_duplicate_queries_total",
+        "Лишние повторы одинакового SQL (N+1) в выборке",
+        "duplicates",
+    ),
+    (
+        "carwash_template_render_seconds_total",
+        "Время рендеринга шаблонов в выборке",
+        "render_seconds",
+    ),
+]
+
+
+def render(snapshot=None):
+    """Метрики в текстовом формате Prometheus."""
+    views = registry.snapshot() if snapshot is None else snapshot
+    lines = [
+        "# HELP carwash_requests_total Запросы по имени URL, методу и статусу",
+        "# TYPE carwash_requests_total counter",
+    ]
+    for view, stats in sorted(views.items()):
+        for (method, status), count in sorted(stats["requests"].items()):
+            labels = _labels(view=view, method=method, status=status)
+            lines.append(f"carwash_requests_total{{{labels}}} {count}")
+
+    lines += [
+        "# HELP carwash_request_duration_seconds Задержка ответа",
+        "# TYPE carwash_request_duration_seconds histogram",
+    ]
+    for view, stats in sorted(views.items()):
+        cumulative = 0
+        for bound, count in zip(BUCKETS + ("+Inf",), stats["buckets"]):
+            cumulative += count
+            labels = _labels(view=view, le=bound)
+            lines.append(
+                f"carwash_request_duration_seconds_bucket{{{labels}}} {cumulative}"
+            )
+        labels = _labels(view=view)
+        lines.append(
+            f"carwash_request_duration_seconds_sum{{{labels}}} "
+            f"{_number(stats['latency_sum'])}"
+        )
+        lines.append(f"carwash_request_duration_seconds_count{{{labels}}} {cumulative}")
+
+    for name, description, field in SIMPLE:
+        lines += [f"# HELP {name} {description}", f"# TYPE {name} counter"]
+        for view, stats in sorted(views.items()):
+            lines.append(f"{name}{{{_labels(view=view)}}} {_number(stats[field])}")
+
+    name = "carwash_sql_duplicate_signature_total"
+    lines += [
+        f"# HELP {name} Лишние повторы по сигнатуре SQL",
+        f"# TYPE {name} counter",
+    ]
+    for view, stats in sorted(views.items()):
+        for sql, count in sorted(stats["signatures"].items()):
+            lines.append(f"{name}{{{_labels(view=view, signature=sql)}}} {count}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,146 @@
+import random
+import time as timer
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.urls import Resolver404, resolve
+
+from carwash.middleware import HybridMiddleware
+
+from . import profiling
+from .metrics import UNRESOLVED, Probe, current, registry
+from .models import ProfileSample
+
+
+class InstrumentationMiddleware(HybridMiddleware):
+    """
+    Учитывает задержку каждого запроса по имени URL.
+
+    Запросы из выборки (MONITORING_SAMPLE_RATE) дополнительно получают
+    замер SQL и шаблонов; остальные стоят пару вызовов perf_counter.
+    Ставится первым в MIDDLEWARE, чтобы задержка включала работу остальных
+    middleware.
+    """
+
+    def handle(self, request):
+        probe, token, started = self._start()
+        try:
+            response = self.get_response(request)
+        finally:
+            current.reset(token)
+        self._observe(request, response, probe, started)
+        return response
+
+    async def ahandle(self, request):
+        probe, token, started = self._start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current.reset(token)
+        self._observe(request, response, probe, started)
+        return response
+
+    def _start(self):
+        rate = getattr(settings, "MONITORING_SAMPLE_RATE", 0)
+        probe = Probe() if rate and random.random() < rate else None
+        return probe, current.set(probe), timer.perf_counter()
+
+    def _observe(self, request, response, probe, started):
+        seconds = timer.perf_counter() - started
+        match = getattr(request, "resolver_match", None)
+        registry.observe(
+            match.view_name if match else UNRESOLVED,
+            request.method,
+            response.status_code,
+            seconds,
+            probe,
+            getattr(settings, "MONITORING_DUPLICATE_THRESHOLD", 3),
+        )
+
+
+class ProfilingMiddleware(HybridMiddleware):
+    """
+    Профилирует отдельные запросы (см. monitoring.profiling).
+
+    Сотрудник включает профиль заголовком ``X-Profile: 1``; кроме того, доля
+    MONITORING_PROFILE_RATE запросов к URL из MONITORING_PROFILE_VIEWS (или к
+    любым, если список пуст) профилируется сама. Ставится после
+    AuthenticationMiddleware, чтобы видеть пользователя; без заголовка и при
+    нулевой доле стоит одну проверку настроек.
+    """
+
+    def handle(self, request):
+        trigger = self._trigger(request)
+        if not self._allowed(trigger):
+            return self.get_response(request)
+        started = timer.perf_counter()
+        with profiling.Capture(self._interval()) as capture:
+            response = self.get_response(request)
+        self._save(request, response, trigger, timer.perf_counter() - started, capture)
+        return response
+
+    async def ahandle(self, request):
+        if request.headers.get(profiling.HEADER) == "1":
+            # Проверка сотрудника загружает пользователя из БД
+            trigger = await sync_to_async(self._trigger)(request)
+        else:
+            trigger = self._trigger(request)
+        if not self._allowed(trigger):
+            return await self.get_response(request)
+        # Профиль снимается с потока цикла событий: синхронные части view,
+        # ушедшие в sync_to_async, в него не попадают
+        started = timer.perf_counter()
+        with profiling.Capture(self._interval()) as capture:
+            response = await self.get_response(request)
+        await sync_to_async(self._save)(
+            request, response, trigger, timer.perf_counter() - started, capture
+        )
+        return response
+
+    def _allowed(self, trigger):
+        return trigger is not None and profiling.budget.take(
+            getattr(settings, "MONITORING_PROFILE_MAX_PER_MINUTE", 6)
+        )
+
+    def _interval(self):
+        return getattr(settings, "MONITORING_PROFILE_INTERVAL", 0.005)
+
+    def _trigger(self, request):
+        if request.headers.get(profiling.HEADER) == "1":
+            user = getattr(request, "user", None)
+            return "header" if user is not None and user.is_staff else None
+        rate = getattr(settings, "MONITORING_PROFILE_RATE", 0)
+        if not rate or random.random() >= rate:
+            return None
+        views = getattr(settings, "MONITORING_PROFILE_VIEWS", ())
+        if views:
+            try:
+                view_name = resolve(request.path_info).view_name
+            except Resolver404:
+                return None
+            if view_name not in views:
+                return None
+        return "sample"
+
+    def _save(self, request, response, trigger, seconds, capture):
+        match = getattr(request, "resolver_match", None)
+        view_name = match.view_name if match else UNRESOLVED
+        ProfileSample.objects.create(
+            view_name=view_name,
+            method=request.method,
+            path=request.path[:500],
+            status=response.status_code,
+            duration_ms=round(seconds * 1000, 3),
+            trigger=trigger,
+            samples=sum(capture.stacks.values()),
+            stats=profiling.dump_stats(capture.stats),
+            stacks=profiling.format_stacks(capture.stacks),
+        )
+        keep = getattr(settings, "MONITORING_PROFILE_KEEP", 50)
+        stale = list(
+            ProfileSample.objects.filter(view_name=view_name)
+            .order_by("-id")
+            .values_list("id", flat=True)[keep:]
+        )
+        if stale:
+            ProfileSample.objects.filter(pk__in=stale).delete()
@@ -0,0 +1,71 @@
+# Generated by Django 3.2.16 on 2026-10-18 11:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="ProfileSample",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Снят"),
+                ),
+                (
+                    "view_name",
+                    models.CharField(
+                        db_index=True, max_length=200, verbose_name="Имя URL"
+                    ),
+                ),
+                ("method", models.CharField(max_length=10, verbose_name="Метод")),
+                ("path", models.CharField(max_length=500, verbose_name="Путь")),
+                (
+                    "status",
+                    models.PositiveSmallIntegerField(verbose_name="Статус ответа"),
+                ),
+                ("duration_ms", models.FloatField(verbose_name="Длительность, мс")),
+                (
+                    "trigger",
+                    models.CharField(
+                        choices=[
+                            ("header", "Заголовок сотрудника"),
+                            ("sample", "Случайная выборка"),
+                        ],
+                        max_length=10,
+                        verbose_name="Причина",
+                    ),
+                ),
+                (
+                    "samples",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Сэмплов стека"
+                    ),
+                ),
+                ("stats", models.BinaryField(verbose_name="Статистика pstats")),
+                (
+                    "stacks",
+                    models.TextField(blank=True, verbose_name="Collapsed stacks"),
+                ),
+            ],
+            options={
+                "verbose_name": "профиль запроса",
+                "verbose_name_plural": "Профили запросов",
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+from django.db import models
+
+
+class ProfileSample(models.Model):
+    """Профиль одного запроса: статистика cProfile и сэмплы стека."""
+
+    TRIGGER_CHOICES = [
+        ("header", "Заголовок сотрудника"),
+        ("sample", "Случайная выборка"),
+    ]
+
+    created_at = models.DateTimeField("Снят", auto_now_add=True)
+    view_name = models.CharField("Имя URL", max_length=200, db_index=True)
+    method = models.CharField("Метод", max_length=10)
+    path = models.CharField("Путь", max_length=500)
+    status = models.PositiveSmallIntegerField("Статус ответа")
+    duration_ms = models.FloatField("Длительность, мс")
+    trigger = models.CharField("Причина", max_length=10, choices=TRIGGER_CHOICES)
+    samples = models.PositiveIntegerField("Сэмплов стека", default=0)
+    stats = models.BinaryField("Статистика pstats")
+    stacks = models.TextField("Collapsed stacks", blank=True)
+
+    class Meta:
+        verbose_name = "профиль запроса"
+        verbose_name_plural = "Профили запросов"
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.view_name} {self.created_at:%Y-%m-%d %H:%M:%S}"
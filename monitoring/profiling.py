@@ -0,0 +1,168 @@
+"""
+Профилирование отдельных запросов на рабочем сервере.
+
+Запрос профилируется, если его прислал сотрудник с заголовком
+``X-Profile: 1`` или он попал в выборку MONITORING_PROFILE_RATE (по
+умолчанию 0 — выключено). Для такого запроса одновременно работают cProfile
+(статистика по функциям, файл pstats) и поток-сэмплер, который каждые
+MONITORING_PROFILE_INTERVAL секунд снимает стек потока запроса (collapsed
+stacks для flamegraph.pl и speedscope). Число профилей в минуту на процесс
+ограничено MONITORING_PROFILE_MAX_PER_MINUTE, в базе хранится не больше
+MONITORING_PROFILE_KEEP последних профилей на имя URL.
+"""
+
+import cProfile
+import marshal
+import pstats
+import sys
+import threading
+import time as timer
+from collections import Counter, deque
+
+HEADER = "X-Profile"
+# Глубже этого стек обрезается: хватает для Django, а сэмпл остается дешевым
+MAX_DEPTH = 128
+
+
+class Budget:
+    """Скользящее окно в минуту: не больше ``limit`` профилей на процесс."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = deque()
+
+    def take(self, limit, now=None):
+        now = timer.monotonic() if now is None else now
+        with self.lock:
+            while self.started and now - self.started[0] >= 60:
+                self.started.popleft()
+            if len(self.started) >= limit:
+                return False
+            self.started.append(now)
+            return True
+
+    def reset(self):
+        with self.lock:
+            self.started.clear()
+
+
+budget = Budget()
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", code.co_filename)
+    return f"{module}:{code.co_name}"
+
+
+def collapse(frame, stop=None):
+    """Стек от корня к ``frame`` в виде ``a;b;c``; ``stop`` — кадр-корень."""
+    names = []
+    while frame is not None and len(names) < MAX_DEPTH:
+        names.append(_frame_name(frame))
+        if frame is stop:
+            break
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class StackSampler(threading.Thread):
+    """Поток, снимающий стек другого потока через равные интервалы."""
+
+    def __init__(self, thread_id, interval, root=None):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.root = root
+        self.stacks = Counter()
+        self.halt = threading.Event()
+
+    def run(self):
+        while not self.halt.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return
+            self.stacks[collapse(frame, self.root)] += 1
+
+    def stop(self):
+        self.halt.set()
+        self.join()
+        return self.stacks
+
+
+class Capture:
+    """Профиль одного запроса: cProfile и сэмплы стека вместе."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.profile = cProfile.Profile()
+        self.sampler = None
+        self.stats = None
+        self.stacks = Counter()
+
+    def __enter__(self):
+        self.sampler = StackSampler(
+            threading.get_ident(), self.interval, sys._getframe(1)
+        )
+        self.sampler.start()
+        self.profile.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profile.disable()
+        self.stacks = self.sampler.stop()
+        self.profile.create_stats()
+        self.stats = self.profile.stats
+        return False
+
+
+def dump_stats(stats):
+    """Статистика cProfile в формате файла pstats (как Profile.dump_stats)."""
+    return marshal.dumps(stats)
+
+
+class _Loaded:
+    """Обертка над сохраненной статистикой для pstats.Stats."""
+
+    def __init__(self, data):
+        self.stats = marshal.loads(data)
+
+    def create_stats(self):
+        pass
+
+
+def merge_stats(dumps):
+    """Объединить несколько файлов pstats в один."""
+    merged = None
+    for data in dumps:
+        if merged is None:
+            merged = pstats.Stats(_Loaded(data))
+        else:
+            merged.add(_Loaded(data))
+    return dump_stats(merged.stats if merged is not None else {})
+
+
+def format_stacks(stacks):
+    """Collapsed stacks: строка ``стек число`` на каждый стек."""
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+
+
+def merge_stacks(texts):
+    """Сложить несколько файлов collapsed stacks."""
+    total = Counter()
+    for text in texts:
+        for line in text.splitlines():
+            stack, _, count = line.rpartition(" ")
+            if stack:
+                total[stack] += int(count)
+    return format_stacks(total)
+
+
+def top(data, limit=15):
+    """Самые дорогие функции по собственному времени: [(функция, вызовов, сек)]."""
+    stats = marshal.loads(data)
+    rows = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)
+    return [
+        (pstats.func_std_string(func), calls, round(own, 6))
+        for func, (_, calls, own, _, _) in rows[:limit]
+    ]
@@ -0,0 +1,38 @@
+"""
+Шаблонный бэкенд, который засекает время рендеринга для выборки запросов.
+
+Замеряется только рендеринг шаблона верхнего уровня (страницы целиком):
+вложенные extends и include выполняются внутри него.
+"""
+
+import time as timer
+
+from django.template.backends.django import DjangoTemplates
+
+from .metrics import current
+
+
+class TimedTemplate:
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        probe = current.get()
+        if probe is None:
+            return self.template.render(context, request)
+        started = timer.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            probe.render_seconds += timer.perf_counter() - started
+
+
+class InstrumentedTemplates(DjangoTemplates):
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
@@ -0,0 +1,31 @@
+import hmac
+
+from django.conf import settings
+from django.contrib.auth.decorators import user_passes_test
+from django.http import HttpResponse
+
+from .metrics import render
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _response():
+    return HttpResponse(render(), content_type=CONTENT_TYPE)
+
+
+@user_passes_test(lambda user: user.is_staff)
+def _staff_metrics(request):
+    return _response()
+
+
+def metrics(request):
+    """
+    Метрики в формате Prometheus: для персонала или по токену сборщика.
+
+    Сборщик передает заголовок ``Authorization: Bearer <MONITORING_TOKEN>``.
+    """
+    token = getattr(settings, "MONITORING_TOKEN", "")
+    header = request.headers.get("Authorization", "")
+    if token and hmac.compare_digest(header, f"Bearer {token}"):
+        return _response()
+    return _staff_metrics(request)
@@ -0,0 +1,87 @@
+"""
+Кэш целых страниц для анонимных посетителей.
+
+Каждая страница из ``settings.PAGE_CACHE_PAGES`` зависит от набора тегов;
+ключ ответа содержит текущие версии этих тегов, поэтому сброс тега сигналом
+моментально делает все зависимые страницы промахами. TTL остается только
+страховкой. Счетчики попаданий и промахов лежат в том же кэше.
+"""
+
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+HIT = "hits"
+MISS = "misses"
+
+
+def pages():
+    return getattr(settings, "PAGE_CACHE_PAGES", {})
+
+
+def timeout():
+    return getattr(settings, "PAGE_CACHE_TIMEOUT", 600)
+
+
+def _tag_key(tag):
+    return f"pagecache:tag:{tag}"
+
+
+def page_key(view_name, path):
+    """Ключ ответа с учетом текущих версий тегов страницы."""
+    tag_keys = [_tag_key(tag) for tag in pages()[view_name]]
+    versions = cache.get_many(tag_keys)
+    missing = {key: uuid.uuid4().hex for key in tag_keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    digest = hashlib.md5(
+        "|".join(versions[key] for key in tag_keys).encode()
+    ).hexdigest()
+    return f"pagecache:page:{digest}:{path}"
+
+
+def invalidate(*tags):
+    """Сбросить страницы, зависящие от тегов."""
+    cache.set_many({_tag_key(tag): uuid.uuid4().hex for tag in tags}, None)
+
+
+def _stats_key(view_name, outcome):
+    return f"pagecache:stats:{view_name}:{outcome}"
+
+
+def count(view_name, outcome):
+    key = _stats_key(view_name, outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Счетчика еще нет (или его вытеснили) — начинаем заново
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+
+def stats():
+    """Попадания и промахи по страницам и в целом."""
+    names = list(pages())
+    counters = cache.get_many(
+        [_stats_key(name, outcome) for name in names for outcome in (HIT, MISS)]
+    )
+    result = {"pages": {}}
+    total = {HIT: 0, MISS: 0}
+    for name in names:
+        page = {
+            outcome: counters.get(_stats_key(name, outcome), 0)
+            for outcome in (HIT, MISS)
+        }
+        page["hit_ratio"] = _ratio(page[HIT], page[MISS])
+        result["pages"][name] = page
+        total[HIT] += page[HIT]
+        total[MISS] += page[MISS]
+    result.update(total, hit_ratio=_ratio(total[HIT], total[MISS]))
+    return result
+
+
+def _ratio(hits, misses):
+    return round(hits / (hits + misses), 4) if hits + misses else None
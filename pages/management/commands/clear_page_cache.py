@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from pages import cache as page_cache
+
+
+class Command(BaseCommand):
+    help = "Сброс кэша страниц (например, после выкладки шаблонов)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "tags", nargs="*", help="Теги страниц (по умолчанию — все страницы)"
+        )
+
+    def handle(self, *args, **options):
+        tags = options["tags"] or sorted(
+            {tag for tags in settings.PAGE_CACHE_PAGES.values() for tag in tags}
+        )
+        page_cache.invalidate(*tags)
+        self.stdout.write(self.style.SUCCESS(f"Сброшены теги: {', '.join(tags)}"))
@@ -0,0 +1,72 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from carwash.middleware import HybridMiddleware
+
+from . import cache as page_cache
+
+
+class AnonymousPageCacheMiddleware(HybridMiddleware):
+    """
+    Отдает анонимным посетителям готовые ответы из кэша.
+
+    Анонимным считается запрос без cookie сессии и сообщений: такие страницы
+    одинаковы для всех. Ответы, которые ставят cookie (CSRF, сессия), не
+    кэшируются.
+    Ставится последним в MIDDLEWARE, чтобы остальные middleware обрабатывали
+    и ответ из кэша. Под ASGI process_view Django сам вызывает через
+    sync_to_async.
+    """
+
+    def handle(self, request):
+        response = self.get_response(request)
+        key = getattr(request, "_page_cache_key", None)
+        if key and self._cacheable(request, response):
+            self._store(key, response)
+        return response
+
+    async def ahandle(self, request):
+        response = await self.get_response(request)
+        key = getattr(request, "_page_cache_key", None)
+        if key and self._cacheable(request, response):
+            # Кэш Django 3.2 синхронный (а может быть и сетевым)
+            await sync_to_async(self._store)(key, response)
+        return response
+
+    def _store(self, key, response):
+        page_cache.cache.set(key, response, page_cache.timeout())
+        response["X-Page-Cache"] = "miss"
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_name = request.resolver_match.view_name
+        if view_name not in page_cache.pages() or not self._anonymous(request):
+            return None
+        key = page_cache.page_key(view_name, request.get_full_path())
+        response = page_cache.cache.get(key)
+        if response is not None:
+            page_cache.count(view_name, page_cache.HIT)
+            response["X-Page-Cache"] = "hit"
+            return response
+        page_cache.count(view_name, page_cache.MISS)
+        request._page_cache_key = key
+        return None
+
+    def _anonymous(self, request):
+        return (
+            request.method in ("GET", "HEAD")
+            and settings.SESSION_COOKIE_NAME not in request.COOKIES
+            and "messages" not in request.COOKIES
+        )
+
+    def _cacheable(self, request, response):
+        # Cookie CSRF и сессии внешние middleware ставят уже после нас,
+        # поэтому смотрим на признаки в самом запросе
+        session = getattr(request, "session", None)
+        return (
+            response.status_code == 200
+            and not request.META.get("CSRF_COOKIE_USED")
+            and not (session is not None and session.modified)
+            and not response.streaming
+            and not response.cookies
+            and "private" not in response.get("Cache-Control", "")
+        )
@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from services.models import Service, ServiceCategory
+
+from . import cache as page_cache
+
+
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+@receiver(post_save, sender=ServiceCategory)
+@receiver(post_delete, sender=ServiceCategory)
+def catalog_changed(sender, **kwargs):
+    page_cache.invalidate("catalog")
@@ -7,4 +7,5 @@ urlpatterns = [
     path("about/", views.AboutView.as_view(), name="about"),
     path("contact/", views.ContactView.as_view(), name="contact"),
     path("price-list/", views.PriceListView.as_view(), name="price_list"),
+    path("cache-stats/", views.cache_stats, name="cache_stats"),
 ]
@@ -1,6 +1,12 @@
+from django.contrib.auth.decorators import user_passes_test
+from django.http import JsonResponse
 from django.shortcuts import render
 from django.views.generic import TemplateView
 
+from services import catalog
+
+from . import cache as page_cache
+
 
 class AboutView(TemplateView):
     template_name = "pages/about.html"
@@ -15,13 +21,17 @@ class PriceListView(TemplateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        from services.models import Service, ServiceCategory
-
-        context["categories"] = ServiceCategory.objects.all()
-        context["services"] = Service.objects.filter(is_active=True)
+        context["categories"] = catalog.get_catalog()
+        context["services"] = catalog.active_services()
         return context
 
 
+@user_passes_test(lambda user: user.is_staff)
+def cache_stats(request):
+    """Попадания и промахи кэша страниц (для персонала)."""
+    return JsonResponse(page_cache.stats())
+
+
 def csrf_failure(request, reason=""):
     return render(request, "pages/403csrf.html", status=403)
 
@@ -15,6 +15,6 @@ class ServiceCategoryAdmin(admin.ModelAdmin):
 
 @admin.register(Service)
 class ServiceAdmin(admin.ModelAdmin):
-    list_display = ("name", "category", "price", "duration", "is_active")
-    list_filter = ("category", "is_active")
+    list_display = ("name", "category", "price", "duration", "box_type", "is_active")
+    list_filter = ("category", "box_type", "is_active")
     search_fields = ("name", "description")
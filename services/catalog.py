@@ -0,0 +1,57 @@
+"""
+Кэш каталога услуг.
+
+Дерево «категория → активные услуги» строится одним запросом с prefetch и
+хранится в кэше Django под ключом с номером версии. Сигналы на сохранение и
+удаление услуг и категорий меняют версию, поэтому прайс-лист и список услуг
+после прогрева не обращаются к БД вовсе.
+"""
+
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Prefetch
+
+from .models import Service, ServiceCategory
+
+VERSION_KEY = "services:catalog:version"
+
+
+def _version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # add() не перетрет версию, которую успел записать другой процесс
+        cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def build_catalog():
+    """Категории с активными услугами в атрибуте ``active_services``."""
+    active = Service.objects.filter(is_active=True).order_by("name")
+    return list(
+        ServiceCategory.objects.prefetch_related(
+            Prefetch("services", queryset=active, to_attr="active_services")
+        )
+    )
+
+
+def get_catalog():
+    key = f"services:catalog:{_version()}"
+    categories = cache.get(key)
+    if categories is None:
+        categories = build_catalog()
+        cache.set(key, categories, getattr(settings, "CATALOG_CACHE_TIMEOUT", None))
+    return categories
+
+
+def active_services():
+    """Все активные услуги в порядке каталога."""
+    return [
+        service for category in get_catalog() for service in category.active_services
+    ]
+
+
+def invalidate():
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
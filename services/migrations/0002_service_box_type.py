@@ -0,0 +1,24 @@
+# Generated by Django 3.2.16 on 2026-10-18 10:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("services", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="service",
+            name="box_type",
+            field=models.CharField(
+                blank=True,
+                choices=[("standard", "Стандартный"), ("premium", "Премиум")],
+                help_text="Оставьте пустым, если подходит любой бокс",
+                max_length=20,
+                verbose_name="Тип бокса",
+            ),
+        ),
+    ]
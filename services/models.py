@@ -16,6 +16,11 @@ class ServiceCategory(models.Model):
 
 
 class Service(models.Model):
+    BOX_TYPES = [
+        ("standard", "Стандартный"),
+        ("premium", "Премиум"),
+    ]
+
     name = models.CharField("Название услуги", max_length=200)
     description = models.TextField("Описание", blank=True)
     price = models.DecimalField("Цена", max_digits=8, decimal_places=2)
@@ -28,6 +33,13 @@ class Service(models.Model):
         verbose_name="Категория",
         related_name="services",
     )
+    box_type = models.CharField(
+        "Тип бокса",
+        max_length=20,
+        choices=BOX_TYPES,
+        blank=True,
+        help_text="Оставьте пустым, если подходит любой бокс",
+    )
     is_active = models.BooleanField("Активна", default=True)
 
     class Meta:
@@ -1,9 +1,21 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# Под ASGI страницы чтения отдаются асинхронными вариантами
+ASYNC = settings.ASYNC_READ_VIEWS
+
 app_name = "services"
 
 urlpatterns = [
-    path("", views.ServiceListView.as_view(), name="service_list"),
-    path("<int:pk>/", views.ServiceDetailView.as_view(), name="service_detail"),
+    path(
+        "",
+        views.service_list_async if ASYNC else views.ServiceListView.as_view(),
+        name="service_list",
+    ),
+    path(
+        "<int:pk>/",
+        views.service_detail_async if ASYNC else views.ServiceDetailView.as_view(),
+        name="service_detail",
+    ),
 ]
@@ -1,5 +1,8 @@
 from django.views.generic import ListView, DetailView
-from .models import Service, ServiceCategory
+from carwash.async_views import async_class_view
+
+from . import catalog
+from .models import Service
 
 
 class ServiceListView(ListView):
@@ -8,11 +11,12 @@ class ServiceListView(ListView):
     context_object_name = "services"
 
     def get_queryset(self):
-        return Service.objects.filter(is_active=True).select_related("category")
+        # Список берется из кэша каталога, а не из БД
+        return catalog.active_services()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["categories"] = ServiceCategory.objects.all()
+        context["categories"] = catalog.get_catalog()
         return context
 
 
@@ -20,3 +24,8 @@ class ServiceDetailView(DetailView):
     model = Service
     template_name = "services/service_detail.html"
     context_object_name = "service"
+
+
+# Асинхронные варианты для запуска под ASGI (см. ASYNC_READ_VIEWS)
+service_list_async = async_class_view(ServiceListView)
+service_detail_async = async_class_view(ServiceDetailView)
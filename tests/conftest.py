@@ -0,0 +1,9 @@
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Кэш страниц, каталога и профилей не переживает откат БД между тестами."""
+    cache.clear()
+    yield
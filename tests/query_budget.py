@@ -0,0 +1,30 @@
+import tempfile
+from pathlib import Path
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Кэши пользователя и профиля включаются только с общим кэшем; файловый —
+# самый простой
+SHARED_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": str(Path(tempfile.gettempdir()) / "carwash-test-cache"),
+    }
+}
+
+
+class QueryBudgetMixin:
+    """Проверка, что запрос к странице укладывается в бюджет SQL-запросов."""
+
+    def assertQueryBudget(self, budget, url, method="get", **kwargs):
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(self.client, method)(url, **kwargs)
+        executed = len(context.captured_queries)
+        if executed > budget:
+            queries = "\n".join(
+                f"{number}. {query['sql']}"
+                for number, query in enumerate(context.captured_queries, start=1)
+            )
+            self.fail(f"{url}: {executed} SQL-запросов при бюджете {budget}\n{queries}")
+        return response
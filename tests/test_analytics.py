@@ -0,0 +1,118 @@
+import time as timer
+from datetime import date, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from bookings import analytics, rollups
+from bookings.models import Booking, Box
+from customers.models import Customer
+from employees.models import Employee
+from services.models import Service, ServiceCategory
+
+START = date(2024, 1, 1)
+END = date(2024, 12, 31)
+
+
+class AnalyticsTest(TestCase):
+    """Тесты отчетов по выручке и загрузке"""
+
+    def setUp(self):
+        wash = ServiceCategory.objects.create(name="Мойка")
+        polish = ServiceCategory.objects.create(name="Полировка")
+        self.wash = Service.objects.create(
+            name="Стандартная мойка", price=1000, duration=30, category=wash
+        )
+        self.polish = Service.objects.create(
+            name="Полировка кузова", price=3000, duration=60, category=polish
+        )
+        self.box = Box.objects.create(number=1, box_type="standard", capacity=2)
+        self.customer = Customer.objects.create(
+            user=User.objects.create_user(username="client"), phone="+79000000001"
+        )
+        self.washer = Employee.objects.create(
+            user=User.objects.create_user(username="washer"),
+            phone="+79000000002",
+            hire_date=START,
+        )
+
+    def book(self, day, service, status="completed", hour=10, employee=None):
+        return Booking(
+            customer=self.customer,
+            service=service,
+            box=self.box,
+            employee=employee,
+            booking_date=day,
+            booking_time=time(hour, 0),
+            status=status,
+        )
+
+    def test_report(self):
+        """Тест выручки, рангов, загрузки боксов и мойщиков"""
+        Booking.objects.bulk_create(
+            [
+                self.book(date(2024, 1, 10), self.wash, employee=self.washer),
+                self.book(date(2024, 2, 10), self.polish, employee=self.washer),
+                self.book(date(2024, 2, 11), self.wash, status="confirmed"),
+                self.book(date(2024, 2, 12), self.polish, status="cancelled"),
+            ]
+        )
+        with self.assertNumQueries(6):
+            report = analytics.report(START, END)
+
+        summary = report["summary"]
+        self.assertEqual(summary["total"], 4)
+        self.assertEqual(summary["revenue"], Decimal("4000"))
+        self.assertEqual(summary["pipeline"], Decimal("1000"))
+        self.assertEqual(summary["cancelled_count"], 1)
+
+        months = report["months"]
+        self.assertEqual([row["revenue"] for row in months], [1000, 3000])
+        self.assertIsNone(months[0]["change"])
+        self.assertEqual(months[1]["change"], 2000)
+
+        services = {row["service__name"]: row for row in report["services"]}
+        self.assertEqual(services["Полировка кузова"]["rank"], 1)
+        self.assertEqual(services["Стандартная мойка"]["bookings"], 2)
+
+        box = report["boxes"][0]
+        self.assertEqual(box["booked_minutes"], 120)
+        self.assertEqual(box["available_minutes"], 2 * 366 * analytics.WORKING_MINUTES)
+        self.assertAlmostEqual(box["utilization"], 120 / box["available_minutes"])
+
+        washer = report["washers"][0]
+        self.assertEqual((washer["bookings"], washer["minutes"]), (2, 90))
+        self.assertEqual(washer["revenue"], Decimal("4000"))
+
+    def test_year_of_data_under_a_second(self):
+        """Тест: отчет по году данных строится быстрее секунды"""
+        bookings = [
+            self.book(
+                START + timedelta(days=number % 366),
+                (self.wash, self.polish)[number % 2],
+                status=("completed", "confirmed", "cancelled")[number % 3],
+                hour=8 + number % 10,
+                employee=self.washer if number % 4 else None,
+            )
+            for number in range(5000)
+        ]
+        Booking.objects.bulk_create(bookings, refresh_occupancy=False)
+        rollups.rebuild()
+        started = timer.perf_counter()
+        analytics.report(START, END)
+        self.assertLess(timer.perf_counter() - started, 1)
+
+    def test_page_is_staff_only(self):
+        """Тест: страница аналитики доступна только персоналу"""
+        url = reverse("bookings:analytics")
+        User.objects.create_user(username="user", password="pass12345")
+        self.client.login(username="user", password="pass12345")
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        User.objects.create_user(username="staff", password="pass12345", is_staff=True)
+        self.client.login(username="staff", password="pass12345")
+        response = self.client.get(url, {"date_from": "2024-01-01"})
+        self.assertTemplateUsed(response, "bookings/analytics.html")
+        self.assertEqual(self.client.get(url, {"date_from": "x"}).status_code, 400)
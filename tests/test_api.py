@@ -0,0 +1,90 @@
+import base64
+from datetime import date, time
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from bookings import api
+from bookings.models import Booking, Box
+from customers.models import Customer
+from services.models import Service, ServiceCategory
+
+
+class BookingApiTest(TestCase):
+    """Тесты JSON API с постраничной выдачей по курсору"""
+
+    def setUp(self):
+        category = ServiceCategory.objects.create(name="Мойка")
+        self.service = Service.objects.create(
+            name="Стандартная мойка", price=1000, duration=30, category=category
+        )
+        Box.objects.create(number=1, box_type="standard", capacity=2)
+        self.user = User.objects.create_user(username="client", password="pass12345")
+        self.customer = Customer.objects.create(user=self.user, phone="+79000000001")
+        other = Customer.objects.create(
+            user=User.objects.create_user(username="other"), phone="+79000000002"
+        )
+        Booking.objects.bulk_create(
+            Booking(
+                customer=self.customer if number < 25 else other,
+                service=self.service,
+                booking_date=date(2024, 1, 1 + number % 10),
+                booking_time=time(10 + number % 3, 0),
+            )
+            for number in range(30)
+        )
+
+    def fetch_all(self, url, **params):
+        results, cursor = [], None
+        while True:
+            if cursor:
+                params["cursor"] = cursor
+            data = self.client.get(url, params).json()
+            results.extend(data["results"])
+            cursor = data["next"]
+            if not cursor:
+                return results
+
+    def test_cursor_walks_all_bookings_in_order(self):
+        """Тест: курсор проходит все записи клиента без повторов"""
+        self.client.login(username="client", password="pass12345")
+        results = self.fetch_all(
+            reverse("bookings:api_bookings"), limit=7, fields="id,date,time"
+        )
+        self.assertEqual(len(results), 25)
+        self.assertEqual(len({row["id"] for row in results}), 25)
+        keys = [(row["date"], row["time"], row["id"]) for row in results]
+        self.assertEqual(keys, sorted(keys, reverse=True))
+        self.assertEqual(set(results[0]), {"id", "date", "time"})
+
+    def test_page_has_no_count_query(self):
+        """Тест: страница — один запрос без COUNT и OFFSET"""
+        with self.assertNumQueries(1) as queries:
+            self.client.get(reverse("bookings:api_services"))
+        self.assertNotIn("COUNT", queries.captured_queries[0]["sql"])
+        self.assertNotIn("OFFSET", queries.captured_queries[0]["sql"])
+
+    def test_errors(self):
+        """Тест ответов на некорректные запросы"""
+        url = reverse("bookings:api_bookings")
+        self.assertEqual(self.client.get(url).status_code, 401)
+        self.client.login(username="client", password="pass12345")
+        self.assertEqual(self.client.get(url, {"fields": "password"}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"cursor": "!!"}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"limit": "1000"}).status_code, 400)
+        # Курсор правильной длины, но с подмененными значениями
+        for values in (["nope", "x", 1], ["2024-02-30", "10:00", 1], [None, 1, 1]):
+            cursor = api.encode_cursor(values)
+            self.assertEqual(self.client.get(url, {"cursor": cursor}).status_code, 400)
+        # Числа, которые не помещаются в столбец
+        services = reverse("bookings:api_services")
+        for value in (10**30, 1e300, "1" * 40, -(2**64)):
+            cursor = api.encode_cursor([value])
+            response = self.client.get(services, {"cursor": cursor})
+            self.assertEqual(response.status_code, 400)
+        cursor = base64.urlsafe_b64encode(b"[Infinity]").decode()
+        self.assertEqual(self.client.get(services, {"cursor": cursor}).status_code, 400)
+        self.assertEqual(
+            self.client.get(reverse("bookings:api_boxes")).status_code, 403
+        )
@@ -0,0 +1,122 @@
+import json
+from datetime import date, time
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.handlers.asgi import ASGIHandler
+from django.http import Http404
+from django.test import AsyncClient, RequestFactory, TestCase, override_settings
+
+from bookings import views as booking_views
+from bookings.models import Booking, Box
+from customers.models import Customer
+from monitoring.metrics import registry
+from services import views as service_views
+from services.models import Service, ServiceCategory
+
+
+class AsyncReadViewsTest(TestCase):
+    """Тесты асинхронных вариантов страниц чтения"""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        category = ServiceCategory.objects.create(name="Мойка")
+        self.service = Service.objects.create(
+            name="Стандартная мойка", price=1000, duration=30, category=category
+        )
+        Box.objects.create(number=1, box_type="standard", capacity=2)
+        self.user = User.objects.create_user(username="client")
+        self.customer = Customer.objects.create(user=self.user, phone="+79000000001")
+        self.booking = Booking.objects.create(
+            customer=self.customer,
+            service=self.service,
+            booking_date=date(2030, 1, 15),
+            booking_time=time(10, 0),
+        )
+
+    def get(self, view, path, user=None, **kwargs):
+        request = self.factory.get(path)
+        request.user = user or AnonymousUser()
+        return async_to_sync(view)(request, **kwargs)
+
+    def test_service_pages(self):
+        """Тест асинхронных списка и карточки услуги"""
+        response = self.get(service_views.service_list_async, "/services/")
+        self.assertContains(response, "Стандартная мойка")
+        response = self.get(
+            service_views.service_detail_async, "/services/", pk=self.service.pk
+        )
+        self.assertContains(response, "Стандартная мойка")
+        with self.assertRaises(Http404):
+            self.get(service_views.service_detail_async, "/services/", pk=999)
+
+    def test_bookings_require_login(self):
+        """Тест: страницы записей требуют входа"""
+        response = self.get(booking_views.my_bookings_async, "/bookings/my/")
+        self.assertEqual(response.status_code, 302)
+
+    def test_customer_pages(self):
+        """Тест асинхронных страниц записей клиента"""
+        response = self.get(booking_views.my_bookings_async, "/bookings/my/", self.user)
+        self.assertContains(response, "Стандартная мойка")
+        response = self.get(
+            booking_views.booking_detail_async,
+            "/bookings/",
+            self.user,
+            pk=self.booking.pk,
+        )
+        self.assertContains(response, "Стандартная мойка")
+
+        stranger = User.objects.create_user(username="stranger")
+        Customer.objects.create(user=stranger, phone="+79000000002")
+        with self.assertRaises(Http404):
+            self.get(
+                booking_views.booking_detail_async,
+                "/bookings/",
+                stranger,
+                pk=self.booking.pk,
+            )
+
+    def test_free_slots_match_sync_view(self):
+        """Тест: асинхронный поиск слотов отвечает как синхронный"""
+        path = f"/bookings/free-slots/?service={self.service.pk}&date=2030-01-15"
+        request = self.factory.get(path)
+        expected = json.loads(booking_views.free_slots(request).content)
+        response = async_to_sync(booking_views.free_slots_async)(request)
+        self.assertEqual(json.loads(response.content), expected)
+        bad = self.factory.get("/bookings/free-slots/?service=x")
+        response = async_to_sync(booking_views.free_slots_async)(bad)
+        self.assertEqual(response.status_code, 400)
+
+
+class AsyncMiddlewareTest(TestCase):
+    """Тесты асинхронной цепочки middleware"""
+
+    def test_chain_is_not_adapted(self):
+        """Тест: под ASGI ни одно middleware не переводится в синхронный режим"""
+        with override_settings(DEBUG=True):
+            with self.assertNoLogs("django.request", "DEBUG"):
+                ASGIHandler()
+
+    @override_settings(MONITORING_SAMPLE_RATE=1)
+    def test_async_chain(self):
+        """Тест метрик и кэша страниц в асинхронной цепочке"""
+        registry.reset()
+        category = ServiceCategory.objects.create(name="Мойка")
+        Service.objects.create(
+            name="Стандартная мойка", price=1000, duration=30, category=category
+        )
+        client = AsyncClient()
+
+        async def fetch():
+            return await client.get("/services/")
+
+        first = async_to_sync(fetch)()
+        second = async_to_sync(fetch)()
+        self.assertContains(first, "Стандартная мойка")
+        self.assertEqual(
+            (first["X-Page-Cache"], second["X-Page-Cache"]), ("miss", "hit")
+        )
+        services = registry.snapshot()["services:service_list"]
+        self.assertEqual(services["requests"], {("GET", 200): 2})
+        self.assertGreater(services["queries"], 0)
@@ -0,0 +1,168 @@
+import time as timer
+from datetime import date, time
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from bookings import availability
+from bookings.forms import BookingForm
+from bookings.models import Booking, Box
+from customers.models import Customer
+from services.models import Service, ServiceCategory
+
+
+class DayIndexTest(TestCase):
+    """Тесты индекса занятости одного дня"""
+
+    def setUp(self):
+        self.index = availability.DayIndex(date(2024, 1, 15), [(1, 1), (2, 2)])
+
+    def test_slot_range_rounds_to_slots(self):
+        """Тест округления интервала услуги до 5-минутных слотов"""
+        self.assertEqual(availability.slot_range(time(8, 0), 30), (0, 6))
+        self.assertEqual(availability.slot_range(time(8, 7), 10), (1, 4))
+
+    def test_find_box_respects_capacity(self):
+        """Тест заполнения боксов с учетом вместимости"""
+        self.assertEqual(self.index.find_box(time(10, 0), 30), 1)
+        self.index.add(1, time(10, 0), 30)
+        self.assertEqual(self.index.find_box(time(10, 0), 30), 2)
+        self.index.add(2, time(10, 0), 30)
+        self.index.add(2, time(10, 15), 30)
+        self.assertIsNone(self.index.find_box(time(10, 0), 30))
+        self.assertEqual(self.index.find_box(time(10, 30), 30), 1)
+
+    def test_unassigned_bookings_use_total_capacity(self):
+        """Тест учета записей без бокса в общей вместимости"""
+        for _ in range(3):
+            self.index.add(None, time(12, 0), 60)
+        self.assertIsNone(self.index.find_box(time(12, 30), 15))
+        self.index.remove(None, time(12, 0), 60)
+        self.assertIsNotNone(self.index.find_box(time(12, 30), 15))
+
+    def test_free_starts(self):
+        """Тест поиска свободного времени начала"""
+        index = availability.DayIndex(date(2024, 1, 15), [(1, 1)])
+        index.add(1, time(8, 30), 30)
+        starts = [availability.slot_time(s) for s in index.free_starts(30)]
+        self.assertIn(time(8, 0), starts)
+        self.assertNotIn(time(8, 5), starts)
+        self.assertNotIn(time(8, 45), starts)
+        self.assertIn(time(9, 0), starts)
+        self.assertEqual(starts[-1], time(21, 30))
+
+    def test_outside_opening_hours(self):
+        """Тест записи за пределами часов работы"""
+        self.assertIsNone(self.index.find_box(time(7, 30), 30))
+        self.assertIsNone(self.index.find_box(time(21, 45), 30))
+
+
+class AvailabilityTest(TestCase):
+    """Тесты проверки доступности по данным БД"""
+
+    def setUp(self):
+        availability.invalidate()
+        self.user = User.objects.create_user(username="slots", password="pass12345")
+        self.customer = Customer.objects.create(user=self.user, phone="+79123456789")
+        self.category = ServiceCategory.objects.create(name="Мойка")
+        self.service = Service.objects.create(
+            name="Стандартная мойка", price=1000, duration=30, category=self.category
+        )
+        self.box = Box.objects.create(number=1, box_type="standard", capacity=1)
+        self.day = date(2024, 1, 15)
+
+    def book(self, at, status="pending"):
+        return Booking.objects.create(
+            customer=self.customer,
+            service=self.service,
+            box=self.box,
+            booking_date=self.day,
+            booking_time=at,
+            status=status,
+        )
+
+    def test_booking_invalidates_index(self):
+        """Тест сброса индекса при создании и отмене записи"""
+        self.assertTrue(availability.can_fit(self.service, self.day, time(10, 0)))
+        with self.captureOnCommitCallbacks(execute=True):
+            booking = self.book(time(10, 0))
+        self.assertFalse(availability.can_fit(self.service, self.day, time(10, 15)))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.status = "cancelled"
+            booking.save()
+            # До фиксации транзакции индекс не сбрасывается
+            self.assertFalse(availability.can_fit(self.service, self.day, time(10, 15)))
+        self.assertTrue(availability.can_fit(self.service, self.day, time(10, 15)))
+
+    def test_cancelled_bookings_do_not_block(self):
+        """Тест: отмененные записи не занимают бокс"""
+        self.book(time(10, 0), status="cancelled")
+        self.assertTrue(availability.can_fit(self.service, self.day, time(10, 0)))
+
+    def test_booking_form_rejects_overlap(self):
+        """Тест отказа формы при пересечении с существующей записью"""
+        self.book(time(10, 0))
+        form = BookingForm(
+            data={
+                "service": self.service.pk,
+                "booking_date": self.day,
+                "booking_time": "10:20",
+            }
+        )
+        self.assertFalse(form.is_valid())
+        self.assertIn("__all__", form.errors)
+
+    def test_booking_form_allows_editing_own_booking(self):
+        """Тест: запись не конфликтует сама с собой при редактировании"""
+        booking = Booking.objects.get(pk=self.book(time(10, 0)).pk)
+        form = BookingForm(
+            data={
+                "service": self.service.pk,
+                "booking_date": self.day,
+                "booking_time": "10:10",
+            },
+            instance=booking,
+        )
+        self.assertTrue(form.is_valid())
+
+    def test_booking_form_rejects_outside_hours(self):
+        """Тест отказа формы вне часов работы"""
+        form = BookingForm(
+            data={
+                "service": self.service.pk,
+                "booking_date": self.day,
+                "booking_time": "21:45",
+            }
+        )
+        self.assertFalse(form.is_valid())
+
+    def test_free_slots_view(self):
+        """Тест JSON-списка свободного времени"""
+        self.book(time(8, 0))
+        response = self.client.get(
+            reverse("bookings:free_slots"),
+            {"service": self.service.pk, "date": "2024-01-15"},
+        )
+        self.assertEqual(response.status_code, 200)
+        slots = response.json()["slots"]
+        self.assertNotIn("08:00", slots)
+        self.assertEqual(slots[0], "08:30")
+
+    def test_free_slots_view_bad_request(self):
+        """Тест ответа на некорректные параметры"""
+        response = self.client.get(reverse("bookings:free_slots"), {"date": "x"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_warm_lookup_is_fast(self):
+        """Тест: проверка по прогретому индексу не обращается к БД"""
+        for hour in range(8, 21):
+            self.book(time(hour, 0))
+        availability.get_day_index(self.day)
+        with self.assertNumQueries(0):
+            started = timer.perf_counter()
+            for _ in range(100):
+                availability.can_fit(self.service, self.day, time(15, 30))
+            elapsed = (timer.perf_counter() - started) / 100
+        self.assertLess(elapsed, 0.001)
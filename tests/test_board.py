@@ -0,0 +1,137 @@
+import json
+import time as timer
+from datetime import date, time
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from bookings import occupancy
+from bookings.board import apply_transitions, day_board
+from bookings.models import Booking, Box
+from customers.models import Customer
+from services.models import Service, ServiceCategory
+
+DAY = date(2024, 1, 15)
+
+
+class StaffBoardTest(TestCase):
+    """Тесты доски персонала и массовой смены статусов"""
+
+    def setUp(self):
+        category = ServiceCategory.objects.create(name="Мойка")
+        self.service = Service.objects.create(
+            name="Стандартная мойка", price=1000, duration=30, category=category
+        )
+        self.boxes = [
+            Box.objects.create(number=number, box_type="standard", capacity=20)
+            for number in (2, 1)
+        ]
+        self.customer = Customer.objects.create(
+            user=User.objects.create_user(username="client"), phone="+79000000001"
+        )
+        self.staff = User.objects.create_user(
+            username="admin", password="pass12345", is_staff=True
+        )
+
+    def add_bookings(self, count):
+        Booking.objects.bulk_create(
+            Booking(
+                customer=self.customer,
+                service=self.service,
+                box=self.boxes[number % 2],
+                booking_date=DAY,
+                booking_time=time(8 + number % 13, 0),
+            )
+            for number in range(count)
+        )
+        return list(Booking.objects.values_list("id", flat=True))
+
+    def test_board_groups_by_box_in_one_query(self):
+        """Тест: доска дня собирается одним запросом"""
+        self.add_bookings(10)
+        with self.assertNumQueries(1):
+            result = day_board(DAY)
+        self.assertEqual([box["number"] for box in result["boxes"]], [1, 2])
+        self.assertEqual(sum(len(box["bookings"]) for box in result["boxes"]), 10)
+
+    def test_transitions_one_update_per_status(self):
+        """Тест: по одному UPDATE на каждый целевой статус"""
+        ids = self.add_bookings(4)
+        with CaptureQueriesContext(connection) as queries:
+            updated = apply_transitions(
+                {ids[0]: "confirmed", ids[1]: "confirmed", ids[2]: "pending"}
+            )
+        self.assertEqual(updated, {"confirmed": 2})
+        statements = [query["sql"].split()[0] for query in queries]
+        self.assertEqual(statements.count("SELECT"), 1)
+        self.assertEqual(statements.count("UPDATE"), 1)
+        apply_transitions({ids[0]: "in_progress", ids[3]: "cancelled"})
+        self.assertEqual(Booking.objects.get(pk=ids[3]).status, "cancelled")
+        self.assertEqual(occupancy.verify(), [])
+
+    def test_admin_actions_follow_transitions(self):
+        """Тест: действия админки пропускают недопустимые переходы"""
+        ids = self.add_bookings(3)
+        Booking.objects.filter(pk=ids[1]).set_status("confirmed")
+        Booking.objects.filter(pk=ids[1]).set_status("in_progress")
+        self.staff.is_superuser = True
+        self.staff.save()
+        self.client.force_login(self.staff)
+        response = self.client.post(
+            reverse("admin:bookings_booking_changelist"),
+            {"action": "mark_completed", "_selected_action": ids},
+            follow=True,
+        )
+        self.assertContains(response, "Обновлено записей: 1")
+        self.assertContains(response, "Пропущено записей с недопустимым переходом: 2")
+        self.assertEqual(
+            dict(Booking.objects.values_list("id", "status")),
+            {ids[0]: "pending", ids[1]: "completed", ids[2]: "pending"},
+        )
+
+    def test_invalid_transition_changes_nothing(self):
+        """Тест: при недопустимом переходе ничего не меняется"""
+        ids = self.add_bookings(2)
+        with self.assertRaises(ValidationError):
+            apply_transitions({ids[0]: "confirmed", ids[1]: "completed"})
+        self.assertEqual(
+            set(Booking.objects.values_list("status", flat=True)), {"pending"}
+        )
+
+    def test_views(self):
+        """Тест API доски для персонала"""
+        ids = self.add_bookings(3)
+        url = reverse("bookings:staff_board")
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.login(username="admin", password="pass12345")
+        response = self.client.get(url, {"date": "2024-01-15"})
+        self.assertEqual(len(response.json()["boxes"]), 2)
+
+        response = self.client.post(
+            reverse("bookings:staff_transitions"),
+            json.dumps({"transitions": [{"id": ids[0], "status": "completed"}]}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("errors", response.json())
+
+        response = self.client.post(
+            reverse("bookings:staff_transitions"),
+            json.dumps(
+                {"transitions": [{"id": pk, "status": "confirmed"} for pk in ids]}
+            ),
+            content_type="application/json",
+        )
+        self.assertEqual(response.json(), {"updated": {"confirmed": 3}})
+
+    def test_busy_day_is_fast(self):
+        """Тест: день на 200 записей загружается и обновляется быстро"""
+        ids = self.add_bookings(200)
+        started = timer.perf_counter()
+        day_board(DAY)
+        apply_transitions({pk: "confirmed" for pk in ids})
+        self.assertLess(timer.perf_counter() - started, 0.5)
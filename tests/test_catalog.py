@@ -0,0 +1,53 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from services import catalog
+from services.models import Service, ServiceCategory
+
+
+class CatalogCacheTest(TestCase):
+    """Тесты кэша каталога услуг"""
+
+    def setUp(self):
+        cache.clear()
+        self.category = ServiceCategory.objects.create(name="Мойка")
+        self.service = Service.objects.create(
+            name="Стандартная мойка", price=1000, duration=30, category=self.category
+        )
+        Service.objects.create(
+            name="Снятая услуга",
+            price=500,
+            duration=15,
+            category=self.category,
+            is_active=False,
+        )
+
+    def test_warm_pages_do_not_query(self):
+        """Тест: прогретые прайс-лист и список услуг не обращаются к БД"""
+        for name in ("pages:price_list", "services:service_list"):
+            self.client.get(reverse(name))
+            with self.assertNumQueries(0):
+                response = self.client.get(reverse(name))
+            self.assertContains(response, "Стандартная мойка")
+            self.assertNotContains(response, "Снятая услуга")
+
+    def test_build_is_one_prefetch(self):
+        """Тест: дерево каталога строится двумя запросами"""
+        with self.assertNumQueries(2):
+            categories = catalog.build_catalog()
+        self.assertEqual(categories[0].active_services, [self.service])
+
+    def test_changes_invalidate_catalog(self):
+        """Тест сброса кэша при изменении услуги и категории"""
+        catalog.get_catalog()
+        self.service.price = 1200
+        self.service.save()
+        self.assertEqual(catalog.active_services()[0].price, 1200)
+
+        self.category.name = "Химчистка"
+        self.category.save()
+        self.assertEqual(catalog.get_catalog()[0].name, "Химчистка")
+
+        self.service.delete()
+        self.assertEqual(catalog.active_services(), [])
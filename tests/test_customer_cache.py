@@ -0,0 +1,84 @@
+from datetime import date, time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from bookings.models import Booking
+from customers.models import Customer
+from query_budget import SHARED_CACHES, QueryBudgetMixin
+from services.models import Service, ServiceCategory
+
+
+@override_settings(CACHES=SHARED_CACHES)
+class CustomerCacheTest(QueryBudgetMixin, TestCase):
+    """Тесты кэша профиля клиента"""
+
+    def setUp(self):
+        # Файловый кэш переживает тест, а id пользователей повторяются
+        cache.clear()
+        self.user = User.objects.create_user(username="client", password="pass12345")
+        self.customer = Customer.objects.create(
+            user=self.user, phone="+79123456789", discount=10
+        )
+        category = ServiceCategory.objects.create(name="Мойка")
+        self.service = Service.objects.create(
+            name="Стандартная мойка", price=1000, duration=30, category=category
+        )
+        for day in range(1, 5):
+            Booking.objects.create(
+                customer=self.customer,
+                service=self.service,
+                booking_date=date(2024, 1, day),
+                booking_time=time(10, 0),
+            )
+        self.client.login(username="client", password="pass12345")
+
+    def test_profile_is_cached_between_requests(self):
+        """Тест: после первого запроса профиль берется из кэша"""
+        url = reverse("bookings:my_bookings")
+        self.client.get(url)
+        # Сессия, пользователь, записи и их число для пагинации
+        self.assertQueryBudget(4, url)
+        response = self.assertQueryBudget(3, reverse("customers:profile"))
+        self.assertEqual(len(response.context["recent_bookings"]), 3)
+        self.assertContains(response, "Ваша скидка:</strong> 10%")
+
+    def test_invalidated_on_save(self):
+        """Тест: сохранение клиента сбрасывает кэш"""
+        url = reverse("customers:profile")
+        self.client.get(url)
+        self.customer.discount = 20
+        self.customer.save()
+        self.assertContains(self.client.get(url), "Ваша скидка:</strong> 20%")
+
+        response = self.client.post(
+            reverse("bookings:create_booking"),
+            {
+                "service": self.service.pk,
+                "booking_date": "2030-01-10",
+                "booking_time": "10:00",
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Booking.objects.latest("id").total_price, 800)
+
+    def test_user_without_profile(self):
+        """Тест: пользователь без профиля получает 404, и это тоже кэшируется"""
+        User.objects.create_user(username="staff", password="pass12345", is_staff=True)
+        self.client.login(username="staff", password="pass12345")
+        url = reverse("bookings:my_bookings")
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertQueryBudget(2, url)
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_local_memory_cache_is_not_used(self):
+        """Тест: с кэшем в памяти процесса скидка читается из БД на каждом запросе"""
+        url = reverse("customers:profile")
+        self.client.get(url)
+        # Изменение в обход сигналов, как из соседнего воркера
+        Customer.objects.filter(pk=self.customer.pk).update(discount=20)
+        self.assertContains(self.client.get(url), "Ваша скидка:</strong> 20%")
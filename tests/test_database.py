@@ -0,0 +1,44 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.core.signals import request_started
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase, override_settings
+
+
+class DatabaseTuningTest(SimpleTestCase):
+    """Тесты настройки соединений с базой данных"""
+
+    def test_sqlite_pragmas(self):
+        """Тест: новое соединение SQLite получает WAL и остальные PRAGMA"""
+        with tempfile.TemporaryDirectory() as directory:
+            wrapper = DatabaseWrapper(
+                {**connection.settings_dict, "NAME": Path(directory) / "tuned.db"},
+                alias="tuned",
+            )
+            try:
+                with wrapper.cursor() as cursor:
+                    values = {}
+                    for name in ("journal_mode", "synchronous", "busy_timeout"):
+                        cursor.execute(f"PRAGMA {name}")
+                        values[name] = cursor.fetchone()[0]
+            finally:
+                wrapper.close()
+        # synchronous: 1 — NORMAL
+        self.assertEqual(
+            values, {"journal_mode": "wal", "synchronous": 1, "busy_timeout": 5000}
+        )
+
+    @override_settings(DATABASE_HEALTH_CHECKS=True)
+    def test_broken_persistent_connection_is_closed(self):
+        """Тест: оборванное постоянное соединение закрывается в начале запроса"""
+        wrapper = mock.Mock(connection=object(), settings_dict={"CONN_MAX_AGE": 60})
+        wrapper.is_usable.return_value = False
+        idle = mock.Mock(connection=None, settings_dict={"CONN_MAX_AGE": 60})
+        with mock.patch("carwash.database.connections") as connections:
+            connections.all.return_value = [wrapper, idle]
+            request_started.send(sender=None)
+        wrapper.close.assert_called_once_with()
+        idle.is_usable.assert_not_called()
@@ -0,0 +1,189 @@
+import asyncio
+import json
+from datetime import date, time
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from bookings.events import Broker, broker
+from bookings.models import Booking, Box
+from carwash.asgi import application
+from customers.models import Customer
+from services.models import Service, ServiceCategory
+
+DAY = date(2024, 1, 15)
+
+
+async def open_stream(path, query=b""):
+    """Подключиться к потоку; возвращает очередь сообщений и функцию отключения."""
+    incoming = asyncio.Queue()
+    sent = asyncio.Queue()
+
+    async def receive():
+        return await incoming.get()
+
+    scope = {"type": "http", "path": path, "query_string": query, "headers": []}
+    task = asyncio.ensure_future(application(scope, receive, sent.put))
+
+    async def close():
+        await incoming.put({"type": "http.disconnect"})
+        await asyncio.wait_for(task, 1)
+
+    return sent, close
+
+
+class BrokerTest(TestCase):
+    """Тесты рассылки событий внутри процесса"""
+
+    def test_fan_out_to_day_subscribers(self):
+        """Тест: событие получает каждый подписчик своего дня"""
+
+        async def scenario():
+            local = Broker()
+            same = [local.subscribe("2024-01-15") for _ in range(3)]
+            other = local.subscribe("2024-01-16")
+            local.publish("2024-01-15", {"event": "created"})
+            results = [await asyncio.wait_for(sub.get(), 1) for sub in same]
+            self.assertTrue(other.queue.empty())
+            for subscription in same + [other]:
+                local.unsubscribe(subscription)
+            self.assertEqual(local.subscribers(), 0)
+            return results
+
+        self.assertEqual(asyncio.run(scenario()), [{"event": "created"}] * 3)
+
+    def test_slow_client_gets_resync(self):
+        """Тест: переполненная очередь заменяется командой перечитать доску"""
+
+        async def scenario():
+            local = Broker(maxsize=2)
+            subscription = local.subscribe("day")
+            for number in range(3):
+                local.publish("day", {"number": number})
+            await asyncio.sleep(0)
+            return await subscription.get()
+
+        self.assertEqual(asyncio.run(scenario()), {"event": "resync"})
+
+
+@override_settings(BOARD_STREAM_TOKEN="screen")
+class BoardStreamTest(TestCase):
+    """Тесты потока изменений доски"""
+
+    def setUp(self):
+        category = ServiceCategory.objects.create(name="Мойка")
+        self.service = Service.objects.create(
+            name="Стандартная мойка", price=1000, duration=30, category=category
+        )
+        self.box = Box.objects.create(number=1, box_type="standard", capacity=2)
+        self.customer = Customer.objects.create(
+            user=User.objects.create_user(username="client"), phone="+79000000001"
+        )
+
+    def test_booking_changes_are_published(self):
+        """Тест событий создания и смены статуса записи"""
+        received = []
+
+        async def listen():
+            return broker.subscribe(str(DAY))
+
+        loop = asyncio.new_event_loop()
+        try:
+            subscription = loop.run_until_complete(listen())
+            with self.captureOnCommitCallbacks(execute=True):
+                booking = Booking.objects.create(
+                    customer=self.customer,
+                    service=self.service,
+                    box=self.box,
+                    booking_date=DAY,
+                    booking_time=time(10, 0),
+                )
+            booking = Booking.objects.get(pk=booking.pk)
+            booking.status = "confirmed"
+            with self.captureOnCommitCallbacks(execute=True):
+                booking.save()
+            for _ in range(2):
+                received.append(
+                    loop.run_until_complete(asyncio.wait_for(subscription.get(), 1))
+                )
+            broker.unsubscribe(subscription)
+        finally:
+            loop.close()
+
+        self.assertEqual(received[0]["event"], "created")
+        self.assertEqual(received[1]["changes"], ["status"])
+        self.assertEqual(received[1]["status"], "confirmed")
+
+    def test_stream_delivers_events(self):
+        """Тест: подключенный экран получает событие в формате SSE"""
+
+        async def scenario():
+            sent, close = await open_stream(
+                "/events/board/2024-01-15/", b"token=screen"
+            )
+            start = await asyncio.wait_for(sent.get(), 1)
+            await asyncio.wait_for(sent.get(), 1)
+            broker.publish("2024-01-15", {"event": "updated", "id": 1})
+            body = (await asyncio.wait_for(sent.get(), 1))["body"].decode()
+            await close()
+            return start, body
+
+        start, body = asyncio.run(scenario())
+        self.assertEqual(start["status"], 200)
+        self.assertTrue(body.startswith("event: booking\n"))
+        self.assertEqual(
+            json.loads(body.split("data: ")[1]), {"event": "updated", "id": 1}
+        )
+        self.assertEqual(broker.subscribers(), 0)
+
+    def test_stream_requires_access(self):
+        """Тест: без токена и сессии персонала поток недоступен"""
+
+        async def scenario():
+            sent, close = await open_stream("/events/board/2024-01-15/")
+            start = await asyncio.wait_for(sent.get(), 1)
+            await close()
+            return start["status"]
+
+        self.assertEqual(asyncio.run(scenario()), 403)
+
+    def test_set_status_is_published(self):
+        """Тест: массовая смена статуса сообщает о каждой измененной записи"""
+        Booking.objects.bulk_create(
+            Booking(
+                customer=self.customer,
+                service=self.service,
+                box=self.box,
+                booking_date=DAY,
+                booking_time=time(hour, 0),
+                status=status,
+            )
+            for hour, status in ((9, "pending"), (10, "confirmed"), (11, "pending"))
+        )
+
+        async def listen():
+            return broker.subscribe(str(DAY))
+
+        loop = asyncio.new_event_loop()
+        try:
+            subscription = loop.run_until_complete(listen())
+            with self.captureOnCommitCallbacks(execute=True):
+                Booking.objects.all().set_status("confirmed")
+            loop.run_until_complete(asyncio.sleep(0))
+            received = []
+            while not subscription.queue.empty():
+                received.append(subscription.queue.get_nowait())
+            broker.unsubscribe(subscription)
+        finally:
+            loop.close()
+
+        self.assertEqual(len(received), 2)
+        self.assertEqual({event["status"] for event in received}, {"confirmed"})
+        self.assertEqual(
+            {event["id"] for event in received},
+            set(
+                Booking.objects.filter(
+                    booking_time__in=[time(9, 0), time(11, 0)]
+                ).values_list("id", flat=True)
+            ),
+        )
@@ -0,0 +1,102 @@
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import date, time
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from bookings.models import Booking, Box
+from customers.models import Customer
+from services.models import Service, ServiceCategory
+
+
+class ExportTest(TestCase):
+    """Тесты потоковой выгрузки записей и выручки"""
+
+    def setUp(self):
+        category = ServiceCategory.objects.create(name="Мойка")
+        service = Service.objects.create(
+            name="Стандартная мойка", price=1000, duration=30, category=category
+        )
+        self.box = Box.objects.create(number=7, box_type="standard", capacity=2)
+        customer = Customer.objects.create(
+            user=User.objects.create_user(username="client"), phone="+79000000001"
+        )
+        for day, status in ((1, "completed"), (1, "completed"), (2, "cancelled")):
+            Booking.objects.create(
+                customer=customer,
+                service=service,
+                box=self.box,
+                booking_date=date(2024, 1, day),
+                booking_time=time(10, 0),
+                status=status,
+            )
+        User.objects.create_user(username="boss", password="pass12345", is_staff=True)
+
+    def test_csv_view_streams_filtered_rows(self):
+        """Тест выгрузки CSV с фильтрами"""
+        self.client.login(username="boss", password="pass12345")
+        response = self.client.get(
+            reverse("bookings:export_bookings"),
+            {"date_from": "2024-01-01", "status": "completed", "box": "7"},
+        )
+        self.assertTrue(response.streaming)
+        body = b"".join(response.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]["service"], "Стандартная мойка")
+        self.assertEqual(rows[0]["box"], "7")
+
+    def test_revenue_report(self):
+        """Тест отчета по выручке в JSONL"""
+        self.client.login(username="boss", password="pass12345")
+        response = self.client.get(
+            reverse("bookings:export_bookings"),
+            {"report": "revenue", "format": "jsonl"},
+        )
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(
+            json.loads(lines[0]),
+            {
+                "date": "2024-01-01",
+                "service": "Стандартная мойка",
+                "bookings": 2,
+                "revenue": "2000.00",
+            },
+        )
+
+    def test_view_is_staff_only(self):
+        """Тест: выгрузка доступна только персоналу"""
+        response = self.client.get(reverse("bookings:export_bookings"))
+        self.assertEqual(response.status_code, 302)
+        self.client.login(username="boss", password="pass12345")
+        response = self.client.get(
+            reverse("bookings:export_bookings"), {"date_from": "январь"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_command(self):
+        """Тест команды export_bookings"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "january.jsonl")
+            call_command(
+                "export_bookings",
+                "--format",
+                "jsonl",
+                "--status",
+                "cancelled",
+                "--output",
+                path,
+                stderr=io.StringIO(),
+            )
+            with open(path, encoding="utf-8") as source:
+                rows = [json.loads(line) for line in source]
+        self.assertEqual([row["status"] for row in rows], ["cancelled"])
+        for value in ("январь", "2024-02-30"):
+            with self.assertRaisesMessage(CommandError, "Некорректная дата"):
+                call_command("export_bookings", "--date-from", value)
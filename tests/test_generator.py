@@ -0,0 +1,109 @@
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from bookings import occupancy, rollups
+from bookings.generator import Generator, create_catalog, generate
+from bookings.models import Booking, Box, BoxOccupancy
+from customers.models import Customer
+from services.models import Service
+
+END = date(2024, 3, 31)
+
+
+class GeneratorTest(TestCase):
+    """Тесты генератора синтетических данных"""
+
+    def generate(self, seed=7):
+        return generate(
+            customers=50,
+            bookings=2000,
+            days=91,
+            employees=5,
+            boxes=8,
+            seed=seed,
+            end=END,
+        )
+
+    def test_volumes_and_consistency(self):
+        """Тест объемов, цен и согласованности сетки и сводок"""
+        stats = self.generate()
+        self.assertEqual(stats["bookings"], 2000)
+        self.assertEqual(Booking.objects.count(), 2000)
+        self.assertEqual(Customer.objects.count(), 50)
+        self.assertEqual(Box.objects.count(), 8)
+        self.assertFalse(Booking.objects.filter(total_price__isnull=True).exists())
+        self.assertEqual(occupancy.verify(), [])
+        self.assertEqual(rollups.verify(), [])
+
+        capacities = dict(Box.objects.values_list("id", "capacity"))
+        for row in BoxOccupancy.objects.exclude(box=None):
+            self.assertLessEqual(
+                max(occupancy.decode(row.slots)), capacities[row.box_id]
+            )
+
+    def test_weekends_and_peaks(self):
+        """Тест: в выходные и в часы пик записей больше"""
+        self.generate()
+        by_weekday = [0] * 7
+        by_hour = {}
+        for day, start in Booking.objects.values_list("booking_date", "booking_time"):
+            by_weekday[day.weekday()] += 1
+            by_hour[start.hour] = by_hour.get(start.hour, 0) + 1
+        self.assertGreater(min(by_weekday[5:]), max(by_weekday[:4]))
+        self.assertGreater(by_hour[18], by_hour[13])
+        premium = Service.objects.get(box_type="premium")
+        self.assertFalse(
+            Booking.objects.filter(service=premium, box__box_type="standard").exists()
+        )
+
+    def test_same_seed_same_data(self):
+        """Тест воспроизводимости при одном seed"""
+        create_catalog(boxes=8)
+        services = list(Service.objects.all())
+        boxes = list(Box.objects.values_list("id", "capacity", "box_type"))
+        customers = [Customer(pk=number, discount=0) for number in range(1, 21)]
+
+        def day(seed):
+            generator = Generator(seed)
+            counts = generator.day_counts(END, 7, 300)
+            bookings = generator._day(
+                END,
+                counts[0],
+                services,
+                [1] * len(services),
+                boxes,
+                END,
+                customers,
+                [1, 2],
+            )
+            return counts, [
+                (
+                    booking.booking_time,
+                    booking.service_id,
+                    booking.status,
+                    booking.box_id,
+                    booking.customer_id,
+                )
+                for booking in bookings
+            ]
+
+        self.assertEqual(day(7), day(7))
+        self.assertNotEqual(day(7), day(8))
+
+    def test_commands(self):
+        """Тест команд create_test_data и generate_data"""
+        call_command("create_test_data", stdout=StringIO())
+        self.assertEqual(Box.objects.count(), 4)
+        out = StringIO()
+        call_command(
+            "generate_data",
+            "--customers=10",
+            "--bookings=100",
+            "--years=0.1",
+            "--end-date=2024-03-31",
+            stdout=out,
+        )
+        self.assertIn("записей 100", out.getvalue())
@@ -0,0 +1,189 @@
+import json
+import os
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from bookings import occupancy
+from bookings.importer import BookingImporter, ServiceImporter, run_import
+from bookings.models import Booking, Box
+from customers.models import Customer
+from services.models import Service, ServiceCategory
+
+
+class ImportDataTest(TestCase):
+    """Тесты потокового импорта"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        Box.objects.create(number=1, box_type="standard", capacity=2)
+
+    def write(self, name, text):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w", encoding="utf-8") as target:
+            target.write(text)
+        return path
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command("import_data", *args, stdout=out)
+        return out.getvalue()
+
+    def load_catalog(self):
+        self.run_command(
+            "services",
+            self.write(
+                "services.csv",
+                "name,category,price,duration\n"
+                "Стандартная мойка,Мойка,1000,30\n"
+                "Полировка,Уход,3000,60\n",
+            ),
+        )
+        self.run_command(
+            "customers",
+            self.write(
+                "customers.jsonl",
+                "\n".join(
+                    json.dumps(row)
+                    for row in (
+                        {"username": "ivan", "phone": "+79000000001", "discount": 10},
+                        {"username": "petr", "phone": "+79000000002"},
+                        {"username": "ivan", "phone": "+79000000003"},
+                    )
+                ),
+            ),
+        )
+
+    def test_full_import(self):
+        """Тест импорта услуг, клиентов и записей с отклонением строк"""
+        self.load_catalog()
+        self.assertEqual(Service.objects.count(), 2)
+        self.assertEqual(Customer.objects.count(), 2)
+
+        rejects = os.path.join(self.tmp.name, "rejects.csv")
+        output = self.run_command(
+            "bookings",
+            self.write(
+                "bookings.csv",
+                "customer,service,date,time,box\n"
+                "+79000000001,Стандартная мойка,2024-01-15,10:00,1\n"
+                "petr,Полировка,2024-01-16,11:00,\n"
+                "nobody,Полировка,2024-01-16,11:00,\n"
+                "petr,Полировка,2024-02-30,11:00,\n",
+            ),
+            "--rejects",
+            rejects,
+        )
+        self.assertIn("отклонено 2", output)
+        with open(rejects, encoding="utf-8") as source:
+            self.assertIn("Клиент не найден", source.read())
+        self.assertEqual(
+            Booking.objects.get(customer__user__username="ivan").total_price,
+            Decimal("900"),
+        )
+        self.assertEqual(occupancy.verify(), [])
+
+    def test_rejected_row_does_not_take_name(self):
+        """Тест: отклоненная строка не занимает название и логин"""
+        output = self.run_command(
+            "services",
+            self.write(
+                "services.csv",
+                "name,category,price,duration\n"
+                "Мойка,Новая,bad,30\n"
+                "Мойка,Мойка,1000,30\n",
+            ),
+        )
+        self.assertIn("отклонено 1", output)
+        self.assertEqual(
+            list(Service.objects.values_list("name", "category__name")),
+            [("Мойка", "Мойка")],
+        )
+        self.assertFalse(ServiceCategory.objects.filter(name="Новая").exists())
+        self.run_command(
+            "customers",
+            self.write(
+                "customers.csv",
+                "username,phone,discount\nivan,+79000000001,7\nivan,+79000000001,5\n",
+            ),
+        )
+        self.assertEqual(Customer.objects.get().discount, 5)
+
+    def test_invalid_values_are_rejected(self):
+        """Тест: значения, которые не примет база, отклоняются строкой"""
+        rejects = os.path.join(self.tmp.name, "rejects.csv")
+        output = self.run_command(
+            "services",
+            self.write(
+                "services.csv",
+                "name,category,price,duration\n"
+                "Отрицательная,Брак,1000,-5\n"
+                "Без цены,Брак,NaN,30\n"
+                "Дорогая,Брак,1e12,30\n"
+                f"{'Д' * 201},Брак,1000,30\n"
+                f"Мойка,{'К' * 201},1000,30\n"
+                "Мойка,Мойка,1000,30\n",
+            ),
+            "--rejects",
+            rejects,
+        )
+        self.assertIn("отклонено 5", output)
+        self.assertEqual(
+            list(Service.objects.values_list("name", flat=True)), ["Мойка"]
+        )
+        self.assertEqual(
+            list(ServiceCategory.objects.values_list("name", flat=True)), ["Мойка"]
+        )
+        output = self.run_command(
+            "customers",
+            self.write(
+                "customers.csv",
+                "username,phone\n"
+                f"{'u' * 151},+79000000001\n"
+                f"ivan,{'9' * 21}\n"
+                "ivan,+79000000001\n",
+            ),
+        )
+        self.assertIn("отклонено 2", output)
+        self.assertEqual(Customer.objects.get().phone, "+79000000001")
+
+    def test_failed_chunk_leaves_no_categories(self):
+        """Тест: категории откатываются вместе с пачкой"""
+        importer = ServiceImporter()
+        rows = [{"name": "Мойка", "category": "Новая", "price": "1000", "duration": 30}]
+        with mock.patch.object(
+            Service.objects, "bulk_create", side_effect=DatabaseError
+        ), self.assertRaises(DatabaseError):
+            run_import(importer, rows)
+        self.assertFalse(ServiceCategory.objects.exists())
+        self.assertEqual(importer.categories, {})
+
+    def test_queries_do_not_grow_with_rows(self):
+        """Тест: число запросов на пачку не зависит от числа строк"""
+        self.load_catalog()
+        rows = [
+            {
+                "customer": "ivan",
+                "service": "Стандартная мойка",
+                "date": f"2024-01-{1 + number % 28:02d}",
+                "time": "10:00",
+            }
+            for number in range(300)
+        ]
+        counts = []
+        for size in (10, 300):
+            importer = BookingImporter()
+            with CaptureQueriesContext(connection) as queries:
+                run_import(importer, rows[:size], chunk_size=1000)
+            # INSERT дробятся по лимиту параметров SQLite — их не считаем
+            counts.append(
+                sum(not query["sql"].startswith("INSERT") for query in queries)
+            )
+        self.assertEqual(counts[0], counts[1])
@@ -0,0 +1,14 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+
+class BookingIndexesTest(TestCase):
+    """Тесты индексов под основные запросы к записям"""
+
+    def test_canonical_queries_use_indexes(self):
+        """Тест: основные запросы идут по индексам"""
+        out = StringIO()
+        call_command("explain_queries", "--strict", stdout=out)
+        self.assertNotIn("без индекса", out.getvalue())
@@ -215,13 +215,19 @@ class BookingModelTest(TestCase):
 
     def test_booking_save_method(self):
         """Тест метода save с перерасчетом цены"""
-        # Меняем скидку у клиента
+        # Меняем скидку у клиента: уже созданная запись сохраняет свою цену
         self.customer.discount = 10
         self.customer.save()
-
-        # Обновляем бронирование
         self.booking.save()
+        self.assertEqual(self.booking.total_price, 1000)
 
-        # Проверяем, что цена пересчиталась
+        # Цена пересчитывается при смене клиента
+        other = Customer.objects.create(
+            user=User.objects.create_user(username="other"),
+            phone="+79123456780",
+            discount=10,
+        )
+        self.booking.customer = other
+        self.booking.save()
         expected_price = 1000 * 0.9  # 10% скидка = 900 руб.
         self.assertEqual(self.booking.total_price, expected_price)
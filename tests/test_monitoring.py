@@ -0,0 +1,85 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from monitoring.metrics import Probe, registry, render, signature
+from services.models import Service, ServiceCategory
+
+
+@override_settings(MONITORING_SAMPLE_RATE=1, MONITORING_TOKEN="scrape")
+class MonitoringTest(TestCase):
+    """Тесты метрик запросов и страницы для Prometheus"""
+
+    def setUp(self):
+        registry.reset()
+        category = ServiceCategory.objects.create(name="Мойка")
+        Service.objects.create(
+            name="Стандартная мойка", price=1000, duration=30, category=category
+        )
+
+    def test_requests_are_counted_per_view(self):
+        """Тест счетчиков, гистограммы, SQL и шаблонов по имени URL"""
+        for _ in range(2):
+            self.client.get(reverse("services:service_list"))
+        self.client.get("/no-such-page/")
+        stats = registry.snapshot()
+        services = stats["services:service_list"]
+        self.assertEqual(services["requests"], {("GET", 200): 2})
+        self.assertEqual(sum(services["buckets"]), 2)
+        self.assertEqual(services["sampled"], 2)
+        self.assertGreater(services["queries"], 0)
+        self.assertGreater(services["render_seconds"], 0)
+        self.assertEqual(stats["<unresolved>"]["requests"], {("GET", 404): 1})
+
+        text = render()
+        self.assertIn(
+            'carwash_requests_total{view="services:service_list",method="GET",'
+            'status="200"} 2',
+            text,
+        )
+        self.assertIn(
+            'carwash_request_duration_seconds_count{view="services:service_list"} 2',
+            text,
+        )
+
+    @override_settings(MONITORING_SAMPLE_RATE=0)
+    def test_unsampled_requests_skip_sql_accounting(self):
+        """Тест: вне выборки считаются только запросы и задержка"""
+        self.client.get(reverse("services:service_list"))
+        services = registry.snapshot()["services:service_list"]
+        self.assertEqual(services["requests"], {("GET", 200): 1})
+        self.assertEqual((services["sampled"], services["queries"]), (0, 0))
+
+    def test_duplicate_queries(self):
+        """Тест обнаружения повторов одного SQL (N+1)"""
+        probe = Probe()
+        for number in range(4):
+            probe(
+                lambda *args: None,
+                'SELECT * FROM "t" WHERE "id" = %s',
+                [number],
+                False,
+                {},
+            )
+        probe(lambda *args: None, "SELECT 1", [], False, {})
+        self.assertEqual(probe.duplicates(3), {'SELECT * FROM "t" WHERE "id" = %s': 3})
+        registry.observe("bookings:my_bookings", "GET", 200, 0.01, probe)
+        self.assertIn(
+            'carwash_sql_duplicate_queries_total{view="bookings:my_bookings"} 3',
+            render(),
+        )
+        self.assertEqual(
+            signature('WHERE "id" IN (%s, %s, %s)'), 'WHERE "id" IN (%s, ...)'
+        )
+
+    def test_endpoint_access(self):
+        """Тест: метрики доступны персоналу и сборщику с токеном"""
+        url = reverse("monitoring:metrics")
+        self.assertEqual(self.client.get(url).status_code, 302)
+        response = self.client.get(url, HTTP_AUTHORIZATION="Bearer scrape")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+
+        User.objects.create_user(username="staff", password="pass12345", is_staff=True)
+        self.client.login(username="staff", password="pass12345")
+        self.assertContains(self.client.get(url), "# TYPE carwash_requests_total")
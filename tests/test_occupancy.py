@@ -0,0 +1,117 @@
+from datetime import date, time
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from bookings import occupancy
+from bookings.models import Booking, Box, BoxOccupancy
+from customers.models import Customer
+from services.models import Service, ServiceCategory
+
+
+class OccupancyTest(TestCase):
+    """Тесты инкрементного обновления сетки занятости"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="grid", password="pass12345")
+        self.customer = Customer.objects.create(user=self.user, phone="+79123456789")
+        self.category = ServiceCategory.objects.create(name="Мойка")
+        self.service = Service.objects.create(
+            name="Стандартная мойка", price=1000, duration=30, category=self.category
+        )
+        self.box1 = Box.objects.create(number=1, box_type="standard", capacity=2)
+        self.box2 = Box.objects.create(number=2, box_type="standard", capacity=2)
+        self.day = date(2024, 1, 15)
+
+    def book(self, box=None, at=time(10, 0), status="pending"):
+        return Booking.objects.create(
+            customer=self.customer,
+            service=self.service,
+            box=box,
+            booking_date=self.day,
+            booking_time=at,
+            status=status,
+        )
+
+    def slots(self, box):
+        row = BoxOccupancy.objects.get(box=box, date=self.day)
+        return occupancy.decode(row.slots)
+
+    def test_create_marks_slots(self):
+        """Тест заполнения слотов при создании записи"""
+        self.book(self.box1)
+        first, last = occupancy.slot_range(time(10, 0), 30)
+        slots = self.slots(self.box1)
+        self.assertEqual(list(slots[first:last]), [1] * (last - first))
+        self.assertEqual(sum(slots), last - first)
+        self.assertEqual(occupancy.verify(), [])
+
+    def test_cancel_frees_slots(self):
+        """Тест освобождения слотов при отмене"""
+        booking = self.book(self.box1)
+        booking.status = "cancelled"
+        booking.save()
+        self.assertEqual(sum(self.slots(self.box1)), 0)
+        self.assertEqual(occupancy.verify(), [])
+
+    def test_status_change_between_active_keeps_grid(self):
+        """Тест: смена активного статуса не трогает сетку"""
+        booking = self.book(self.box1)
+        booking.status = "confirmed"
+        with self.assertNumQueries(1):
+            booking.save()
+        self.assertEqual(occupancy.verify(), [])
+
+    def test_move_between_boxes_and_days(self):
+        """Тест переноса записи в другой бокс и на другой день"""
+        booking = Booking.objects.get(pk=self.book(self.box1).pk)
+        booking.box = self.box2
+        booking.booking_time = time(12, 0)
+        booking.save()
+        self.assertEqual(sum(self.slots(self.box1)), 0)
+        self.assertTrue(any(self.slots(self.box2)))
+
+        booking.booking_date = date(2024, 1, 16)
+        booking.save()
+        self.assertEqual(sum(self.slots(self.box2)), 0)
+        self.assertEqual(occupancy.verify(), [])
+
+    def test_delete_frees_slots(self):
+        """Тест освобождения слотов при удалении записи"""
+        self.book(self.box1)
+        self.book(None)
+        Booking.objects.all().delete()
+        self.assertEqual(sum(self.slots(self.box1)), 0)
+        self.assertEqual(occupancy.verify(), [])
+
+    def test_box_delete_moves_bookings_to_unassigned(self):
+        """Тест: записи удаленного бокса попадают в общую строку дня"""
+        self.book(self.box1)
+        self.box1.delete()
+        self.assertTrue(any(self.slots(None)))
+        self.assertEqual(occupancy.verify(), [])
+
+    def test_service_duration_change_rebuilds_days(self):
+        """Тест пересборки сетки при изменении длительности услуги"""
+        self.book(self.box1)
+        self.service.duration = 60
+        self.service.save()
+        self.assertEqual(occupancy.verify(), [])
+
+    def test_verify_detects_drift_and_command_rebuilds(self):
+        """Тест сверки и пересборки сетки командой"""
+        self.book(self.box1)
+        Booking.objects.update(status="cancelled")
+        self.assertEqual(occupancy.verify(), [(self.box1.pk, self.day)])
+
+        out = StringIO()
+        call_command("rebuild_occupancy", stdout=out)
+        self.assertIn("совпадает", out.getvalue())
+        self.assertEqual(occupancy.verify(), [])
+
+    def test_command_rejects_bad_date(self):
+        """Тест: несуществующая дата — ошибка команды, а не исключение"""
+        with self.assertRaisesMessage(CommandError, "Некорректная дата"):
+            call_command("rebuild_occupancy", "--date-from", "2024-02-30")
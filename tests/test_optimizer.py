@@ -0,0 +1,122 @@
+import random
+import time as timer
+from datetime import date, time
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from bookings import occupancy
+from bookings.models import Booking, Box
+from bookings.optimizer import plan, repack_day
+from customers.models import Customer
+from services.models import Service, ServiceCategory
+
+DAY = date(2024, 1, 15)
+
+
+class RepackDayTest(TestCase):
+    """Тесты пересборки расписания дня"""
+
+    def setUp(self):
+        category = ServiceCategory.objects.create(name="Мойка")
+        self.service = Service.objects.create(
+            name="Стандартная мойка", price=1000, duration=60, category=category
+        )
+        self.boxes = [
+            Box.objects.create(number=number, box_type="standard", capacity=1)
+            for number in range(1, 4)
+        ]
+        self.customer = Customer.objects.create(
+            user=User.objects.create_user(username="client"), phone="+79000000001"
+        )
+
+    def book(self, box, hour, status="confirmed"):
+        return Booking.objects.create(
+            customer=self.customer,
+            service=self.service,
+            box=box,
+            booking_date=DAY,
+            booking_time=time(hour, 0),
+            status=status,
+        )
+
+    def test_repack_consolidates_boxes(self):
+        """Тест уплотнения записей в меньшее число боксов"""
+        for box, hour in zip(self.boxes, (10, 11, 12)):
+            self.book(box, hour)
+
+        stats = repack_day(DAY)
+
+        self.assertTrue(stats["saved"])
+        self.assertEqual(stats["boxes_before"], 3)
+        self.assertEqual(stats["boxes_after"], 1)
+        self.assertLess(stats["idle_after"], stats["idle_before"])
+        self.assertEqual(
+            Booking.objects.values("box").distinct().count(), stats["boxes_after"]
+        )
+        self.assertEqual(occupancy.verify(), [])
+
+    def test_pinned_bookings_stay(self):
+        """Тест: записи в работе и завершенные не переносятся"""
+        pinned = self.book(self.boxes[2], 10, status="in_progress")
+        done = self.book(self.boxes[1], 8, status="completed")
+        self.book(self.boxes[0], 11)
+
+        repack_day(DAY)
+
+        pinned.refresh_from_db()
+        done.refresh_from_db()
+        self.assertEqual(pinned.box, self.boxes[2])
+        self.assertEqual(done.box, self.boxes[1])
+
+    def test_dry_run_does_not_write(self):
+        """Тест режима без сохранения"""
+        for box, hour in zip(self.boxes, (10, 11, 12)):
+            self.book(box, hour)
+        stats = repack_day(DAY, dry_run=True)
+        self.assertEqual(stats["moved"], 2)
+        self.assertFalse(stats["saved"])
+        self.assertEqual(Booking.objects.values("box").distinct().count(), 3)
+
+    def test_command(self):
+        """Тест команды repack_day"""
+        for box, hour in zip(self.boxes, (10, 11, 12)):
+            self.book(box, hour)
+        out = StringIO()
+        call_command("repack_day", "2024-01-15", stdout=out)
+        self.assertIn("сохранено", out.getvalue())
+
+
+class PlanTest(TestCase):
+    """Тесты расчета расстановки"""
+
+    def test_respects_box_type_and_capacity(self):
+        """Тест соблюдения типа и вместимости боксов"""
+        boxes = [(1, 1, "standard"), (2, 2, "premium")]
+        bookings = [
+            (number, None, time(10, 0), 30, "pending", "premium")
+            for number in range(1, 4)
+        ]
+        result = plan(bookings, boxes)
+        self.assertEqual(result, {1: 2, 2: 2})
+
+    def test_thousand_bookings_in_seconds(self):
+        """Тест: 1000 записей в день расставляются за секунды"""
+        rng = random.Random(1)
+        boxes = [(box_id, 2, "standard") for box_id in range(1, 41)]
+        bookings = [
+            (
+                number,
+                rng.choice(boxes)[0],
+                time(rng.randrange(8, 20), rng.randrange(0, 60, 5)),
+                rng.choice((15, 30, 45, 60)),
+                rng.choice(("pending", "confirmed", "in_progress")),
+                "",
+            )
+            for number in range(1000)
+        ]
+        started = timer.perf_counter()
+        plan(bookings, boxes)
+        self.assertLess(timer.perf_counter() - started, 2)
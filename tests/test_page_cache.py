@@ -0,0 +1,71 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from pages import cache as page_cache
+from services.models import Service, ServiceCategory
+
+
+class PageCacheTest(TestCase):
+    """Тесты кэша страниц для анонимных посетителей"""
+
+    def setUp(self):
+        self.category = ServiceCategory.objects.create(name="Мойка")
+        self.service = Service.objects.create(
+            name="Стандартная мойка", price=1000, duration=30, category=self.category
+        )
+
+    def test_anonymous_page_is_cached(self):
+        """Тест: повторный запрос анонима отдается из кэша"""
+        url = reverse("pages:about")
+        self.assertEqual(self.client.get(url)["X-Page-Cache"], "miss")
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response["X-Page-Cache"], "hit")
+        stats = page_cache.stats()["pages"]["pages:about"]
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_service_change_invalidates_pages(self):
+        """Тест сброса страниц каталога при изменении услуги"""
+        url = reverse("pages:price_list")
+        self.client.get(url)
+        self.service.price = 1500
+        self.service.save()
+        response = self.client.get(url)
+        self.assertEqual(response["X-Page-Cache"], "miss")
+        self.assertContains(response, "1500")
+
+    def test_logged_in_user_is_not_cached(self):
+        """Тест: вошедшим пользователям страница рендерится заново"""
+        User.objects.create_user(username="client", password="pass12345")
+        self.client.login(username="client", password="pass12345")
+        url = reverse("pages:about")
+        self.client.get(url)
+        response = self.client.get(url)
+        self.assertNotIn("X-Page-Cache", response)
+        self.assertContains(response, "client")
+
+    def test_forms_are_not_cached(self):
+        """Тест: страницы с CSRF-токеном не кэшируются"""
+        with self.settings(PAGE_CACHE_PAGES={"login": ("site",)}):
+            url = reverse("login")
+            self.client.get(url)
+            self.assertNotEqual(self.client.get(url).get("X-Page-Cache"), "hit")
+
+    def test_stats_endpoint_requires_staff(self):
+        """Тест доступа к счетчикам кэша"""
+        url = reverse("pages:cache_stats")
+        self.assertEqual(self.client.get(url).status_code, 302)
+        User.objects.create_user(username="boss", password="pass12345", is_staff=True)
+        self.client.login(username="boss", password="pass12345")
+        self.assertIn("hit_ratio", self.client.get(url).json())
+
+    def test_clear_command(self):
+        """Тест команды сброса кэша страниц"""
+        url = reverse("pages:contact")
+        self.client.get(url)
+        call_command("clear_page_cache", stdout=StringIO())
+        self.assertEqual(self.client.get(url)["X-Page-Cache"], "miss")
@@ -0,0 +1,111 @@
+from datetime import date, time
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from bookings import occupancy, rollups
+from bookings.models import Booking, Box
+from customers.models import Customer
+from services.models import Service, ServiceCategory
+
+DAY = date(2024, 1, 15)
+
+
+class BookingPricingTest(TestCase):
+    """Тесты расчета цены без лишних запросов"""
+
+    def setUp(self):
+        category = ServiceCategory.objects.create(name="Мойка")
+        self.service = Service.objects.create(
+            name="Стандартная мойка", price=1000, duration=30, category=category
+        )
+        self.premium = Service.objects.create(
+            name="Полировка", price=3000, duration=60, category=category
+        )
+        self.box = Box.objects.create(number=1, box_type="standard", capacity=2)
+        self.customer = Customer.objects.create(
+            user=User.objects.create_user(username="client"),
+            phone="+79000000001",
+            discount=10,
+        )
+
+    def booking(self, hour=10, service=None):
+        return Booking(
+            customer=self.customer,
+            service=service or self.service,
+            box=self.box,
+            booking_date=DAY,
+            booking_time=time(hour, 0),
+        )
+
+    def test_status_change_is_one_query(self):
+        """Тест: смена статуса загруженной записи — один UPDATE"""
+        self.booking().save()
+        booking = Booking.objects.get()
+        booking.status = "confirmed"
+        with self.assertNumQueries(1):
+            booking.save()
+        self.assertEqual(booking.total_price, Decimal("900"))
+
+    def test_status_change_keeps_price(self):
+        """Тест: смена статуса записи с загруженными связями не меняет цену"""
+        self.booking().save()
+        Service.objects.filter(pk=self.service.pk).update(price=2000)
+        Customer.objects.filter(pk=self.customer.pk).update(discount=0)
+        booking = Booking.objects.with_related().get()
+        booking.status = "confirmed"
+        booking.save()
+        booking.refresh_from_db()
+        self.assertEqual(booking.total_price, Decimal("900"))
+
+    def test_service_change_recalculates(self):
+        """Тест пересчета цены при смене услуги"""
+        self.booking().save()
+        booking = Booking.objects.get()
+        booking.service_id = self.premium.pk
+        booking.save()
+        self.assertEqual(booking.total_price, Decimal("2700"))
+
+    def test_bulk_create_computes_prices(self):
+        """Тест пакетного расчета цен и сетки при массовом создании"""
+        bookings = [self.booking(hour) for hour in (9, 10, 11)]
+        for booking in bookings:
+            # Только идентификаторы — цены догружаются одним запросом
+            booking.service = None
+            booking.service_id = self.service.pk
+        Booking.objects.bulk_create(bookings)
+        self.assertEqual(
+            set(Booking.objects.values_list("total_price", flat=True)),
+            {Decimal("900")},
+        )
+        self.assertEqual(occupancy.verify(), [])
+
+    def test_bulk_update_recalculates_prices(self):
+        """Тест пересчета цен при массовой смене услуги"""
+        Booking.objects.bulk_create([self.booking(hour) for hour in (9, 10)])
+        bookings = list(Booking.objects.all())
+        for booking in bookings:
+            booking.service = self.premium
+        Booking.objects.bulk_update(bookings, ["service"])
+        self.assertEqual(
+            set(Booking.objects.values_list("total_price", flat=True)),
+            {Decimal("2700")},
+        )
+        self.assertEqual(occupancy.verify(), [])
+
+    def test_set_status(self):
+        """Тест массовой смены статуса"""
+        Booking.objects.bulk_create([self.booking(hour) for hour in (9, 10)])
+        with self.captureOnCommitCallbacks(execute=True):
+            # Меняющиеся записи (для событий доски и сводок) и один UPDATE;
+            # сводки переносятся после коммита
+            with self.assertNumQueries(2):
+                Booking.objects.all().set_status("confirmed")
+        with self.captureOnCommitCallbacks(execute=True):
+            Booking.objects.all().set_status("cancelled")
+        self.assertEqual(
+            set(Booking.objects.values_list("status", flat=True)), {"cancelled"}
+        )
+        self.assertEqual(occupancy.verify(), [])
+        self.assertEqual(rollups.verify(), [])
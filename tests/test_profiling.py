@@ -0,0 +1,108 @@
+import pstats
+import time as timer
+
+from django.contrib.admin.sites import site
+from django.contrib.auth.models import User
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from monitoring import profiling
+from monitoring.models import ProfileSample
+from services.models import Service, ServiceCategory
+
+
+def busy(seconds):
+    finish = timer.perf_counter() + seconds
+    while timer.perf_counter() < finish:
+        pass
+
+
+@override_settings(MONITORING_PROFILE_RATE=0, MONITORING_PROFILE_INTERVAL=0.001)
+class ProfilingTest(TestCase):
+    """Тесты профилирования запросов и выгрузки профилей"""
+
+    def setUp(self):
+        profiling.budget.reset()
+        category = ServiceCategory.objects.create(name="Мойка")
+        Service.objects.create(
+            name="Стандартная мойка", price=1000, duration=30, category=category
+        )
+        self.staff = User.objects.create_user(
+            username="staff", password="pass12345", is_staff=True, is_superuser=True
+        )
+        self.url = reverse("services:service_list")
+
+    def test_off_by_default(self):
+        """Тест: без заголовка и выборки профили не снимаются"""
+        self.client.get(self.url, HTTP_X_PROFILE="1")
+        self.assertFalse(ProfileSample.objects.exists())
+        self.client.force_login(self.staff)
+        self.client.get(self.url)
+        self.assertFalse(ProfileSample.objects.exists())
+
+    def test_staff_header(self):
+        """Тест: заголовок сотрудника снимает профиль с именем URL"""
+        self.client.force_login(self.staff)
+        response = self.client.get(self.url, HTTP_X_PROFILE="1")
+        self.assertEqual(response.status_code, 200)
+        sample = ProfileSample.objects.get()
+        self.assertEqual(
+            (sample.view_name, sample.trigger, sample.status),
+            ("services:service_list", "header", 200),
+        )
+        functions = {func[2] for func in profiling._Loaded(bytes(sample.stats)).stats}
+        self.assertIn("render", functions)
+
+    @override_settings(
+        MONITORING_PROFILE_RATE=1,
+        MONITORING_PROFILE_VIEWS=["pages:price_list"],
+        MONITORING_PROFILE_MAX_PER_MINUTE=2,
+        MONITORING_PROFILE_KEEP=1,
+    )
+    def test_sampling_is_bounded(self):
+        """Тест выборки по имени URL, лимита в минуту и числа хранимых"""
+        self.client.get(self.url)
+        self.assertFalse(ProfileSample.objects.exists())
+        for _ in range(3):
+            self.client.get(reverse("pages:price_list"))
+        sample = ProfileSample.objects.get()
+        self.assertEqual(
+            (sample.view_name, sample.trigger), ("pages:price_list", "sample")
+        )
+        self.assertFalse(profiling.budget.take(2))
+        self.assertTrue(profiling.budget.take(2, now=timer.monotonic() + 60))
+
+    def test_stack_samples(self):
+        """Тест сэмплера стека и формата collapsed stacks"""
+        with profiling.Capture(0.001) as capture:
+            busy(0.05)
+        self.assertTrue(any("busy" in stack for stack in capture.stacks))
+        text = profiling.format_stacks(capture.stacks)
+        merged = profiling.merge_stacks([text, text])
+        stack, _, count = merged.splitlines()[0].rpartition(" ")
+        self.assertEqual(int(count), 2 * capture.stacks[stack])
+
+    def test_admin_downloads(self):
+        """Тест выгрузки объединенных pstats и collapsed stacks из админки"""
+        self.client.force_login(self.staff)
+        for _ in range(2):
+            self.client.get(self.url, HTTP_X_PROFILE="1")
+        model_admin = site._registry[ProfileSample]
+        request = RequestFactory().get("/")
+        request.user = self.staff
+        queryset = ProfileSample.objects.all()
+
+        response = model_admin.download_pstats(request, queryset)
+        self.assertIn("services-service_list-", response["Content-Disposition"])
+        merged = pstats.Stats(profiling._Loaded(response.content))
+        singles = [profiling._Loaded(bytes(row.stats)).stats for row in queryset]
+        func = next(func for func in singles[0] if func[2] == "render")
+        self.assertEqual(
+            merged.stats[func][1], sum(stats[func][1] for stats in singles)
+        )
+
+        response = model_admin.download_stacks(request, queryset)
+        self.assertTrue(response["Content-Disposition"].endswith('.folded"'))
+
+        url = reverse("admin:monitoring_profilesample_change", args=[queryset[0].pk])
+        self.assertContains(self.client.get(url), "вызовов")
@@ -0,0 +1,61 @@
+from datetime import date, time
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from bookings.models import Booking, Box
+from customers.models import Customer
+from query_budget import QueryBudgetMixin
+from services.models import Service, ServiceCategory
+
+
+class BookingQueryBudgetTest(QueryBudgetMixin, TestCase):
+    """Бюджеты SQL-запросов для страниц с записями"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="budget", password="pass12345")
+        self.customer = Customer.objects.create(user=self.user, phone="+79123456789")
+        self.admin = User.objects.create_superuser(
+            username="boss", password="pass12345", email="boss@test.com"
+        )
+        category = ServiceCategory.objects.create(name="Мойка")
+        self.services = [
+            Service.objects.create(
+                name=f"Услуга {number}", price=1000, duration=30, category=category
+            )
+            for number in range(5)
+        ]
+        self.box = Box.objects.create(number=1, box_type="standard", capacity=2)
+
+    def add_bookings(self, count):
+        for number in range(count):
+            Booking.objects.create(
+                customer=self.customer,
+                service=self.services[number % len(self.services)],
+                box=self.box,
+                booking_date=date(2024, 1, 1 + number),
+                booking_time=time(10, 0),
+            )
+
+    def test_my_bookings_budget(self):
+        """Тест: список записей не делает запрос на каждую строку"""
+        self.add_bookings(10)
+        self.client.login(username="budget", password="pass12345")
+        response = self.assertQueryBudget(5, reverse("bookings:my_bookings"))
+        self.assertContains(response, "Услуга 4")
+
+    def test_booking_pages_budget(self):
+        """Тест бюджетов страниц просмотра, изменения и удаления записи"""
+        self.add_bookings(1)
+        booking = Booking.objects.get()
+        self.client.login(username="budget", password="pass12345")
+        self.assertQueryBudget(4, reverse("bookings:booking_detail", args=[booking.pk]))
+        self.assertQueryBudget(5, reverse("bookings:edit_booking", args=[booking.pk]))
+        self.assertQueryBudget(4, reverse("bookings:delete_booking", args=[booking.pk]))
+
+    def test_admin_changelist_budget(self):
+        """Тест: список записей в админке не растет с числом строк"""
+        self.add_bookings(20)
+        self.client.login(username="boss", password="pass12345")
+        self.assertQueryBudget(8, reverse("admin:bookings_booking_changelist"))
@@ -0,0 +1,187 @@
+from datetime import date, time
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from bookings import rollups
+from bookings.models import Booking, Box, DailyRollup
+from customers.models import Customer
+from services.models import Service, ServiceCategory
+
+DAY = date(2024, 1, 15)
+
+
+class RollupTest(TestCase):
+    """Тесты инкрементного обновления дневных сводок"""
+
+    def setUp(self):
+        category = ServiceCategory.objects.create(name="Мойка")
+        self.wash = Service.objects.create(
+            name="Стандартная мойка", price=1000, duration=30, category=category
+        )
+        self.polish = Service.objects.create(
+            name="Полировка", price=3000, duration=60, category=category
+        )
+        self.box = Box.objects.create(number=1, box_type="standard", capacity=2)
+        self.customer = Customer.objects.create(
+            user=User.objects.create_user(username="client"), phone="+79000000001"
+        )
+
+    def book(self, hour=10, service=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Booking.objects.create(
+                customer=self.customer,
+                service=service or self.wash,
+                box=self.box,
+                booking_date=DAY,
+                booking_time=time(hour, 0),
+            )
+
+    def rollup(self, status="pending", service=None):
+        return DailyRollup.objects.get(
+            date=DAY, service=service or self.wash, status=status
+        )
+
+    def test_save_status_change_and_delete(self):
+        """Тест сводок при создании, смене статуса и удалении записи"""
+        first = self.book(10)
+        self.book(11)
+        row = self.rollup()
+        self.assertEqual((row.bookings, row.minutes), (2, 60))
+        self.assertEqual(row.revenue, Decimal("2000"))
+
+        first.status = "completed"
+        with self.captureOnCommitCallbacks(execute=True):
+            first.save()
+            # До коммита сводки не трогаются
+            self.assertEqual(self.rollup().bookings, 2)
+        self.assertEqual(self.rollup().bookings, 1)
+        self.assertEqual(self.rollup("completed").revenue, Decimal("1000"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertFalse(DailyRollup.objects.filter(status="completed").exists())
+        self.assertEqual(rollups.verify(), [])
+
+    def test_move_to_other_day_and_service(self):
+        """Тест переноса записи на другой день и смены услуги"""
+        booking = Booking.objects.get(pk=self.book().pk)
+        booking.booking_date = date(2024, 1, 16)
+        booking.service = self.polish
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.save()
+        row = DailyRollup.objects.get()
+        self.assertEqual(
+            (row.date, row.service, row.minutes), (date(2024, 1, 16), self.polish, 60)
+        )
+        self.assertEqual(rollups.verify(), [])
+
+    def test_unchanged_save_skips_rollups(self):
+        """Тест: сохранение без изменения ключа не трогает сводки"""
+        booking = Booking.objects.get(pk=self.book().pk)
+        booking.notes = "Без воска"
+        with self.assertNumQueries(1):
+            booking.save()
+
+    def test_bulk_operations(self):
+        """Тест сводок при массовой смене статуса и массовом изменении"""
+        for hour in (9, 10, 11):
+            self.book(hour)
+        with self.captureOnCommitCallbacks(execute=True):
+            Booking.objects.filter(booking_time__lt=time(11, 0)).set_status("confirmed")
+        self.assertEqual(self.rollup("confirmed").bookings, 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            Booking.objects.all().set_status("cancelled")
+        self.assertEqual(self.rollup("cancelled").bookings, 3)
+
+        bookings = list(Booking.objects.all())
+        for booking in bookings:
+            booking.service = self.polish
+        Booking.objects.bulk_update(bookings, ["service"])
+        self.assertEqual(self.rollup("cancelled", self.polish).minutes, 180)
+        self.assertEqual(rollups.verify(), [])
+
+    def test_service_duration_and_box_deletion(self):
+        """Тест: смена длительности услуги и удаление бокса"""
+        self.book(10)
+        self.wash.duration = 45
+        self.wash.save()
+        self.assertEqual(self.rollup().minutes, 45)
+        self.box.delete()
+        self.assertIsNone(self.rollup().box)
+        self.assertEqual(rollups.verify(), [])
+
+
+class RebuildRollupsCommandTest(TestCase):
+    """Тесты команды rebuild_rollups"""
+
+    def setUp(self):
+        category = ServiceCategory.objects.create(name="Мойка")
+        self.service = Service.objects.create(
+            name="Мойка", price=1000, duration=30, category=category
+        )
+        self.customer = Customer.objects.create(
+            user=User.objects.create_user(username="client"), phone="+79000000001"
+        )
+        Booking.objects.bulk_create(
+            [
+                Booking(
+                    customer=self.customer,
+                    service=self.service,
+                    booking_date=date(2024, 1, day),
+                    booking_time=time(10, 0),
+                )
+                for day in range(1, 11)
+            ],
+            refresh_occupancy=False,
+        )
+
+    def test_backfill_in_batches_and_resume(self):
+        """Тест заполнения пачками и продолжения с места остановки"""
+        out = StringIO()
+        call_command("rebuild_rollups", "--batch-days", "3", stdout=out)
+        self.assertEqual(DailyRollup.objects.count(), 10)
+        self.assertIn("2024-01-10 — 2024-01-10", out.getvalue())
+
+        DailyRollup.objects.filter(date__gte=date(2024, 1, 6)).delete()
+        out = StringIO()
+        call_command("rebuild_rollups", "--resume", "--batch-days", "3", stdout=out)
+        self.assertIn("2024-01-01 — 2024-01-03: без расхождений", out.getvalue())
+        self.assertIn("2024-01-04 — 2024-01-06: строк сводки 3", out.getvalue())
+        self.assertEqual(DailyRollup.objects.count(), 10)
+
+    def test_resume_ignores_rows_written_by_signals(self):
+        """Тест: свежие сводки из сигналов не сбивают продолжение заполнения"""
+        DailyRollup.objects.all().delete()
+        # Новая запись сама пишет сводку за далекую дату
+        Booking.objects.create(
+            customer=self.customer,
+            service=self.service,
+            booking_date=date(2030, 1, 1),
+            booking_time=time(10, 0),
+        )
+        call_command("rebuild_rollups", "--resume", stdout=StringIO())
+        self.assertEqual(DailyRollup.objects.count(), 11)
+        self.assertEqual(rollups.verify(), [])
+
+    def test_invalid_date(self):
+        """Тест: несуществующая дата — ошибка команды"""
+        with self.assertRaisesMessage(CommandError, "Некорректная дата"):
+            call_command("rebuild_rollups", "--date-from", "2024-02-30")
+
+    def test_verify_only_reports_mismatches(self):
+        """Тест сверки сводок без изменений"""
+        with self.assertRaises(CommandError):
+            call_command(
+                "rebuild_rollups",
+                "--verify-only",
+                "--date-from",
+                "2024-01-01",
+                "--date-to",
+                "2024-01-03",
+                stdout=StringIO(),
+            )
+        self.assertFalse(DailyRollup.objects.exists())
@@ -0,0 +1,118 @@
+import time as timer
+from datetime import date, time
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from bookings import availability
+from bookings.availability import DayIndex
+from bookings.commit import commit_booking
+from bookings.models import Booking, Box
+from bookings.scheduler import DayScheduler
+from customers.models import Customer
+from employees.models import Employee
+from services.models import Service, ServiceCategory
+
+DAY = date(2024, 1, 15)
+
+
+class DaySchedulerTest(TestCase):
+    """Тесты эвристики назначения бокса и мойщика"""
+
+    def test_balances_boxes(self):
+        """Тест распределения записей по наименее загруженным боксам"""
+        scheduler = DayScheduler(DayIndex(DAY, [(1, 2), (2, 2)]), [])
+        first, _ = scheduler.assign(time(10, 0), 30)
+        second, _ = scheduler.assign(time(12, 0), 30)
+        self.assertNotEqual(first, second)
+
+    def test_matches_box_type(self):
+        """Тест выбора бокса подходящего типа"""
+        index = DayIndex(DAY, [(1, 2, "standard"), (2, 2, "premium")])
+        scheduler = DayScheduler(index, [])
+        for _ in range(2):
+            box_id, _ = scheduler.assign(time(10, 0), 30, "premium")
+            self.assertEqual(box_id, 2)
+        box_id, _ = scheduler.assign(time(10, 0), 30, "premium")
+        self.assertIsNone(box_id)
+
+    def test_employee_is_not_double_booked(self):
+        """Тест: мойщик не назначается на пересекающиеся записи"""
+        scheduler = DayScheduler(DayIndex(DAY, [(1, 2), (2, 2)]), [10, 20])
+        _, first = scheduler.assign(time(10, 0), 60)
+        _, second = scheduler.assign(time(10, 30), 30)
+        _, third = scheduler.assign(time(10, 45), 30)
+        self.assertEqual({first, second}, {10, 20})
+        self.assertIsNone(third)
+        _, fourth = scheduler.assign(time(11, 0), 30)
+        self.assertEqual(fourth, second)
+
+    def test_overlapping_assignments(self):
+        """Тест: длинная запись мойщика учитывается за пересекающей ее короткой"""
+        scheduler = DayScheduler(
+            DayIndex(DAY, [(1, 2)]),
+            [10],
+            [(10, time(9, 0), 180), (10, time(9, 30), 30)],
+        )
+        self.assertFalse(scheduler.employee_is_free(10, time(11, 0), 30))
+        self.assertTrue(scheduler.employee_is_free(10, time(12, 0), 30))
+
+    def test_full_day_is_fast(self):
+        """Тест: расстановка нескольких сотен записей занимает доли секунды"""
+        boxes = [(box_id, 2) for box_id in range(1, 13)]
+        scheduler = DayScheduler(DayIndex(DAY, boxes), range(1, 25))
+        started = timer.perf_counter()
+        for number in range(500):
+            scheduler.assign(time(8 + number % 13, (number * 5) % 60), 30)
+        self.assertLess(timer.perf_counter() - started, 0.5)
+
+
+class CommitAssignmentTest(TestCase):
+    """Тесты назначения бокса и мойщика при записи"""
+
+    def setUp(self):
+        availability.invalidate()
+        category = ServiceCategory.objects.create(name="Мойка")
+        self.service = Service.objects.create(
+            name="Полировка",
+            price=3000,
+            duration=60,
+            category=category,
+            box_type="premium",
+        )
+        self.standard = Box.objects.create(number=1, box_type="standard", capacity=2)
+        self.premium = Box.objects.create(number=2, box_type="premium", capacity=2)
+        self.washer = Employee.objects.create(
+            user=User.objects.create_user(username="washer"),
+            phone="+79000000000",
+            hire_date=DAY,
+        )
+        self.customer = Customer.objects.create(
+            user=User.objects.create_user(username="client"), phone="+79000000001"
+        )
+
+    def booking(self, at):
+        return Booking(
+            customer=self.customer,
+            service=self.service,
+            booking_date=DAY,
+            booking_time=at,
+        )
+
+    def test_commit_assigns_box_and_employee(self):
+        """Тест автоматического назначения при сохранении записи"""
+        booking = commit_booking(self.booking(time(10, 0)))
+        self.assertEqual(booking.box, self.premium)
+        self.assertEqual(booking.employee, self.washer)
+
+        second = commit_booking(self.booking(time(10, 30)))
+        self.assertEqual(second.box, self.premium)
+        self.assertIsNone(second.employee)
+
+    def test_moving_booking_keeps_employee(self):
+        """Тест: при переносе записи мойщик не конфликтует сам с собой"""
+        booking = commit_booking(self.booking(time(10, 0)))
+        booking = Booking.objects.get(pk=booking.pk)
+        booking.booking_time = time(10, 30)
+        commit_booking(booking)
+        self.assertEqual(booking.employee, self.washer)
@@ -0,0 +1,74 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from customers.models import Customer
+from query_budget import SHARED_CACHES, QueryBudgetMixin
+
+
+@override_settings(CACHES=SHARED_CACHES, AUTH_USER_CACHE_TIMEOUT=60)
+class SessionAuthTest(QueryBudgetMixin, TestCase):
+    """Тесты кэша сессий и пользователя при аутентификации"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="client", password="pass12345")
+        Customer.objects.create(user=self.user, phone="+79123456789")
+        self.url = reverse("customers:profile")
+
+    def login(self):
+        self.client.login(username="client", password="pass12345")
+        self.client.get(self.url)
+
+    def test_warm_page_skips_session_and_user(self):
+        """Тест: после прогрева сессия, пользователь и профиль не читаются из БД"""
+        self.login()
+        # Остается только выборка последних записей клиента
+        response = self.assertQueryBudget(1, self.url)
+        self.assertEqual(response.context["user"], self.user)
+
+    def test_user_changes_are_seen(self):
+        """Тест: смена пароля и блокировка сбрасывают кэш пользователя"""
+        self.login()
+        self.user.set_password("another12345")
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+        self.client.login(username="client", password="another12345")
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+    @override_settings(AUTH_USER_CACHE_TIMEOUT=0)
+    def test_cache_can_be_disabled(self):
+        """Тест: при нулевом TTL пользователь читается на каждом запросе"""
+        self.login()
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_local_memory_cache_is_not_used(self):
+        """Тест: с кэшем в памяти процесса пользователь и профиль не кэшируются"""
+        self.login()
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+
+    @override_settings(SESSION_ENGINE="django.contrib.sessions.backends.signed_cookies")
+    def test_signed_cookie_sessions(self):
+        """Тест: сессии в подписанной cookie не пишутся в БД"""
+        self.login()
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+        # Анонимный посетитель сессии не получает
+        self.client.logout()
+        response = self.client.get(reverse("bookings:index"))
+        self.assertNotIn("sessionid", response.cookies)
+
+    def test_sessions_of_plain_model_backend(self):
+        """Тест: сессии, открытые через ModelBackend, остаются действующими"""
+        self.client.force_login(
+            self.user, backend="django.contrib.auth.backends.ModelBackend"
+        )
+        self.assertEqual(self.client.get(self.url).status_code, 200)